@@ -0,0 +1,44 @@
+"""
+Compare serial and concurrent historical kline backfill against the local stub server.
+
+    python benchmarks/bench_backfill.py --days 30 --interval 1m --workers 8
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from connections.rate_limiter import RateLimiter
+from data.fetch import BinanceDataFetcher
+from stub_server import start_stub_server
+
+
+def run(fetcher, symbol, interval, start_time, end_time, workers):
+    started = time.perf_counter()
+    rows = fetcher.fetch_historical_klines(symbol, interval, start_time, end_time, max_workers=workers)
+    return len(rows), time.perf_counter() - started
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--interval", default="1m")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.05, help="Simulated round-trip time in seconds.")
+    parser.add_argument("--weight-limit", type=int, default=6000, help="Request weight per minute allowed by the limiter.")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    server, base_url = start_stub_server(latency=args.latency)
+    fetcher = BinanceDataFetcher(base_url=base_url, limiter=RateLimiter.per_minute(args.weight_limit))
+
+    end_time = int(time.time() * 1000)
+    start_time = end_time - args.days * 24 * 60 * 60 * 1000
+
+    for workers in (1, args.workers):
+        rows, elapsed = run(fetcher, "BTCUSDT", args.interval, start_time, end_time, workers)
+        print(f"workers={workers:<3} rows={rows:<8} elapsed={elapsed:.2f}s")
+    server.shutdown()
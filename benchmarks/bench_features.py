@@ -0,0 +1,68 @@
+"""
+Compute the microstructure indicators and the regime features of one frame, once through
+the separate data.timeseries functions and once through a shared FeaturePipeline.
+
+    python benchmarks/bench_features.py --rows 1000000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from data import timeseries
+from data.features import FeaturePipeline
+
+INDICATORS = ["roll_measure", "bekker_parkinson_vol", "kyles_lambda", "amihuds_lambda", "hasbroucks_lambda"]
+
+
+def synthetic_frame(rows):
+    rng = np.random.default_rng(0)
+    close = pd.Series(np.exp(np.cumsum(rng.normal(scale=0.001, size=rows))) * 30000.0)
+    spread = close * rng.uniform(0.0005, 0.002, size=rows)
+    return pd.DataFrame({"close": close, "high": close + spread, "low": close - spread,
+                         "volume": rng.uniform(1.0, 100.0, size=rows)})
+
+
+def separate(frame, window):
+    close, high, low, volume = frame["close"], frame["high"], frame["low"], frame["volume"]
+    log_return = np.log(close / close.shift(1))
+    return {
+        "roll_measure": timeseries.roll_measure(close, window).reindex(frame.index),
+        "bekker_parkinson_vol": timeseries.bekker_parkinson_vol(high, low, close, window),
+        "kyles_lambda": timeseries.kyles_lambda(close, volume, window),
+        "amihuds_lambda": timeseries.amihuds_lambda(close, volume, window),
+        "hasbroucks_lambda": timeseries.hasbroucks_lambda(close, volume, window),
+        "volatility_20": log_return.rolling(window=20).std(),
+        "normalized_volume_20": volume / volume.rolling(window=20).mean(),
+    }
+
+
+def pipelined(frame, window):
+    return FeaturePipeline(frame, window).compute(INDICATORS + [("volatility", 20), ("normalized_volume", 20)])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--window", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    frame = synthetic_frame(args.rows)
+    pipelined(frame.iloc[:100], args.window)  # compile the numba kernels outside the timings
+    timings = {}
+    for name, func in [("separate functions", separate), ("FeaturePipeline", pipelined)]:
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            result = func(frame, args.window)
+        timings[name] = (time.perf_counter() - started) / args.repeat, result
+        print(f"{name:<20} {timings[name][0] * 1000:8.1f} ms")
+
+    expected, actual = timings["separate functions"][1], timings["FeaturePipeline"][1]
+    for column in actual.columns:
+        assert np.allclose(expected[column], actual[column], equal_nan=True), column
+    print(f"speedup x{timings['separate functions'][0] / timings['FeaturePipeline'][0]:.2f}, all features match")
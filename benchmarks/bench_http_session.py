@@ -0,0 +1,45 @@
+"""
+Compare unpooled (`requests.get`) and pooled keep-alive (`connections.session`) request latency
+against the local stub server.
+
+    python benchmarks/bench_http_session.py --requests 500
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+from connections.session import create_session
+from stub_server import start_stub_server
+
+
+def measure(get, url, n):
+    latencies = []
+    for _ in range(n):
+        started = time.perf_counter()
+        get(url).raise_for_status()
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def report(name, latencies):
+    latencies = sorted(latencies)
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(f"{name:<9} mean={statistics.mean(latencies):.3f}ms p50={statistics.median(latencies):.3f}ms p99={p99:.3f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server()
+    url = f"{base_url}/v3/ping"
+
+    report("unpooled", measure(requests.get, url, args.requests))
+    report("pooled", measure(create_session().get, url, args.requests))
+    server.shutdown()
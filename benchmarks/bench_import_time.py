@@ -0,0 +1,64 @@
+"""
+Check the import cost of the data/ modules with `python -X importtime`.
+
+Each module is imported in a fresh interpreter; the script fails (exit code 1) if a module
+exceeds its time budget or pulls in a heavy dependency that should only load on use.
+
+    python benchmarks/bench_import_time.py
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cumulative import time budget in milliseconds. python-binance alone costs several hundred ms.
+BUDGETS_MS = {
+    "data.fetch": 1000,
+    "data.timeseries": 600,
+    "data.analysis": 600,
+    "data.preprocess": 600,
+    "data.borutashap": 600,
+    "data.samco_fetch": 400,
+}
+
+# Modules that must not be loaded just by importing the data/ package modules.
+DEFERRED_MODULES = ["numba", "scipy", "hmmlearn", "matplotlib", "sklearn", "shap",
+                    "seaborn", "statsmodels", "tqdm"]
+
+
+def import_cost(module):
+    """Return (cumulative import time in ms, loaded deferred modules) for `module`."""
+    probe = (f"import sys, {module}; "
+             f"print(','.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))")
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", probe], cwd=ROOT,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+    cumulative_us = 0
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and line.rsplit("|", 1)[-1].strip() == module:
+            cumulative_us = int(line.split("|")[1])
+    loaded = [name for name in result.stdout.strip().split(",") if name]
+    return cumulative_us / 1000, loaded
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every budget (for slow machines).")
+    args = parser.parse_args()
+
+    failed = False
+    for module, budget in BUDGETS_MS.items():
+        try:
+            elapsed, loaded = import_cost(module)
+        except RuntimeError as e:
+            print(f"{module:<20} SKIPPED ({str(e).strip().splitlines()[-1]})")
+            continue
+        over_budget = elapsed > budget * args.scale
+        status = "FAIL" if over_budget or loaded else "ok"
+        failed = failed or status == "FAIL"
+        extra = f"  loads {', '.join(loaded)}" if loaded else ""
+        print(f"{module:<20} {elapsed:8.1f} ms  (budget {budget * args.scale:.0f} ms)  {status}{extra}")
+    sys.exit(1 if failed else 0)
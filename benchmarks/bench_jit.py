@@ -0,0 +1,65 @@
+"""
+Start-up cost of the numba kernels behind data.timeseries, cold (empty cache) and warm
+(machine code loaded from the on-disk cache), plus the batched panel kernels against a
+per-symbol loop.
+
+    python benchmarks/bench_jit.py --symbols 100 --rows 20000
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numba as nb
+import numpy as np
+from data import timeseries
+
+WARMUP = ("import time; started = time.perf_counter(); from data import timeseries; timeseries.warmup(); "
+          "print(time.perf_counter() - started)")
+
+
+def warmup_seconds(cache_dir):
+    """Time import + warmup() in a fresh interpreter using `cache_dir` as numba's cache."""
+    env = dict(os.environ, NUMBA_CACHE_DIR=cache_dir)
+    output = subprocess.run([sys.executable, "-c", WARMUP], cwd=ROOT, env=env, check=True,
+                            capture_output=True, text=True).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def compare(name, per_symbol, panel_func, panel, *args):
+    started = time.perf_counter()
+    looped = np.column_stack([per_symbol(panel[:, k], *args) for k in range(panel.shape[1])])
+    loop_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    result = panel_func(panel, *args)
+    panel_seconds = time.perf_counter() - started
+    assert np.allclose(looped.reshape(result.shape), result, equal_nan=True), name
+    print(f"{name:<34} loop {loop_seconds:7.3f}s   panel {panel_seconds:7.3f}s   x{loop_seconds / panel_seconds:.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--symbols", type=int, default=100)
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--window", type=int, default=256)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cold = warmup_seconds(cache_dir)
+        warm = warmup_seconds(cache_dir)
+    print(f"import + warmup(): cold cache {cold:.2f}s, warm cache {warm:.2f}s")
+
+    timeseries.warmup()
+    print(f"panel kernels run on {nb.config.NUMBA_NUM_THREADS} thread(s)")
+    panel = np.cumsum(np.random.default_rng(0).normal(size=(args.rows, args.symbols)), axis=0) + 1000.0
+    compare("hurst", lambda x: timeseries.hurst(x)[0], timeseries.hurst_panel, panel)
+    compare("fractal_dimension", timeseries.fractal_dimension, timeseries.fractal_dimension_panel, panel)
+    compare(f"rolling_hurst(w={args.window})", timeseries.rolling_hurst, timeseries.rolling_hurst_panel,
+            panel, args.window)
+    compare(f"rolling_fractal_dimension(w={args.window})", timeseries.rolling_fractal_dimension,
+            timeseries.rolling_fractal_dimension_panel, panel, args.window)
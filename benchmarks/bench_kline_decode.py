@@ -0,0 +1,62 @@
+"""
+Compare kline decoding paths on raw API rows.
+
+    python benchmarks/bench_kline_decode.py --rows 1000000
+
+The row-wise `apply(pd.to_numeric, axis=1)` path from basic_Eda.py takes minutes on 1M rows,
+so it is timed on --baseline-rows and extrapolated linearly.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from data.preprocess import KLINE_COLUMNS, decode_klines, decode_klines_json
+from stub_server import make_kline
+
+NUMERIC_COLUMNS = ["open", "high", "low", "close", "volume",
+                   "quote_asset_volume", "taker_buy_base", "taker_buy_quote"]
+
+
+def rowwise_to_numeric(rows):
+    df = pd.DataFrame(rows, columns=KLINE_COLUMNS)
+    df[NUMERIC_COLUMNS] = df[NUMERIC_COLUMNS].apply(pd.to_numeric, axis=1)
+    return df
+
+
+def timed(func, *args):
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--baseline-rows", type=int, default=20_000)
+    args = parser.parse_args()
+
+    rows = [make_kline(1_600_000_000_000 + i * 60_000, 60_000) for i in range(args.rows)]
+    raw = json.dumps(rows, separators=(",", ":")).encode()
+
+    _, elapsed = timed(rowwise_to_numeric, rows[:args.baseline_rows])
+    print(f"{'apply(pd.to_numeric, axis=1)':<34} {elapsed * args.rows / args.baseline_rows:8.2f}s "
+          f"(extrapolated from {args.baseline_rows} rows)")
+
+    _, elapsed = timed(lambda r: pd.DataFrame(r, columns=KLINE_COLUMNS).astype(float), rows)
+    print(f"{'DataFrame(rows).astype(float)':<34} {elapsed:8.2f}s")
+
+    decoded, elapsed = timed(decode_klines, rows)
+    print(f"{'decode_klines(rows)':<34} {elapsed:8.2f}s")
+
+    _, elapsed = timed(json.loads, raw)
+    print(f"{'json.loads(raw)':<34} {elapsed:8.2f}s  (cost already paid before decode_klines)")
+
+    from_raw, elapsed = timed(decode_klines_json, raw)
+    print(f"{'decode_klines_json(raw)':<34} {elapsed:8.2f}s")
+
+    assert from_raw.equals(decoded), "decoders disagree"
@@ -0,0 +1,61 @@
+"""
+Compare loading a multi-year 1m kline history from CSV and from the columnar KlineStore.
+
+    python benchmarks/bench_kline_store.py --days 730
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from data.preprocess import KLINE_COLUMNS, KLINE_DTYPES
+from data.storage import KlineStore
+
+
+def synthetic_klines(days, start_time=1_600_000_000_000):
+    n = days * 24 * 60
+    rng = np.random.default_rng(0)
+    open_time = start_time - start_time % 60_000 + np.arange(n, dtype=np.int64) * 60_000
+    close = 30000 * np.exp(np.cumsum(rng.normal(0, 1e-3, n)))
+    frame = pd.DataFrame({
+        "timestamp": open_time, "open": close, "high": close * 1.001, "low": close * 0.999, "close": close,
+        "volume": rng.random(n) * 10, "close_time": open_time + 59_999, "quote_asset_volume": close * 5,
+        "number_of_trades": rng.integers(1, 1000, n), "taker_buy_base": rng.random(n),
+        "taker_buy_quote": rng.random(n) * close, "ignore": 0.0,
+    })
+    return frame[KLINE_COLUMNS].astype(KLINE_DTYPES)
+
+
+def timed(label, func):
+    started = time.perf_counter()
+    result = func()
+    rows = result if isinstance(result, int) else len(result)
+    print(f"{label:<32} {time.perf_counter() - started:8.3f}s  rows={rows}")
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=int, default=730)
+    args = parser.parse_args()
+
+    klines = synthetic_klines(args.days)
+    with tempfile.TemporaryDirectory() as root:
+        csv_path = os.path.join(root, "klines.csv")
+        csv_frame = klines.copy()
+        csv_frame["timestamp"] = pd.to_datetime(csv_frame["timestamp"], unit="ms")
+        csv_frame.to_csv(csv_path, index=False)
+
+        store = KlineStore(os.path.join(root, "store"))
+        timed("store write", lambda: store.write("BTCUSDT", "1m", klines))
+
+        timed("csv read (parse_dates)", lambda: pd.read_csv(csv_path, parse_dates=["timestamp"]))
+        timed("store read (all columns)", lambda: store.read("BTCUSDT", "1m"))
+        timed("store read (close, volume)", lambda: store.read("BTCUSDT", "1m", columns=["timestamp", "close", "volume"]))
+        last_week = int(klines["timestamp"].iloc[-1]) - 7 * 24 * 60 * 60 * 1000
+        timed("store read (last 7 days)", lambda: store.read("BTCUSDT", "1m", start_time=last_week))
@@ -0,0 +1,60 @@
+"""
+Peak memory and time of MarketRegimeAnalyzer.load_data on a long 1s-bar CSV and KlineStore
+history, whole-frame against chunked, with the feature matrices compared.
+
+    python benchmarks/bench_load_data.py --rows 2000000 --chunksize 250000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from bench_kline_store import synthetic_klines
+from data.analysis import MarketRegimeAnalyzer
+from data.storage import KlineStore
+
+
+def measured(analyzer, chunksize):
+    tracemalloc.start()
+    started = time.perf_counter()
+    analyzer.load_data(chunksize=chunksize)
+    seconds = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak, seconds
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--chunksize", type=int, default=250_000)
+    args = parser.parse_args()
+    warnings.simplefilter("ignore", RuntimeWarning)
+
+    # synthetic_klines makes 1m bars by day; the row count is what matters here.
+    klines = synthetic_klines(-(-args.rows // 1440)).iloc[:args.rows]
+    with tempfile.TemporaryDirectory() as root:
+        csv_path = os.path.join(root, "klines.csv")
+        klines.assign(timestamp=pd.to_datetime(klines["timestamp"], unit="ms")).to_csv(csv_path, index=False)
+        store = KlineStore(os.path.join(root, "store"))
+        store.write("BTCUSDT", "1m", klines)
+        del klines
+        print(f"{args.rows} rows, chunks of {args.chunksize}")
+        for source, make in (("csv", lambda: MarketRegimeAnalyzer(csv_path, ["close", "volume"])),
+                             ("store", lambda: MarketRegimeAnalyzer(None, ["close", "volume"], store=store,
+                                                                    symbol="BTCUSDT", interval="1m"))):
+            whole, chunked = make(), make()
+            whole_peak, whole_seconds = measured(whole, None)
+            chunked_peak, chunked_seconds = measured(chunked, args.chunksize)
+            assert np.allclose(whole.features, chunked.features, rtol=1e-9, atol=1e-12)
+            assert chunked.features.flags.c_contiguous
+            print(f"{source:<6} whole frame  peak {whole_peak / 2 ** 20:8.1f} MiB  {whole_seconds:6.2f} s")
+            print(f"{source:<6} chunked      peak {chunked_peak / 2 ** 20:8.1f} MiB  {chunked_seconds:6.2f} s   "
+                  f"x{whole_peak / chunked_peak:.1f} less memory, features match")
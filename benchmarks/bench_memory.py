@@ -0,0 +1,103 @@
+"""
+Peak memory of the universe-wide microstructure features: a per-symbol pandas loop, the panel
+functions in float64, and the panel functions in float32 writing into one preallocated block.
+Also reports the float32 rounding error against float64 and projects the peaks to a full history.
+
+    python benchmarks/bench_memory.py --symbols 300 --rows 10000 --years 3
+"""
+import argparse
+import os
+import sys
+import tracemalloc
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from bench_panel_features import features, synthetic_universe
+
+MINUTES_PER_YEAR = 365 * 24 * 60
+
+
+def peak_bytes(func):
+    """Peak of the memory allocated while `func` runs, above what was allocated before it, and its result."""
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    result = func()
+    peak = tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+    return peak, result
+
+
+def loop_features(frames, window):
+    """Per-symbol functions column by column, kept as one DataFrame per feature."""
+    close = frames[0]
+    return {name: pd.DataFrame({column: per_symbol(*(x[column] if isinstance(x, pd.DataFrame) else x
+                                                     for x in inputs))
+                                for column in close.columns})
+            for name, (per_symbol, _, inputs) in features(*frames, window).items()}
+
+
+def panel_features(arrays, window, dtype):
+    """Panel functions, each allocating its own result."""
+    return {name: panel(*inputs, dtype=dtype)
+            for name, (_, panel, inputs) in features(*arrays, window).items()}
+
+
+def panel_features_into(arrays, window, block):
+    """Panel functions writing into consecutive slices of one preallocated block."""
+    results = {}
+    for out, (name, (_, panel, inputs)) in zip(block, features(*arrays, window).items()):
+        results[name] = panel(*inputs, out=out)
+    return results
+
+
+def relative_error(approximate, exact):
+    """Median and 99.9th percentile of |approximate - exact| / |exact| over the cells finite in both."""
+    approximate = approximate.astype(np.float64)
+    valid = np.isfinite(approximate) & np.isfinite(exact) & (exact != 0)
+    error = np.abs(approximate[valid] - exact[valid]) / np.abs(exact[valid])
+    return np.median(error), np.quantile(error, 0.999)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--symbols", type=int, default=300)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--window", type=int, default=20)
+    parser.add_argument("--years", type=float, default=3.0, help="history of 1m bars for the projection")
+    parser.add_argument("--ram-gb", type=float, default=16.0, help="memory budget for the projection")
+    args = parser.parse_args()
+    warnings.simplefilter("ignore", RuntimeWarning)  # log/divide of gaps and zero volumes
+
+    frames = synthetic_universe(args.symbols, args.rows)
+    arrays64 = [frame.to_numpy() for frame in frames]
+    arrays32 = [values.astype(np.float32) for values in arrays64]
+    n_features = len(features(*frames, args.window))
+    panel_features([values[:100] for values in arrays64], args.window, np.float64)  # compile the kernels
+    panel_features([values[:100] for values in arrays32], args.window, np.float32)
+
+    runs = {
+        "pandas loop, float64": lambda: loop_features(frames, args.window),
+        "panel, float64": lambda: panel_features(arrays64, args.window, np.float64),
+        "panel, float32 into out": lambda: panel_features_into(
+            arrays32, args.window, np.empty((n_features, args.rows, args.symbols), dtype=np.float32)),
+    }
+    cells = args.rows * args.symbols
+    full_cells = args.symbols * args.years * MINUTES_PER_YEAR
+    print(f"{args.rows} rows x {args.symbols} symbols, {n_features} features; projection to "
+          f"{args.years:g} years of 1m bars ({full_cells / 1e6:,.0f}M cells per feature)")
+    results = {}
+    for name, run in runs.items():
+        peak, results[name] = peak_bytes(run)
+        projected = peak / cells * full_cells / 2 ** 30
+        fits = "fits" if projected < args.ram_gb else "does not fit"
+        print(f"{name:<26} peak {peak / 2 ** 20:8.1f} MiB   {peak / cells:5.1f} B/cell   "
+              f"projected {projected:6.1f} GiB ({fits} in {args.ram_gb:g} GB)")
+
+    exact = results["panel, float64"]
+    for name, values in results["panel, float32 into out"].items():
+        median, tail = relative_error(values, exact[name])
+        print(f"float32 {name:<22} relative error median {median:.1e}   99.9% {tail:.1e}")
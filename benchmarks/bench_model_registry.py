@@ -0,0 +1,58 @@
+"""
+Start-up cost of the regime model with data.models.ModelRegistry: a fresh EM fit, reusing the
+stored model when the data is unchanged, and warm-starting EM from it after new candles arrive
+(against a fresh fit on the same, longer data).
+
+    python benchmarks/bench_model_registry.py --candles 50000 --new 1440
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_regime_filter import regime_candles
+from data.analysis import MarketRegimeAnalyzer
+from data.features import FeaturePipeline
+from data.models import ModelRegistry
+
+DEFINITION = {"features": MarketRegimeAnalyzer.FEATURES, "window": MarketRegimeAnalyzer.FEATURE_WINDOW}
+
+
+def timed_fit(registry, name, features, n_states, n_iter):
+    started = time.perf_counter()
+    model, metadata = registry.fit(name, features, n_states, DEFINITION, n_iter=n_iter)
+    return model, metadata, time.perf_counter() - started
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--candles", type=int, default=50_000)
+    parser.add_argument("--new", type=int, default=1440, help="candles appended before the warm start")
+    parser.add_argument("--states", type=int, default=3)
+    parser.add_argument("--n-iter", type=int, default=200, help="EM iteration cap (hmmlearn's default is 10)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="  %(message)s")
+
+    candles = regime_candles(args.candles + args.new)
+    features = FeaturePipeline(candles, window=DEFINITION["window"]).compute(DEFINITION["features"]).dropna()
+    features = features.to_numpy()
+    old, new = features[:-args.new], features
+    with tempfile.TemporaryDirectory() as root:
+        registry = ModelRegistry(root)
+        _, fresh, fresh_seconds = timed_fit(registry, "bench", old, args.states, args.n_iter)
+        _, reused, reuse_seconds = timed_fit(registry, "bench", old, args.states, args.n_iter)
+        assert reused["version"] == fresh["version"]
+        _, warm, warm_seconds = timed_fit(registry, "bench", new, args.states, args.n_iter)
+        assert warm["parent_version"] == fresh["version"], "warm start failed and fell back to a fresh fit"
+        _, cold, cold_seconds = timed_fit(ModelRegistry(os.path.join(root, "cold")), "bench", new, args.states, args.n_iter)
+
+    print(f"fresh fit ({len(old)} samples)       {fresh_seconds * 1e3:9.1f} ms   {fresh['em_iterations']:3d} EM iterations")
+    print(f"reuse (unchanged data)          {reuse_seconds * 1e3:9.1f} ms   x{fresh_seconds / reuse_seconds:,.0f}")
+    print(f"warm start (+{args.new} candles)      {warm_seconds * 1e3:9.1f} ms   {warm['em_iterations']:3d} EM iterations   "
+          f"log-likelihood {warm['log_likelihood']:,.1f}")
+    print(f"fresh fit on the same data      {cold_seconds * 1e3:9.1f} ms   {cold['em_iterations']:3d} EM iterations   "
+          f"log-likelihood {cold['log_likelihood']:,.1f}")
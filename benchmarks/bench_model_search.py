@@ -0,0 +1,44 @@
+"""
+Multi-restart HMM model-order search with data.models.search_models: wall time and fits per
+second for each pool size (the first size should be 1), and the comparison table.
+
+    python benchmarks/bench_model_search.py --candles 20000 --restarts 4 --workers 1 8 32
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from bench_regime_filter import regime_candles
+from data.analysis import MarketRegimeAnalyzer
+from data.features import FeaturePipeline
+from data.models import search_models
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--candles", type=int, default=20_000)
+    parser.add_argument("--restarts", type=int, default=4)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count()])
+    args = parser.parse_args()
+
+    candles = regime_candles(args.candles)
+    features = FeaturePipeline(candles, window=MarketRegimeAnalyzer.FEATURE_WINDOW).compute(
+        MarketRegimeAnalyzer.FEATURES).dropna().to_numpy()
+    print(f"{os.cpu_count()} cores, {len(features)} samples, states 2-4 x full/diag x {args.restarts} restarts")
+    tables = {}
+    baseline = None
+    for workers in args.workers:
+        started = time.perf_counter()
+        best, tables[workers] = search_models(features, restarts=args.restarts, max_workers=workers)
+        seconds = time.perf_counter() - started
+        baseline = baseline or seconds
+        print(f"{workers:>3} processes   {seconds:7.2f} s   {len(tables[workers]) / seconds:6.2f} fits/s   "
+              f"x{baseline / seconds:.1f} over the first")
+    first, *others = tables.values()
+    columns = ["n_states", "covariance_type", "seed", "holdout_bic"]
+    for table in others:
+        pd.testing.assert_frame_equal(first[columns], table[columns])  # same fits, same ranking
+    print(first.drop(columns=["error"]).head(10).to_string(float_format=lambda x: f"{x:,.1f}"))
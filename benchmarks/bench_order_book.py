@@ -0,0 +1,58 @@
+"""
+Measure diff-apply and query throughput of the local OrderBook replica.
+
+    python benchmarks/bench_order_book.py --levels 5000 --updates 200000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.order_book import OrderBook
+
+
+def synthetic_snapshot(levels, mid=30000.0, tick=0.01):
+    return {
+        "lastUpdateId": 1,
+        "bids": [[f"{mid - (i + 1) * tick:.2f}", "1.5"] for i in range(levels)],
+        "asks": [[f"{mid + (i + 1) * tick:.2f}", "1.5"] for i in range(levels)],
+    }
+
+
+def synthetic_diffs(n, levels, mid=30000.0, tick=0.01, per_event=10, seed=0):
+    rng = random.Random(seed)
+    events = []
+    for i in range(n):
+        bids = [[f"{mid - rng.randint(1, levels) * tick:.2f}", rng.choice(["0", "0.5", "2.0"])] for _ in range(per_event // 2)]
+        asks = [[f"{mid + rng.randint(1, levels) * tick:.2f}", rng.choice(["0", "0.5", "2.0"])] for _ in range(per_event // 2)]
+        events.append({"e": "depthUpdate", "s": "BTCUSDT", "U": i + 2, "u": i + 2, "b": bids, "a": asks})
+    return events
+
+
+def rate(label, n, func):
+    started = time.perf_counter()
+    for _ in range(n):
+        func()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<28} {n / elapsed:>12,.0f} ops/s  ({elapsed / n * 1e6:.2f} us/op)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--levels", type=int, default=5000)
+    parser.add_argument("--updates", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200_000)
+    args = parser.parse_args()
+
+    book = OrderBook("BTCUSDT")
+    book.apply_snapshot(synthetic_snapshot(args.levels))
+    events = iter(synthetic_diffs(args.updates, args.levels))
+
+    rate("apply_depth_update (10 lv)", args.updates, lambda: book.apply_depth_update(next(events)))
+    rate("best_bid + best_ask", args.queries, lambda: (book.best_bid(), book.best_ask()))
+    rate("mid_price", args.queries, book.mid_price)
+    rate("depth(20)", args.queries // 10, lambda: book.depth(20))
+    rate("vwap(BUY, 25)", args.queries // 10, lambda: book.vwap("BUY", 25.0))
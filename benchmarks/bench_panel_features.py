@@ -0,0 +1,76 @@
+"""
+Compute the microstructure features of a whole universe with the panel functions in
+data.timeseries, against a loop that calls the per-symbol functions column by column.
+
+    python benchmarks/bench_panel_features.py --symbols 300 --rows 10000
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from data import timeseries
+
+
+def synthetic_universe(symbols, rows, gap_fraction=0.001):
+    """Wide close/high/low/volume frames with random per-symbol gaps and late listings."""
+    rng = np.random.default_rng(0)
+    shape = (rows, symbols)
+    close = np.exp(np.cumsum(rng.normal(scale=0.002, size=shape), axis=0)) * rng.uniform(1, 1000, symbols)
+    spread = close * rng.uniform(0.0005, 0.005, size=shape)
+    volume = rng.uniform(0.0, 100.0, size=shape)
+    gaps = rng.random(shape) < gap_fraction
+    gaps[:rows // 10, :symbols // 10] = True  # listed later than the rest
+    columns = [f"SYM{i:03d}USDT" for i in range(symbols)]
+    frames = [pd.DataFrame(np.where(gaps, np.nan, values), columns=columns)
+              for values in (close, close + spread, close - spread, volume)]
+    return frames
+
+
+def features(close, high, low, volume, window):
+    return {
+        "kyles_lambda": (timeseries.kyles_lambda, timeseries.kyles_lambda_panel, (close, volume, window)),
+        "amihuds_lambda": (timeseries.amihuds_lambda, timeseries.amihuds_lambda_panel, (close, volume, window)),
+        "hasbroucks_lambda": (timeseries.hasbroucks_lambda, timeseries.hasbroucks_lambda_panel,
+                              (close, volume, window)),
+        "corwin_schultz_hl": (timeseries.corwin_schultz_hl, timeseries.corwin_schultz_hl_panel,
+                              (high, low, volume, window)),
+        "bekker_parkinson_vol": (timeseries.bekker_parkinson_vol, timeseries.bekker_parkinson_vol_panel,
+                                 (high, low, close, window)),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--symbols", type=int, default=300)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--window", type=int, default=20)
+    args = parser.parse_args()
+    warnings.simplefilter("ignore", RuntimeWarning)  # log/divide of gaps and zero volumes, in both paths
+
+    close, high, low, volume = synthetic_universe(args.symbols, args.rows)
+    print(f"{args.rows} rows x {args.symbols} symbols")
+    for _, panel, inputs in features(*(frame.iloc[:100] for frame in (close, high, low, volume)),
+                                     args.window).values():
+        panel(*inputs)  # compile the numba kernels outside the timings
+    loop_total = panel_total = 0.0
+    for name, (per_symbol, panel, inputs) in features(close, high, low, volume, args.window).items():
+        started = time.perf_counter()
+        looped = pd.DataFrame({column: per_symbol(*(x[column] if isinstance(x, pd.DataFrame) else x for x in inputs))
+                               for column in close.columns})
+        loop_seconds = time.perf_counter() - started
+        started = time.perf_counter()
+        result = panel(*inputs)
+        panel_seconds = time.perf_counter() - started
+        assert np.allclose(looped.to_numpy(), result.to_numpy(), equal_nan=True, rtol=1e-8), name
+        loop_total += loop_seconds
+        panel_total += panel_seconds
+        print(f"{name:<22} loop {loop_seconds * 1000:8.1f} ms   panel {panel_seconds * 1000:7.1f} ms   "
+              f"x{loop_seconds / panel_seconds:.1f}")
+    print(f"{'total':<22} loop {loop_total * 1000:8.1f} ms   panel {panel_total * 1000:7.1f} ms   "
+          f"x{loop_total / panel_total:.1f}, all columns match")
@@ -0,0 +1,71 @@
+"""
+Online regime inference with data.analysis.RegimeFilter against re-decoding the whole history
+with the trained HMM on every new candle, as predict_regimes would have to in live use.
+Filtered and fixed-lag smoothed posteriors are checked against hmmlearn's forward-backward
+posteriors of the history up to each candle.
+
+    python benchmarks/bench_regime_filter.py --candles 20000 --lag 10
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from hmmlearn.hmm import GaussianHMM
+from data.analysis import MarketRegimeAnalyzer, RegimeFilter
+from data.features import FeaturePipeline
+
+
+def regime_candles(n, seed=0):
+    """Candles from a 3-state Markov chain of volatility and volume regimes."""
+    rng = np.random.default_rng(seed)
+    transitions = np.cumsum([[0.995, 0.004, 0.001], [0.004, 0.992, 0.004], [0.002, 0.008, 0.990]], axis=1)
+    states = np.empty(n, dtype=int)
+    state = 0
+    for t, u in enumerate(rng.random(n)):
+        state = states[t] = np.searchsorted(transitions[state], u)
+    close = 30000.0 * np.exp(np.cumsum(rng.normal(scale=np.array([0.001, 0.003, 0.008])[states])))
+    volume = rng.gamma(4.0, np.array([2.5, 6.25, 15.0])[states])
+    return pd.DataFrame({"close": close, "volume": volume})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--candles", type=int, default=20_000)
+    parser.add_argument("--lag", type=int, default=10)
+    parser.add_argument("--checks", type=int, default=20, help="candles checked against hmmlearn")
+    args = parser.parse_args()
+
+    candles = regime_candles(args.candles)
+    window = MarketRegimeAnalyzer.FEATURE_WINDOW
+    features = FeaturePipeline(candles, window=window).compute(MarketRegimeAnalyzer.FEATURES).dropna().to_numpy()
+    model = GaussianHMM(n_components=3, covariance_type="full", random_state=42).fit(features)
+
+    regime_filter = RegimeFilter(model, window=window, lag=args.lag)
+    started = time.perf_counter()
+    posteriors = [regime_filter.update(close, volume) for close, volume in zip(candles["close"], candles["volume"])]
+    per_update = (time.perf_counter() - started) / len(candles)
+    filtered = np.array([posterior.filtered for posterior in posteriors])[window:]
+    if args.lag:
+        smoothed = np.array([posterior.smoothed for posterior in posteriors])[window + args.lag:]
+
+    for end in np.linspace(args.lag + 1, len(features), args.checks).astype(int):
+        expected = model.predict_proba(features[:end])
+        assert np.allclose(filtered[end - 1], expected[-1], atol=1e-9), end
+        if args.lag:
+            assert np.allclose(smoothed[end - 1 - args.lag], expected[-1 - args.lag], atol=1e-9), end
+
+    # Re-decoding: Viterbi over the whole history on every candle, timed at a few history lengths.
+    for history in (1_000, 10_000, len(features)):
+        started = time.perf_counter()
+        for _ in range(5):
+            model.predict(features[:history])
+        decode = (time.perf_counter() - started) / 5
+        print(f"history {history:>7}   re-decode {decode * 1e3:8.2f} ms/candle   "
+              f"filter {per_update * 1e6:6.1f} us/candle (lag {args.lag})   x{decode / per_update:,.0f}")
+    checked = f"filtered and lag-{args.lag} smoothed posteriors" if args.lag else "filtered posteriors"
+    print(f"{checked} match hmmlearn on {args.checks} prefixes")
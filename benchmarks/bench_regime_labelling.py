@@ -0,0 +1,87 @@
+"""
+Walk-forward regime labelling of a synthetic universe with data.regimes.label_regimes, against a
+Python loop that reads each symbol and fits every window in turn. Labels of both are compared,
+and the bytes each approach would pickle to worker processes are reported.
+
+    python benchmarks/bench_regime_labelling.py --symbols 16 --days 14 --workers 1 8 32
+"""
+import argparse
+import os
+import pickle
+import sys
+import tempfile
+import time
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from hmmlearn.hmm import GaussianHMM
+from bench_kline_store import synthetic_klines
+from bench_regime_filter import regime_candles
+from data.analysis import MarketRegimeAnalyzer
+from data.features import FeaturePipeline
+from data.preprocess import KLINE_COLUMNS, KLINE_DTYPES
+from data.regimes import read_regime_labels, label_regimes
+from data.storage import KlineStore
+
+
+def universe(store, symbols, days):
+    template = synthetic_klines(days)
+    for i in range(symbols):
+        candles = regime_candles(len(template), seed=i)
+        klines = template.assign(close=candles["close"].to_numpy(), volume=candles["volume"].to_numpy())
+        store.write(f"SYM{i:03d}USDT", "1m", klines[KLINE_COLUMNS].astype(KLINE_DTYPES))
+
+
+def loop_labels(store, symbol, train_window, predict_window):
+    """One symbol at a time in the calling process: the baseline."""
+    frame = store.read(symbol, "1m", columns=["timestamp", "close", "volume"])
+    features = FeaturePipeline(frame, window=MarketRegimeAnalyzer.FEATURE_WINDOW).compute(
+        MarketRegimeAnalyzer.FEATURES).dropna().to_numpy()
+    labels = np.full(len(features), -1, dtype=np.int8)
+    for start in range(0, len(features) - train_window, predict_window):
+        end = min(start + train_window + predict_window, len(features))
+        model = GaussianHMM(n_components=3, covariance_type="full", random_state=42)
+        model.fit(features[start:start + train_window])
+        rank = np.argsort(np.argsort(model.means_[:, 1]))
+        labels[start + train_window:end] = rank[model.predict(features[start + train_window:end])]
+    return frame, labels
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--symbols", type=int, default=16)
+    parser.add_argument("--days", type=int, default=14)
+    parser.add_argument("--train-window", type=int, default=4 * 1440)
+    parser.add_argument("--predict-window", type=int, default=1440)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count()])
+    args = parser.parse_args()
+    warnings.simplefilter("ignore")
+
+    with tempfile.TemporaryDirectory() as root:
+        store = KlineStore(os.path.join(root, "klines"))
+        universe(store, args.symbols, args.days)
+        symbols = [f"SYM{i:03d}USDT" for i in range(args.symbols)]
+
+        started = time.perf_counter()
+        expected = {symbol: loop_labels(store, symbol, args.train_window, args.predict_window) for symbol in symbols}
+        loop_seconds = time.perf_counter() - started
+        frame_bytes = sum(len(pickle.dumps(frame)) for frame, _ in expected.values())
+        print(f"{args.symbols} symbols x {args.days} days of 1m, train {args.train_window} / "
+              f"predict {args.predict_window} rows")
+        print(f"python loop           {loop_seconds:7.2f} s   (pickling the frames to workers: "
+              f"{frame_bytes / 2 ** 20:.1f} MiB)")
+
+        for workers in args.workers:
+            output = os.path.join(root, f"regimes_{workers}")
+            started = time.perf_counter()
+            summary = label_regimes(store, symbols, "1m", args.train_window, args.predict_window,
+                                    output_root=output, max_workers=workers)
+            seconds = time.perf_counter() - started
+            for symbol in symbols:
+                labels = read_regime_labels(output, symbol, "1m")["regime"].to_numpy()
+                assert np.array_equal(labels, expected[symbol][1]), symbol
+            print(f"label_regimes x{workers:<3}    {seconds:7.2f} s   x{loop_seconds / seconds:.1f}   "
+                  f"{summary['windows'].sum()} windows, {summary['failed_windows'].sum()} failed, labels match")
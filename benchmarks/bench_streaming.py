@@ -0,0 +1,81 @@
+"""
+Feed candles one at a time through the data.streaming states, check every output against the
+batch function in data.timeseries, and report the cost per update.
+
+    python benchmarks/bench_streaming.py --candles 5000
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from data import streaming, timeseries
+
+
+def synthetic_candles(n):
+    rng = np.random.default_rng(0)
+    close = pd.Series(np.exp(np.cumsum(rng.normal(scale=0.002, size=n))) * 30000.0)
+    spread = close * rng.uniform(0.0005, 0.002, size=n)
+    frame = pd.DataFrame({"close": close, "high": close + spread, "low": close - spread,
+                          "volume": rng.uniform(0.0, 100.0, size=n)})
+    frame.iloc[n // 3] = np.nan  # a missing candle
+    frame.loc[n // 2, "volume"] = 0.0
+    return frame
+
+
+def cases(candles, window):
+    close, high, low, volume = candles["close"], candles["high"], candles["low"], candles["volume"]
+    return {
+        "roll_measure": (streaming.RollMeasureState(window), ("close",),
+                         timeseries.roll_measure(close, window).reindex(candles.index)),
+        "roll_spread": (streaming.RollSpreadState(window), ("close",), timeseries.roll_spread(close, window)),
+        "corwin_schultz_hl": (streaming.CorwinSchultzState(window), ("high", "low", "volume"),
+                              timeseries.corwin_schultz_hl(high, low, volume, window)),
+        "bekker_parkinson_vol": (streaming.BekkerParkinsonState(window), ("high", "low", "close"),
+                                 timeseries.bekker_parkinson_vol(high, low, close, window)),
+        "kyles_lambda": (streaming.KylesLambdaState(window), ("close", "volume"),
+                         timeseries.kyles_lambda(close, volume, window)),
+        "kyles_lambda (expanding)": (streaming.KylesLambdaState(None), ("close", "volume"),
+                                     timeseries.kyles_lambda(close, volume, None)),
+        "amihuds_lambda": (streaming.AmihudsLambdaState(window), ("close", "volume"),
+                           timeseries.amihuds_lambda(close, volume, window)),
+        "amihuds_lambda (expanding)": (streaming.AmihudsLambdaState(None), ("close", "volume"),
+                                       timeseries.amihuds_lambda(close, volume, None)),
+        "hasbroucks_lambda": (streaming.HasbroucksLambdaState(window), ("close", "volume"),
+                              timeseries.hasbroucks_lambda(close, volume, window)),
+        "permutation_entropy": (streaming.PermutationEntropyState(4, 10 * window), ("close",),
+                                timeseries.rolling_permutation_entropy(close.ffill(), 4, 10 * window)),
+        "rolling_hurst": (streaming.RollingHurstState(10 * window), ("close",),
+                          timeseries.rolling_hurst(close.ffill(), 10 * window)),
+        "fractal_dimension": (streaming.FractalDimensionState(10 * window), ("close",),
+                              timeseries.rolling_fractal_dimension(close.ffill(), 10 * window)),
+    }
+
+
+def stream(state, columns):
+    rows = list(zip(*(columns[name].tolist() for name in columns)))
+    started = time.perf_counter()
+    out = [state.update(*row) for row in rows]
+    return np.array(out), (time.perf_counter() - started) / len(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--candles", type=int, default=5000)
+    parser.add_argument("--window", type=int, default=20)
+    args = parser.parse_args()
+    warnings.simplefilter("ignore", RuntimeWarning)  # gaps and zero volumes in the batch functions
+
+    candles = synthetic_candles(args.candles)
+    filled = candles.assign(close=candles["close"].ffill())
+    for name, (state, inputs, expected) in cases(candles, args.window).items():
+        source = filled if name in ("permutation_entropy", "rolling_hurst", "fractal_dimension") else candles
+        actual, seconds = stream(state, source[list(inputs)])
+        assert np.allclose(actual, expected.to_numpy(), rtol=1e-9, atol=1e-12, equal_nan=True), name
+        print(f"{name:<26} {seconds * 1e6:8.1f} us/update   matches batch")
+
@@ -0,0 +1,223 @@
+"""
+Compare data.timeseries features with the original implementations they replaced.
+
+    python benchmarks/bench_timeseries.py --n 1000000
+
+Slow baselines are timed on a prefix (--baseline-n) and extrapolated linearly.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numba as nb
+import numpy as np
+import pandas as pd
+from data import timeseries
+
+
+def baseline_permutation_entropy(timeseries, m):
+    n = len(timeseries)
+    permutations = np.zeros((m, m))
+    for i in range(n - m + 1):
+        subsequence = np.array(timeseries[i : i + m])
+        rank = np.argsort(subsequence, kind="stable").argsort(kind="stable")
+        permutations[rank, np.roll(rank, -1)] += 1
+    permutations = permutations / (n - m + 1)
+    permutations = permutations[np.nonzero(permutations)]
+    return -np.sum(permutations * np.log(permutations)) / np.log(m)
+
+
+@nb.njit
+def baseline_hurst(ts):
+    n = len(ts)
+    R = np.zeros(n)
+    for i in range(n):
+        R[i] = np.max(ts[: i + 1]) - np.min(ts[: i + 1])
+    R = np.mean(R)
+    lags = np.arange(2, n // 3)
+    tau = np.asarray(
+        [np.sqrt(np.std(np.subtract(ts[lag:], ts[:-lag]))) for lag in lags]
+    )
+    X = np.log(lags).reshape(-1, 1)
+    Y = np.log(tau).reshape(-1, 1)
+    coefficients, _, _, _ = np.linalg.lstsq(X, Y)
+    return coefficients[0] * 2.0
+
+
+@nb.njit
+def baseline_box_counting(ts, box_size):
+    # The original kernel wrote past the end when len(ts) % box_size != 0; the loop bound is fixed here.
+    N = len(ts)
+    boxes = np.zeros(N // box_size)
+    for i in range(0, N - N % box_size, box_size):
+        boxes[i // box_size] = np.max(ts[i : i + box_size]) - np.min(
+            ts[i : i + box_size]
+        )
+    return np.count_nonzero(boxes > 0)
+
+
+@nb.njit
+def baseline_box_counts(ts, n_box_sizes=10):
+    N = len(ts)
+    box_sizes = np.logspace(0, np.log10(N), n_box_sizes).astype(np.int32)
+    return np.array([baseline_box_counting(ts, bs) for bs in box_sizes])
+
+
+def baseline_roll_measure(close_prices, window):
+    # raw=True: with a Series argument, x[-1] is a label lookup and fails on current pandas.
+    close_prices = pd.Series(close_prices)
+    log_returns = np.log(close_prices).diff().dropna()
+    cum_returns = log_returns.cumsum()
+    return cum_returns.rolling(window).apply(lambda x: x[-1] - x[0], raw=True)
+
+
+def baseline_roll_spread(prices, window):
+    changes = pd.Series(prices).diff()
+    return 2.0 * np.sqrt(np.maximum(-changes.rolling(window).cov(changes.shift(1)), 0.0))
+
+
+def baseline_rolling_slope(y, x, window):
+    # One least-squares fit per window, the usual way a rolling price-impact regression is written.
+    out = np.full(len(y), np.nan)
+    for end in range(window, len(y) + 1):
+        ys, xs = y[end - window:end], x[end - window:end]
+        if np.isfinite(ys).all() and np.isfinite(xs).all():
+            out[end - 1] = np.polyfit(xs, ys, 1)[0]
+    return out
+
+
+def timed(func, *args, repeat=1):
+    func(*args)  # warm up (numba compilation, caches)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = func(*args)
+    return result, (time.perf_counter() - started) / repeat
+
+
+def report(name, baseline_seconds, new_seconds, note=""):
+    print(f"{name:<44} baseline {baseline_seconds:9.3f}s   new {new_seconds:8.4f}s   "
+          f"x{baseline_seconds / new_seconds:,.0f}{note}")
+
+
+def bench_permutation_entropy(series, baseline_n, m=4, window=500):
+    prefix = series[:baseline_n]
+    expected, base_seconds = timed(baseline_permutation_entropy, prefix, m)
+    actual, _ = timed(timeseries.permutation_entropy, prefix, m)
+    assert np.isclose(expected, actual), (expected, actual)
+    _, new_seconds = timed(timeseries.permutation_entropy, series, m)
+    report(f"permutation_entropy(m={m})", base_seconds * len(series) / baseline_n, new_seconds, " (extrapolated)")
+
+    # Rolling: the baseline is the batch function re-run on every window.
+    n_windows = 200
+    started = time.perf_counter()
+    for end in range(window, window + n_windows):
+        baseline_permutation_entropy(series[end - window:end], m)
+    per_window = (time.perf_counter() - started) / n_windows
+    _, new_seconds = timed(timeseries.rolling_permutation_entropy, series, m, window)
+    report(f"rolling_permutation_entropy(w={window})", per_window * (len(series) - window + 1), new_seconds,
+           " (extrapolated)")
+
+
+def bench_hurst(series, baseline_n, window=500, step=1):
+    prefix = series[:baseline_n]
+    expected, base_seconds = timed(baseline_hurst, prefix)
+    actual, new_seconds = timed(timeseries.hurst, prefix)
+    assert np.allclose(expected, actual), (expected, actual)
+    report(f"hurst(n={baseline_n})", base_seconds, new_seconds)
+
+    # Rolling: the baseline is the original kernel re-run on every evaluated window.
+    n_windows = 200
+    started = time.perf_counter()
+    for end in range(window, window + n_windows):
+        baseline_hurst(series[end - window:end])
+    per_window = (time.perf_counter() - started) / n_windows
+    rolled, new_seconds = timed(timeseries.rolling_hurst, series, window, step)
+    assert np.allclose(rolled[window - 1], baseline_hurst(series[:window])[0])
+    report(f"rolling_hurst(w={window}, step={step})", per_window * ((len(series) - window) // step + 1),
+           new_seconds, " (extrapolated)")
+
+
+def bench_fractal_dimension(series, window=1024, step=1, n_box_sizes=10):
+    levels = timeseries._box_levels(len(series), n_box_sizes)
+    expected = timeseries._dimension_from_counts(
+        levels, np.array([baseline_box_counting(series, 2 ** level) for level in levels]))
+    actual, new_seconds = timed(timeseries.fractal_dimension, series, n_box_sizes)
+    assert np.isclose(expected, actual), (expected, actual)
+    _, base_seconds = timed(baseline_box_counts, series, n_box_sizes)
+    report(f"fractal_dimension(n={len(series)})", base_seconds, new_seconds)
+
+    # Rolling: the baseline is the original per-size rescan on every evaluated window.
+    n_windows = 200
+    started = time.perf_counter()
+    for end in range(window, window + n_windows):
+        baseline_box_counts(series[end - window:end], n_box_sizes)
+    per_window = (time.perf_counter() - started) / n_windows
+    rolled, new_seconds = timed(timeseries.rolling_fractal_dimension, series, window, step, n_box_sizes)
+    assert np.isclose(rolled[window - 1], timeseries.fractal_dimension(series[:window], n_box_sizes))
+    report(f"rolling_fractal_dimension(w={window}, step={step})",
+           per_window * ((len(series) - window) // step + 1), new_seconds, " (extrapolated)")
+
+
+def bench_roll(series, baseline_n, n_symbols=50, window=100):
+    prefix = pd.Series(np.exp(series[:baseline_n] / series.max()))
+    expected, base_seconds = timed(baseline_roll_measure, prefix, window)
+    actual, _ = timed(timeseries.roll_measure, prefix, window)
+    assert np.allclose(expected, actual, equal_nan=True)
+    _, new_seconds = timed(timeseries.roll_measure, np.exp(series / series.max()), window)
+    report(f"roll_measure(w={window})", base_seconds * len(series) / baseline_n, new_seconds, " (extrapolated)")
+
+    # Panel: one call over a (time x symbol) array against a pandas pipeline per symbol.
+    rows = len(series) // n_symbols
+    panel = series[:rows * n_symbols].reshape(n_symbols, rows).T
+    started = time.perf_counter()
+    expected = np.column_stack([baseline_roll_spread(panel[:, k], window) for k in range(n_symbols)])
+    base_seconds = time.perf_counter() - started
+    actual, new_seconds = timed(timeseries.roll_spread, panel, window)
+    assert np.allclose(expected, actual, equal_nan=True)
+    report(f"roll_spread({rows}x{n_symbols}, w={window})", base_seconds, new_seconds)
+
+
+def bench_price_impact(series, baseline_n, window=100):
+    close = np.exp(series / series.max())
+    volume = np.random.default_rng(1).uniform(0.0, 100.0, size=len(series))
+    changes = np.diff(close, prepend=np.nan)
+    signed_volume = timeseries._tick_signs(changes) * volume
+    expected, base_seconds = timed(baseline_rolling_slope, changes[:baseline_n], signed_volume[:baseline_n], window)
+    actual, _ = timed(timeseries.kyles_lambda, close[:baseline_n], volume[:baseline_n], window)
+    assert np.allclose(expected, actual, equal_nan=True)
+    _, new_seconds = timed(timeseries.kyles_lambda, close, volume, window)
+    report(f"kyles_lambda(w={window})", base_seconds * len(series) / baseline_n, new_seconds, " (extrapolated)")
+
+    # Expanding: the baseline refits all bars so far on every new bar; 50 refits are timed and
+    # the quadratic total is extrapolated.
+    abs_returns = np.abs(np.diff(np.log(close), prepend=np.nan))
+    dollar_volume = close * volume
+    ends = np.linspace(3, baseline_n, 50).astype(int)
+    started = time.perf_counter()
+    for end in ends:
+        np.polyfit(dollar_volume[1:end], abs_returns[1:end], 1)
+    per_bar = (time.perf_counter() - started) / ends.sum()
+    expanding, new_seconds = timed(timeseries.amihuds_lambda, close, volume, None)
+    refit = np.polyfit(dollar_volume[1:baseline_n], abs_returns[1:baseline_n], 1)[0]
+    assert np.isclose(expanding[baseline_n - 1], refit)
+    # Causal: appending bars does not change earlier values.
+    assert np.array_equal(timeseries.amihuds_lambda(close[:baseline_n], volume[:baseline_n], None),
+                          expanding[:baseline_n], equal_nan=True)
+    report("amihuds_lambda(expanding)", per_bar * len(series) * (len(series) + 1) / 2, new_seconds, " (extrapolated)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=1_000_000)
+    parser.add_argument("--baseline-n", type=int, default=20_000)
+    args = parser.parse_args()
+
+    series = np.cumsum(np.random.default_rng(0).normal(size=args.n)) + 1000.0
+    bench_permutation_entropy(series, min(args.baseline_n, args.n))
+    bench_hurst(series, min(args.baseline_n, args.n))
+    bench_fractal_dimension(series)
+    bench_roll(series, min(args.baseline_n, args.n))
+    bench_price_impact(series, min(args.baseline_n, args.n))
@@ -0,0 +1,62 @@
+"""
+Measure end-to-end publish latency and throughput of BinanceWebSocketStream against the
+local stand-in server, including reconnects after dropped connections.
+
+    python benchmarks/bench_websocket.py --symbols 50 --seconds 5
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from connections.websocket import BinanceWebSocketStream
+from stub_ws_server import start_stub_ws_server
+
+
+async def main(args):
+    server, base_url = await start_stub_ws_server(rate=args.rate, drop_after=args.drop_after)
+    symbols = [f"SYM{i}USDT" for i in range(args.symbols)]
+    stream = BinanceWebSocketStream.for_symbols(symbols, base_url=base_url,
+                                                max_streams_per_connection=args.streams_per_connection)
+    latencies, counts = [], {"kline": 0, "trade": 0}
+
+    def on_trade(trade):
+        counts["trade"] += 1
+        latencies.append(time.time() * 1000 - trade.trade_time)
+
+    def on_kline(kline):
+        counts["kline"] += 1
+
+    stream.subscribe("trade", on_trade)
+    stream.subscribe("kline", on_kline)
+
+    task = asyncio.create_task(stream.run())
+    await asyncio.sleep(args.seconds)
+    await stream.stop()
+    await task
+    server.close()
+
+    latencies.sort()
+    print(f"connections={len(range(0, len(stream.streams), args.streams_per_connection))} "
+          f"trades={counts['trade']} closed_klines={counts['kline']} "
+          f"msgs/s={(counts['trade'] + counts['kline'] * 10) / args.seconds:.0f}")
+    if latencies:
+        print(f"trade latency p50={statistics.median(latencies):.2f}ms "
+              f"p99={latencies[int(len(latencies) * 0.99) - 1]:.2f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--symbols", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--rate", type=float, default=2000, help="Messages per second per connection.")
+    parser.add_argument("--drop-after", type=int, default=3000, help="Server closes connections after this many messages.")
+    parser.add_argument("--streams-per-connection", type=int, default=40)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(main(args))
@@ -0,0 +1,133 @@
+"""
+Local stand-in for the Binance REST API used by the benchmarks.
+
+Serves deterministic synthetic klines so fetchers can be exercised offline:
+
+    python benchmarks/stub_server.py --port 8000 --latency 0.02
+
+and point a fetcher at it with `BinanceDataFetcher(base_url="http://127.0.0.1:8000/api")`.
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+INTERVAL_MS = {
+    "1m": 60 * 1000, "3m": 3 * 60 * 1000, "5m": 5 * 60 * 1000, "15m": 15 * 60 * 1000,
+    "30m": 30 * 60 * 1000, "1h": 60 * 60 * 1000, "2h": 2 * 60 * 60 * 1000,
+    "4h": 4 * 60 * 60 * 1000, "6h": 6 * 60 * 60 * 1000, "8h": 8 * 60 * 60 * 1000,
+    "12h": 12 * 60 * 60 * 1000, "1d": 24 * 60 * 60 * 1000,
+}
+
+STUB_BASE_ASSETS = ["BTC", "ETH", "BNB", "SOL", "XRP", "ADA", "DOGE", "TRX", "LTC", "DOT"]
+
+
+def make_kline(open_time, interval_ms):
+    """Build one deterministic kline row in the exchange's wire format."""
+    base = 30000.0 + (open_time // interval_ms) % 1000
+    return [
+        open_time, f"{base:.2f}", f"{base + 5:.2f}", f"{base - 5:.2f}", f"{base + 1:.2f}",
+        "12.50000000", open_time + interval_ms - 1, f"{base * 12.5:.8f}", 100,
+        "6.25000000", f"{base * 6.25:.8f}", "0",
+    ]
+
+
+class WeightCounter:
+    """Tracks used request weight per wall-clock minute, like the exchange does per IP."""
+    def __init__(self, limit):
+        self.limit = limit
+        self.minute = None
+        self.used = 0
+        self.lock = threading.Lock()
+
+    def charge(self, weight):
+        with self.lock:
+            minute = int(time.time() // 60)
+            if minute != self.minute:
+                self.minute, self.used = minute, 0
+            self.used += weight
+            return self.used
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    latency = 0.0
+    weights = WeightCounter(limit=None)
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, payload, status=200, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.latency:
+            time.sleep(self.latency)
+        used = self.weights.charge(2 if "/klines" in self.path else 1)
+        if self.weights.limit is not None and used > self.weights.limit:
+            self._send_json({"code": -1003, "msg": "Too many requests."}, status=429,
+                            headers={"Retry-After": "1", "X-MBX-USED-WEIGHT-1M": str(used)})
+            return
+        self._used_weight_header = {"X-MBX-USED-WEIGHT-1M": str(used)}
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+
+        if url.path.endswith("/v3/ping"):
+            self._send_json({}, headers=self._used_weight_header)
+        elif url.path.endswith("/v3/time"):
+            self._send_json({"serverTime": int(time.time() * 1000)}, headers=self._used_weight_header)
+        elif url.path.endswith("/v3/exchangeInfo"):
+            symbols = [{"symbol": f"{base}{quote}", "baseAsset": base, "quoteAsset": quote, "status": "TRADING"}
+                       for base in STUB_BASE_ASSETS for quote in ("USDT", "BTC") if base != quote]
+            self._send_json({"timezone": "UTC", "symbols": symbols}, headers=self._used_weight_header)
+        elif url.path.endswith("/v3/klines"):
+            interval_ms = INTERVAL_MS[params.get("interval", "1m")]
+            limit = min(int(params.get("limit", 500)), 1000)
+            start_time = int(params.get("startTime", 0))
+            end_time = int(params.get("endTime", start_time + limit * interval_ms - 1))
+            first_open = -(-start_time // interval_ms) * interval_ms
+            open_times = range(first_open, end_time + 1, interval_ms)[:limit]
+            self._send_json([make_kline(open_time, interval_ms) for open_time in open_times],
+                            headers=self._used_weight_header)
+        else:
+            self._send_json({"code": -1, "msg": f"Unknown path {url.path}"}, status=404)
+
+
+def start_stub_server(port=0, latency=0.0, weight_limit=None):
+    """
+    Start the stub server on a background thread.
+    :param port: Port to bind (0 picks a free port).
+    :param latency: Artificial delay in seconds added to every response.
+    :param weight_limit: Used weight per minute above which the server answers 429 (default: unlimited).
+    :return: (server, base_url) where base_url can be passed to BinanceClient.
+    """
+    handler = type("ConfiguredStubHandler", (StubHandler,),
+                   {"latency": latency, "weights": WeightCounter(weight_limit)})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/api"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--weight-limit", type=int, default=None)
+    args = parser.parse_args()
+    server, base_url = start_stub_server(args.port, args.latency, args.weight_limit)
+    print(f"Stub Binance API listening on {base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,75 @@
+"""
+Local stand-in for the Binance combined-stream WebSocket endpoint.
+
+Publishes synthetic kline and trade events for whatever `?streams=` a client asks for,
+and can drop connections periodically to exercise reconnects:
+
+    python benchmarks/stub_ws_server.py --port 8765 --rate 1000 --drop-after 5000
+"""
+import argparse
+import asyncio
+import json
+import time
+from urllib.parse import parse_qs, urlparse
+
+import websockets
+
+
+def kline_event(symbol, interval, open_time, closed):
+    return {"e": "kline", "E": int(time.time() * 1000), "s": symbol, "k": {
+        "t": open_time, "T": open_time + 59_999, "s": symbol, "i": interval, "o": "30000.00", "c": "30001.00",
+        "h": "30005.00", "l": "29995.00", "v": "12.5", "n": 100, "x": closed, "q": "375000.0",
+        "V": "6.25", "Q": "187500.0", "B": "0"}}
+
+
+def trade_event(symbol, trade_id):
+    now = int(time.time() * 1000)
+    return {"e": "trade", "E": now, "s": symbol, "t": trade_id, "p": "30000.50", "q": "0.01",
+            "T": now, "m": trade_id % 2 == 0, "M": True}
+
+
+def make_handler(rate, drop_after):
+    async def handler(connection):
+        streams = parse_qs(urlparse(connection.request.path).query).get("streams", [""])[0].split("/")
+        interval_sleep = 1.0 / rate if rate else 0
+        for sequence in range(drop_after or 10 ** 12):
+            stream = streams[sequence % len(streams)]
+            symbol, kind = stream.split("@", 1)
+            if kind.startswith("kline_"):
+                data = kline_event(symbol.upper(), kind[len("kline_"):], sequence * 60_000, sequence % 10 == 0)
+            else:
+                data = trade_event(symbol.upper(), sequence)
+            try:
+                await connection.send(json.dumps({"stream": stream, "data": data}))
+            except websockets.exceptions.ConnectionClosed:
+                return
+            if interval_sleep:
+                await asyncio.sleep(interval_sleep)
+    return handler
+
+
+async def start_stub_ws_server(port=0, rate=1000, drop_after=None):
+    """
+    Start the stand-in server on the running event loop.
+    :param port: Port to bind (0 picks a free port).
+    :param rate: Messages per second sent on each connection (0 sends as fast as possible).
+    :param drop_after: Close each connection after this many messages (default: never).
+    :return: (server, base_url) where base_url can be passed to BinanceWebSocketStream.
+    """
+    server = await websockets.serve(make_handler(rate, drop_after), "127.0.0.1", port, compression=None)
+    port = next(iter(server.sockets)).getsockname()[1]
+    return server, f"ws://127.0.0.1:{port}/stream"
+
+
+async def main(args):
+    server, base_url = await start_stub_ws_server(args.port, args.rate, args.drop_after)
+    print(f"Stub Binance streams listening on {base_url}")
+    await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rate", type=float, default=1000)
+    parser.add_argument("--drop-after", type=int, default=None)
+    asyncio.run(main(parser.parse_args()))
@@ -14,6 +14,8 @@ BINANCE_WS_URL = "wss://stream.binance.com:9443/ws"  # For WebSocket
 
 # Trading Configuration
 TRADING_PAIR = "BTCUSDT"  # Default trading pair
+TRADING_PAIRS = [TRADING_PAIR]  # Symbols synced by the multi-symbol fetch API
+UNIVERSE_QUOTE_ASSET = "USDT"  # Quote asset used to select the universe from exchangeInfo
 TIMEFRAME = "1m"  # Default candlestick interval (e.g., 1m, 5m, 1h, 1d)
 RISK_PER_TRADE = 0.01  # Risk per trade as a percentage of account balance
 MAX_OPEN_TRADES = 5  # Maximum number of open trades at a time
@@ -36,6 +38,14 @@ LOG_LEVEL = "INFO"  # Logging level: DEBUG, INFO, WARNING, ERROR
 # Data Storage
 DATA_DIR = "data/"  # Directory for storing fetched data
 HISTORICAL_DATA_FILE = f"{DATA_DIR}historical_data_{TRADING_PAIR}.csv"
+KLINE_STORE_DIR = f"{DATA_DIR}klines/"  # Root of the partitioned Arrow IPC (Feather) kline store
+MODEL_STORE_DIR = f"{DATA_DIR}models/"  # Root of the versioned HMM model registry
+REGIME_STORE_DIR = f"{DATA_DIR}regimes/"  # Root of the walk-forward regime label files
+MODEL_SEARCH_MAX_WORKERS = None  # Processes for the HMM restart/model-order search (None: all cores)
+REGIME_LABEL_MAX_WORKERS = None  # Processes for walk-forward regime labelling (None: all cores)
+
+# Feature Computation
+FEATURE_DTYPE = "float64"  # dtype of computed features; "float32" halves their memory
 
 # Environment
 USE_TESTNET = False  # Switch between Binance Testnet and Live environment
@@ -44,6 +54,32 @@ if USE_TESTNET:
     BINANCE_BASE_URL = "https://testnet.binance.vision/api"
     BINANCE_WS_URL = "wss://testnet.binance.vision/ws"
 
+# WebSocket Streaming
+BINANCE_WS_STREAM_URL = BINANCE_WS_URL.rsplit("/ws", 1)[0] + "/stream"  # Combined streams endpoint
+WS_MAX_STREAMS_PER_CONNECTION = 200  # Streams multiplexed per connection (exchange maximum: 1024)
+WS_RECONNECT_MAX_DELAY = 60  # Upper bound in seconds for the reconnect backoff
+ORDER_BOOK_SNAPSHOT_LIMIT = 5000  # Levels per side in the REST depth snapshot
+ORDER_BOOK_UPDATE_SPEED = "100ms"  # Depth diff stream speed: "100ms" or "1000ms"
+ORDER_BOOK_RESYNC_DELAY = 1  # Seconds before refetching a failed or stale snapshot (doubles on each retry)
+ORDER_BOOK_RESYNC_MAX_DELAY = 60  # Upper bound in seconds for the snapshot retry backoff
+
+# Rate Limiting and Backfill
+BINANCE_WEIGHT_LIMIT_PER_MINUTE = 6000  # Spot REST request-weight limit per IP
+BINANCE_OPTIONS_WEIGHT_LIMIT_PER_MINUTE = 400  # Options (eapi) REST request-weight limit per IP
+BINANCE_WEIGHT_SAFETY_MARGIN = 0.9  # Fraction of the exchange limit the process may use
+BINANCE_RATE_LIMIT_MAX_RETRIES = 5  # Retries after a 429/418 response before giving up
+BACKFILL_MAX_WORKERS = 8  # Concurrent windows fetched during historical backfill
+
+# HTTP Sessions
+HTTP_TIMEOUT = (3.05, 30)  # Default (connect, read) timeout in seconds for REST calls
+HTTP_POOL_SIZE = 10  # Kept-alive connections per host when no explicit size is set
+HTTP_HOST_POOL_SIZES = {  # Per-host connection pool sizes
+    "api.binance.com": 20,
+    "eapi.binance.com": 10,
+    "tradeapi.samco.in": 4,
+    "api.stocknote.com": 4,
+}
+
 # Task Scheduling
 FETCH_INTERVAL = 60  # Interval for fetching new data in seconds
 CLEANUP_INTERVAL = 86400  # Interval for cleaning up old data in seconds
\ No newline at end of file
@@ -1,11 +1,51 @@
 import os
+import threading
+from urllib.parse import urlparse
 from binance.client import Client
-from config.settings import BINANCE_API_KEY, BINANCE_SECRET_KEY, USE_TESTNET
+from binance.exceptions import BinanceAPIException
+from config.settings import BINANCE_API_KEY, BINANCE_SECRET_KEY, USE_TESTNET, BINANCE_RATE_LIMIT_MAX_RETRIES
+from connections.rate_limiter import get_rate_limiter, endpoint_weight, retry_after_seconds
+from connections.session import configure_session
+
+
+class ThrottledClient(Client):
+    """
+    python-binance Client that charges every request against a shared weight limiter,
+    reconciles the limiter with the exchange's used-weight headers and backs off on 429/418.
+    """
+    def __init__(self, *args, limiter=None, **kwargs):
+        # The limiter must exist before Client.__init__ pings the API.
+        self.limiter = limiter or get_rate_limiter()
+        super().__init__(*args, **kwargs)
+        self.session.hooks["response"].append(self._on_response)
+
+    def _init_session(self):
+        return configure_session(super()._init_session())
+
+    def _on_response(self, response, *args, **kwargs):
+        self.limiter.update_from_headers(response.headers)
+
+    def _request(self, method, uri, signed, force_params=False, **kwargs):
+        weight = endpoint_weight(urlparse(uri).path, kwargs.get("data"))
+        for attempt in range(BINANCE_RATE_LIMIT_MAX_RETRIES + 1):
+            self.limiter.acquire(weight)
+            attempt_kwargs = dict(kwargs)
+            if isinstance(kwargs.get("data"), dict):
+                attempt_kwargs["data"] = dict(kwargs["data"])
+            try:
+                return super()._request(method, uri, signed, force_params, **attempt_kwargs)
+            except BinanceAPIException as e:
+                if e.status_code not in (429, 418) or attempt == BINANCE_RATE_LIMIT_MAX_RETRIES:
+                    raise
+                self.limiter.backoff(retry_after_seconds(e.response.headers, attempt))
+
 
 class BinanceClient:
-    def __init__(self):
+    def __init__(self, base_url=None, limiter=None):
         """
         Initializes the Binance API client using settings from config/settings.py.
+        :param base_url: Override for the REST API root (e.g., 'http://127.0.0.1:8000/api' for a local stub).
+        :param limiter: Rate limiter shared with other REST callers (default: the process-wide spot limiter).
         """
         self.api_key = BINANCE_API_KEY
         self.api_secret = BINANCE_SECRET_KEY
@@ -16,14 +56,34 @@ class BinanceClient:
 
         # Set base URLs for testnet or live environment
         self.base_url = "https://testnet.binance.vision/api" if self.use_testnet else "https://api.binance.com"
+        if base_url:
+            self.base_url = base_url
 
-        # Initialize REST API client
-        self.client = Client(api_key=self.api_key, api_secret=self.api_secret)
-        if self.use_testnet:
+        # Initialize REST API client (skip the ping against the live API when the URL is overridden)
+        self.client = ThrottledClient(api_key=self.api_key, api_secret=self.api_secret,
+                                      ping=base_url is None, limiter=limiter)
+        if self.use_testnet or base_url:
             self.client.API_URL = self.base_url
+        self._local = threading.local()
+        self._local.client = self.client
 
         print(f"Initialized Binance Client (Testnet: {self.use_testnet})")
 
+    def thread_client(self):
+        """
+        python-binance Client of the calling thread. Client._request stores each response on the
+        instance before decoding it, so threads sharing one Client could read each other's
+        responses. Thread clients share this client's pooled session, endpoint and limiter.
+        """
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = ThrottledClient(api_key=self.api_key, api_secret=self.api_secret, ping=False,
+                                     limiter=self.client.limiter)
+            client.API_URL = self.client.API_URL
+            client.session = self.client.session
+            self._local.client = client
+        return client
+
     # ---------------------------
     # General Endpoints
     # ---------------------------
@@ -0,0 +1,179 @@
+import logging
+import threading
+import time
+from config.settings import (
+    BINANCE_WEIGHT_LIMIT_PER_MINUTE,
+    BINANCE_OPTIONS_WEIGHT_LIMIT_PER_MINUTE,
+    BINANCE_WEIGHT_SAFETY_MARGIN,
+)
+
+logger = logging.getLogger(__name__)
+
+# Request weight per REST endpoint (see the "Weight" field of each endpoint in the Binance API docs).
+# Endpoints whose weight depends on a parameter map to a function of the request params.
+ENDPOINT_WEIGHTS = {
+    "/api/v3/ping": 1,
+    "/api/v3/time": 1,
+    "/api/v3/exchangeInfo": 20,
+    "/api/v3/klines": 2,
+    "/api/v3/uiKlines": 2,
+    "/api/v3/trades": 25,
+    "/api/v3/aggTrades": 2,
+    "/api/v3/depth": lambda params: _depth_weight(int(params.get("limit", 100))),
+    "/api/v3/ticker/price": lambda params: 2 if params.get("symbol") else 4,
+    "/api/v3/ticker/24hr": lambda params: 2 if params.get("symbol") else 80,
+    "/api/v3/account": 20,
+    "/api/v3/myTrades": 20,
+    "/api/v3/order": 1,
+    "/api/v3/openOrders": lambda params: 6 if params.get("symbol") else 80,
+    "/eapi/v1/exchangeInfo": 1,
+    "/eapi/v1/mark": 5,
+    "/eapi/v1/klines": 1,
+    "/eapi/v1/trades": 5,
+}
+DEFAULT_ENDPOINT_WEIGHT = 1
+USED_WEIGHT_HEADER = "X-MBX-USED-WEIGHT-1M"
+
+
+def _depth_weight(limit):
+    if limit <= 100:
+        return 5
+    if limit <= 500:
+        return 25
+    if limit <= 1000:
+        return 50
+    return 250
+
+
+def endpoint_weight(path, params=None):
+    """
+    Look up the request weight of a REST endpoint.
+    :param path: URL path of the endpoint (e.g., '/api/v3/klines').
+    :param params: Request parameters, used by endpoints whose weight depends on them.
+    :return: Weight the request counts against the IP limit.
+    """
+    weight = ENDPOINT_WEIGHTS.get(path, DEFAULT_ENDPOINT_WEIGHT)
+    if callable(weight):
+        weight = weight(params or {})
+    return weight
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket shared by every caller that talks to the same API.
+    Callers block in `acquire` until enough tokens have refilled, so throttling
+    is enforced once per process instead of with per-call sleeps.
+
+    Tokens are request weight: the bucket holds one minute of the exchange limit
+    and is reconciled against the `X-MBX-USED-WEIGHT-1M` header the exchange returns,
+    which also accounts for other processes sharing the same IP.
+    """
+    def __init__(self, rate, capacity=None):
+        """
+        :param rate: Tokens added to the bucket per second.
+        :param capacity: Maximum burst size (default: one second worth of tokens).
+        """
+        if rate <= 0:
+            raise ValueError("Rate must be positive.")
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def per_minute(cls, weight_limit, safety_margin=BINANCE_WEIGHT_SAFETY_MARGIN):
+        """
+        Build a limiter for an exchange weight limit expressed per minute.
+        :param weight_limit: Weight allowed per minute by the exchange.
+        :param safety_margin: Fraction of the limit the process is allowed to use.
+        """
+        budget = weight_limit * safety_margin
+        return cls(rate=budget / 60.0, capacity=budget)
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+        return now
+
+    def acquire(self, tokens=1):
+        """
+        Block until `tokens` are available, then consume them.
+        :param tokens: Number of tokens (request weight) the call costs.
+        """
+        if tokens > self.capacity:
+            raise ValueError(f"Cannot acquire {tokens} tokens from a bucket of capacity {self.capacity}.")
+        while True:
+            with self._lock:
+                now = self._refill()
+                if now < self._blocked_until:
+                    wait = self._blocked_until - now
+                elif self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                else:
+                    wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def update_from_headers(self, headers):
+        """
+        Reconcile the bucket with the weight the exchange reports as already used.
+        :param headers: Response headers (case-insensitive mapping or plain dict).
+        """
+        used = None
+        for key, value in headers.items():
+            if key.upper() == USED_WEIGHT_HEADER:
+                used = value
+                break
+        if used is None:
+            return
+        try:
+            used = float(used)
+        except ValueError:
+            return
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, max(self.capacity - used, 0.0))
+
+    def backoff(self, retry_after):
+        """
+        Block every caller for `retry_after` seconds (used on HTTP 429/418).
+        :param retry_after: Seconds to wait, usually taken from the `Retry-After` header.
+        """
+        logger.warning(f"Rate limit hit, backing off for {retry_after} seconds.")
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+            self._tokens = 0.0
+
+
+def retry_after_seconds(headers, attempt):
+    """
+    Seconds to wait after a 429/418 response.
+    :param headers: Response headers.
+    :param attempt: Zero-based retry attempt, used for exponential backoff when no header is present.
+    """
+    try:
+        return float(headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return float(2 ** attempt)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+_LIMIT_POOLS = {
+    "spot": BINANCE_WEIGHT_LIMIT_PER_MINUTE,
+    "options": BINANCE_OPTIONS_WEIGHT_LIMIT_PER_MINUTE,
+}
+
+
+def get_rate_limiter(pool="spot"):
+    """
+    Return the process-wide limiter for an exchange limit pool.
+    :param pool: 'spot' for api.binance.com or 'options' for eapi.binance.com.
+    """
+    with _limiters_lock:
+        if pool not in _limiters:
+            _limiters[pool] = RateLimiter.per_minute(_LIMIT_POOLS[pool])
+        return _limiters[pool]
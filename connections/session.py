@@ -0,0 +1,58 @@
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from config.settings import HTTP_TIMEOUT, HTTP_POOL_SIZE, HTTP_HOST_POOL_SIZES
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter with a keep-alive connection pool and a default timeout,
+    so no request can hang forever when the caller forgets to pass one.
+    """
+    def __init__(self, pool_size=HTTP_POOL_SIZE, timeout=HTTP_TIMEOUT, **kwargs):
+        """
+        :param pool_size: Maximum number of kept-alive connections per host.
+        :param timeout: Default (connect, read) timeout in seconds.
+        """
+        self.timeout = timeout
+        super().__init__(pool_connections=pool_size, pool_maxsize=pool_size, **kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().send(request, **kwargs)
+
+
+def configure_session(session, pool_sizes=None, default_pool_size=HTTP_POOL_SIZE, timeout=HTTP_TIMEOUT):
+    """
+    Mount pooled, timeout-aware adapters on an existing session.
+    :param session: requests.Session to configure (e.g., the one owned by python-binance).
+    :param pool_sizes: Mapping of host to pool size (default: HTTP_HOST_POOL_SIZES).
+    :param default_pool_size: Pool size for hosts without an explicit entry.
+    :param timeout: Default (connect, read) timeout in seconds.
+    :return: The configured session.
+    """
+    session.mount("http://", TimeoutHTTPAdapter(default_pool_size, timeout))
+    session.mount("https://", TimeoutHTTPAdapter(default_pool_size, timeout))
+    for host, pool_size in (pool_sizes if pool_sizes is not None else HTTP_HOST_POOL_SIZES).items():
+        session.mount(f"https://{host}", TimeoutHTTPAdapter(pool_size, timeout))
+    session.headers.update({"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"})
+    return session
+
+
+def create_session(**kwargs):
+    """Create a new pooled session; keyword arguments are passed to `configure_session`."""
+    return configure_session(requests.Session(), **kwargs)
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Return the process-wide pooled session shared by all REST fetchers."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = create_session()
+        return _session
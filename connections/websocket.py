@@ -0,0 +1,168 @@
+import asyncio
+import logging
+from collections import namedtuple
+import websockets
+from config.settings import BINANCE_WS_STREAM_URL, WS_MAX_STREAMS_PER_CONNECTION, WS_RECONNECT_MAX_DELAY
+
+try:
+    import orjson as _json  # Several times faster than the standard library on small messages.
+except ImportError:
+    import json as _json
+
+logger = logging.getLogger(__name__)
+
+Kline = namedtuple("Kline", [
+    "symbol", "interval", "open_time", "open", "high", "low", "close", "volume",
+    "close_time", "quote_asset_volume", "number_of_trades", "taker_buy_base", "taker_buy_quote", "is_closed",
+])
+Trade = namedtuple("Trade", ["symbol", "trade_id", "price", "quantity", "trade_time", "is_buyer_maker"])
+
+
+def parse_kline(data):
+    """
+    Convert a `kline` stream event into a Kline.
+    :param data: Decoded event payload (the 'data' field of a combined stream message).
+    """
+    k = data["k"]
+    return Kline(data["s"], k["i"], k["t"], float(k["o"]), float(k["h"]), float(k["l"]), float(k["c"]),
+                 float(k["v"]), k["T"], float(k["q"]), k["n"], float(k["V"]), float(k["Q"]), k["x"])
+
+
+def parse_trade(data):
+    """
+    Convert a `trade` stream event into a Trade.
+    :param data: Decoded event payload (the 'data' field of a combined stream message).
+    """
+    return Trade(data["s"], data["t"], float(data["p"]), float(data["q"]), data["T"], data["m"])
+
+
+class BinanceWebSocketStream:
+    """
+    asyncio consumer for Binance combined streams.
+
+    Streams are sharded over as many connections as needed, each connection reconnects
+    with exponential backoff, and every message is decoded once and published to the
+    subscribers of its event type:
+        - 'kline': closed klines as Kline tuples (all updates if `only_closed_klines` is False),
+        - 'trade': Trade tuples,
+        - any other event type (e.g. 'depthUpdate'): the decoded event dict.
+    Callbacks may be plain functions or coroutine functions. Malformed messages and exceptions
+    raised by callbacks are logged and skipped without interrupting the connection.
+    """
+    def __init__(self, streams, base_url=BINANCE_WS_STREAM_URL, only_closed_klines=True,
+                 max_streams_per_connection=WS_MAX_STREAMS_PER_CONNECTION):
+        """
+        :param streams: Stream names (e.g., ['btcusdt@kline_1m', 'btcusdt@trade']).
+        :param base_url: Combined stream endpoint (e.g., 'ws://127.0.0.1:8765/stream' for a local stand-in).
+        :param only_closed_klines: Publish klines only once their candle has closed.
+        :param max_streams_per_connection: Streams multiplexed on one connection.
+        """
+        if not streams:
+            raise ValueError("At least one stream is required.")
+        self.streams = list(streams)
+        self.base_url = base_url
+        self.only_closed_klines = only_closed_klines
+        self.max_streams_per_connection = max_streams_per_connection
+        self.subscribers = {}
+        self._connections = set()
+        self._stopping = False
+        self._stopped = None
+
+    @classmethod
+    def for_symbols(cls, symbols, kline_interval="1m", trades=True, **kwargs):
+        """
+        Build a stream for klines (and optionally trades) of many symbols.
+        :param symbols: Trading pairs (e.g., ['BTCUSDT', 'ETHUSDT']).
+        :param kline_interval: Kline interval to subscribe to, or None for no klines.
+        :param trades: Also subscribe to the trade stream of each symbol.
+        """
+        streams = []
+        for symbol in symbols:
+            if kline_interval:
+                streams.append(f"{symbol.lower()}@kline_{kline_interval}")
+            if trades:
+                streams.append(f"{symbol.lower()}@trade")
+        return cls(streams, **kwargs)
+
+    def subscribe(self, event, callback):
+        """
+        Register a callback for an event type.
+        :param event: 'kline', 'trade' or a raw event type such as 'depthUpdate'.
+        :param callback: Called with the parsed event.
+        """
+        self.subscribers.setdefault(event, []).append(callback)
+
+    async def _publish(self, event, payload):
+        for callback in self.subscribers.get(event, ()):
+            # A failing subscriber is logged and skipped, so it cannot stop the feed or the other subscribers.
+            try:
+                result = callback(payload)
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception:
+                logger.exception(f"Subscriber {callback!r} failed on a {event} event.")
+
+    async def _dispatch(self, message):
+        try:
+            data = _json.loads(message).get("data")
+            if not data:
+                return
+            event = data.get("e")
+            if event not in self.subscribers:
+                return
+            if event == "kline":
+                if self.only_closed_klines and not data["k"]["x"]:
+                    return
+                payload = parse_kline(data)
+            elif event == "trade":
+                payload = parse_trade(data)
+            else:
+                payload = data
+        except (ValueError, TypeError, KeyError, AttributeError) as e:
+            # orjson and json decode errors are ValueErrors; the others come from unexpected payload shapes.
+            logger.error(f"Dropping malformed message ({e!r}): {message[:200]!r}")
+            return
+        await self._publish(event, payload)
+
+    async def _run_connection(self, streams):
+        url = f"{self.base_url}?streams={'/'.join(streams)}"
+        delay = 1
+        while not self._stopping:
+            try:
+                async with websockets.connect(url, max_size=None) as connection:
+                    self._connections.add(connection)
+                    logger.info(f"Connected to {len(streams)} streams.")
+                    delay = 1
+                    try:
+                        async for message in connection:
+                            await self._dispatch(message)
+                    finally:
+                        self._connections.discard(connection)
+            except (OSError, asyncio.TimeoutError, websockets.exceptions.WebSocketException) as e:
+                if self._stopping:
+                    break
+                logger.warning(f"WebSocket connection lost ({e}); reconnecting in {delay} seconds.")
+            else:
+                if self._stopping:
+                    break
+                logger.warning(f"WebSocket closed by server; reconnecting in {delay} seconds.")
+            try:
+                await asyncio.wait_for(self._stopped.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+            delay = min(delay * 2, WS_RECONNECT_MAX_DELAY)
+
+    async def run(self):
+        """Consume all streams until `stop` is called."""
+        self._stopping = False
+        self._stopped = asyncio.Event()
+        shards = [self.streams[i:i + self.max_streams_per_connection]
+                  for i in range(0, len(self.streams), self.max_streams_per_connection)]
+        await asyncio.gather(*(self._run_connection(shard) for shard in shards))
+
+    async def stop(self):
+        """Close every connection and stop reconnecting."""
+        self._stopping = True
+        if self._stopped is not None:
+            self._stopped.set()
+        await asyncio.gather(*(connection.close() for connection in list(self._connections)))
@@ -0,0 +1,267 @@
+"""
+Numba kernels behind data.timeseries.
+
+This module is imported on first use by the wrappers in data.timeseries,
+so importing data.timeseries does not load numba. Every kernel is compiled with
+cache=True: the machine code is written next to this file (or to NUMBA_CACHE_DIR)
+and later processes load it instead of recompiling; see timeseries.warmup.
+"""
+import numpy as np
+import numba as nb
+
+
+@nb.njit(cache=True)
+def _hurst_from_lag_sums(sums, squares, window, log_lags, log_lag_norm):
+    """Hurst exponent from the per-lag sums of differences and squared differences of one window."""
+    slope = 0.0
+    for k in range(len(sums)):
+        count = window - (k + 2)
+        mean = sums[k] / count
+        variance = max(squares[k] / count - mean * mean, 0.0)
+        slope += log_lags[k] * 0.25 * np.log(variance)
+    return 2.0 * slope / log_lag_norm
+
+
+@nb.njit(cache=True)
+def _hurst_chunk(values, window, step, first, last, log_lags, log_lag_norm, out):
+    """
+    Hurst exponents of windows first .. last - 1 of one series. The per-lag sums are computed
+    exactly for the first window and slid forward for the others.
+    """
+    n_lags = len(log_lags)
+    sums = np.zeros(n_lags)
+    squares = np.zeros(n_lags)
+    start = first * step
+    for k in range(n_lags):
+        lag = k + 2
+        for t in range(start, start + window - lag):
+            d = values[t + lag] - values[t]
+            sums[k] += d
+            squares[k] += d * d
+    out[first] = _hurst_from_lag_sums(sums, squares, window, log_lags, log_lag_norm)
+    for j in range(first + 1, last):
+        previous = start
+        start = j * step
+        for k in range(n_lags):
+            lag = k + 2
+            for t in range(previous, start):
+                d = values[t + lag] - values[t]
+                sums[k] -= d
+                squares[k] -= d * d
+            for t in range(previous + window - lag, start + window - lag):
+                d = values[t + lag] - values[t]
+                sums[k] += d
+                squares[k] += d * d
+        out[j] = _hurst_from_lag_sums(sums, squares, window, log_lags, log_lag_norm)
+
+
+@nb.njit(parallel=True, cache=True)
+def rolling_hurst(series, window, step):
+    """
+    Hurst exponent of every `step`-th trailing window of `window` samples, for each row of `series`.
+    Windows are split into contiguous chunks and every (series, chunk) pair runs in parallel, so
+    one long series and a wide panel both use all threads. Each chunk starts from an exact
+    recomputation, so rounding drift from sliding stays bounded.
+    """
+    n_series, n = series.shape
+    n_out = (n - window) // step + 1
+    log_lags = np.log(np.arange(2, window // 3).astype(np.float64))
+    log_lag_norm = np.sum(log_lags * log_lags)
+    chunk = max(256, window // step) if 2 * step < window else 1
+    n_chunks = (n_out + chunk - 1) // chunk
+    out = np.empty((n_series, n_out))
+    for task in nb.prange(n_series * n_chunks):
+        row = task // n_chunks
+        first = (task % n_chunks) * chunk
+        _hurst_chunk(series[row], window, step, first, min(first + chunk, n_out), log_lags, log_lag_norm, out[row])
+    return out
+
+
+@nb.njit(cache=True)
+def _box_counts(values, window, step, levels, counts):
+    """
+    Box counts of the windows starting at 0, step, 2 * step, ... of `values` for box sizes
+    2 ** levels (levels ascending), written into `counts` (windows x levels).
+    Max/min of boxes starting at every sample are merged pairwise from one level to the next,
+    and a strided prefix sum of "box moves" flags gives each window's count in O(1) per level.
+    """
+    n = len(values)
+    hi = values.copy()
+    lo = values.copy()
+    moves = np.empty(n, dtype=np.int64)
+    width = 1
+    i = 0
+    for level in range(1, levels[-1] + 1):
+        valid = n - 2 * width + 1
+        for t in range(valid):
+            hi[t] = max(hi[t], hi[t + width])
+            lo[t] = min(lo[t], lo[t + width])
+        width *= 2
+        if level != levels[i]:
+            continue
+        for t in range(valid):
+            moves[t] = 1 if hi[t] > lo[t] else 0
+            if t >= width:
+                moves[t] += moves[t - width]
+        last = (window // width - 1) * width
+        for j in range(counts.shape[0]):
+            start = j * step
+            counts[j, i] = moves[start + last] - (moves[start - width] if start >= width else 0)
+        i += 1
+
+
+@nb.njit(parallel=True, cache=True)
+def rolling_box_counts(series, window, step, levels):
+    """
+    Box counts (see `_box_counts`) of every `step`-th window of each row of `series`.
+    Windows are split into chunks of about eight windows' span and every (series, chunk) pair
+    runs in parallel; each chunk builds the box hierarchy of its own span only.
+    """
+    n_series, n = series.shape
+    n_out = (n - window) // step + 1
+    chunk = max(1, 8 * window // step)
+    n_chunks = (n_out + chunk - 1) // chunk
+    counts = np.empty((n_series, n_out, len(levels)))
+    for task in nb.prange(n_series * n_chunks):
+        row = task // n_chunks
+        first = (task % n_chunks) * chunk
+        last = min(first + chunk, n_out)
+        _box_counts(series[row, first * step:(last - 1) * step + window], window, step, levels,
+                    counts[row, first:last])
+    return counts
+
+
+@nb.njit(cache=True)
+def _compensated_add(sums, compensation, j, x):
+    """Neumaier summation step, so large values leaving the window do not leave rounding residue."""
+    total = sums[j] + x
+    if abs(sums[j]) >= abs(x):
+        compensation[j] += (sums[j] - total) + x
+    else:
+        compensation[j] += (x - total) + sums[j]
+    sums[j] = total
+
+
+@nb.njit(cache=True)
+def rolling_sum(values, window, out):
+    """
+    Trailing sums over `window` rows of each column into `out` (same shape, any float dtype),
+    with a count of non-finite values in the window. Sums are accumulated in float64.
+    Rows are the outer loop so a C-ordered (time x symbol) array is read sequentially.
+    """
+    n, k = values.shape
+    sums = np.zeros(k)
+    compensation = np.zeros(k)
+    missing = np.zeros(k, dtype=np.int64)
+    for t in range(n):
+        for j in range(k):
+            x = values[t, j]
+            if np.isfinite(x):
+                _compensated_add(sums, compensation, j, x)
+            else:
+                missing[j] += 1
+            if t >= window:
+                x = values[t - window, j]
+                if np.isfinite(x):
+                    _compensated_add(sums, compensation, j, -x)
+                else:
+                    missing[j] -= 1
+            if missing[j] >= min(t + 1, window):
+                sums[j] = 0.0  # nothing finite left in the window: drop accumulated rounding
+                compensation[j] = 0.0
+            out[t, j] = sums[j] + compensation[j] if t >= window - 1 and missing[j] == 0 else np.nan
+    return out
+
+
+@nb.njit(cache=True)
+def cumsum_skipna(values, out):
+    """
+    Cumulative sum down each column into `out`, skipping NaNs and keeping them in place
+    (pandas' cumsum()). The running totals are float64 whatever the dtype of `out`.
+    """
+    n, k = values.shape
+    totals = np.zeros(k)
+    for t in range(n):
+        for j in range(k):
+            x = values[t, j]
+            if np.isnan(x):
+                out[t, j] = np.nan
+            else:
+                totals[j] += x
+                out[t, j] = totals[j]
+    return out
+
+
+@nb.njit(cache=True)
+def _add_pair(sums, compensation, j, x, y, sign):
+    """Add (sign = 1) or remove (sign = -1) one (x, y) pair from the regression sums of column j."""
+    _compensated_add(sums[0], compensation[0], j, sign * x)
+    _compensated_add(sums[1], compensation[1], j, sign * y)
+    _compensated_add(sums[2], compensation[2], j, sign * x * x)
+    _compensated_add(sums[3], compensation[3], j, sign * x * y)
+
+
+@nb.njit(cache=True)
+def rolling_ols(x, y, window, min_periods, intercept, out):
+    """
+    Slope of the OLS regression of y on x over the trailing `window` rows of each column
+    (all rows so far when window is 0) into `out`, from running sums of x, y, x^2 and xy.
+    Rows where x or y is not finite are skipped; slopes with fewer than `min_periods` pairs,
+    or no variation in x, are NaN. Sums are compensated (Neumaier) and reset when the window empties.
+    """
+    n, k = x.shape
+    sums = np.zeros((4, k))
+    compensation = np.zeros((4, k))
+    counts = np.zeros(k, dtype=np.int64)
+    for t in range(n):
+        for j in range(k):
+            if np.isfinite(x[t, j]) and np.isfinite(y[t, j]):
+                _add_pair(sums, compensation, j, x[t, j], y[t, j], 1.0)
+                counts[j] += 1
+            if window > 0 and t >= window:
+                if np.isfinite(x[t - window, j]) and np.isfinite(y[t - window, j]):
+                    _add_pair(sums, compensation, j, x[t - window, j], y[t - window, j], -1.0)
+                    counts[j] -= 1
+            if counts[j] == 0:
+                sums[:, j] = 0.0  # empty window: drop accumulated rounding
+                compensation[:, j] = 0.0
+            if counts[j] < min_periods:
+                out[t, j] = np.nan
+                continue
+            sum_x = sums[0, j] + compensation[0, j]
+            sum_xx = sums[2, j] + compensation[2, j]
+            sum_xy = sums[3, j] + compensation[3, j]
+            variation = sum_xx
+            if intercept:
+                sum_y = sums[1, j] + compensation[1, j]
+                variation -= sum_x * sum_x / counts[j]
+                sum_xy -= sum_x * sum_y / counts[j]
+            # x constant up to rounding of the sums: no slope
+            out[t, j] = sum_xy / variation if variation > 1e-12 * sum_xx else np.nan
+    return out
+
+
+@nb.njit(cache=True)
+def rolling_transition_entropy(cells, m, n_patterns):
+    """
+    Entropy of the rank-transition counts over every run of `n_patterns` consecutive windows.
+    Counts are updated incrementally: each step adds the newest window's cells and removes the oldest's.
+    """
+    n = cells.shape[0]
+    counts = np.zeros(m * m, dtype=np.int64)
+    out = np.empty(n - n_patterns + 1)
+    log_m = np.log(m)
+    for t in range(n):
+        for j in range(m):
+            counts[cells[t, j]] += 1
+        if t >= n_patterns:
+            for j in range(m):
+                counts[cells[t - n_patterns, j]] -= 1
+        if t >= n_patterns - 1:
+            entropy = 0.0
+            for count in counts:
+                if count > 0:
+                    p = count / n_patterns
+                    entropy -= p * np.log(p)
+            out[t - n_patterns + 1] = entropy / log_m
+    return out
@@ -1,54 +1,226 @@
-import pandas as pd
+import math
+import os
+from collections import deque, namedtuple
 import numpy as np
-from hmmlearn.hmm import GaussianHMM
-import matplotlib.pyplot as plt
+import pandas as pd
+from config.settings import FEATURE_DTYPE
+from data.features import FeaturePipeline, compute_in_chunks
+from data.preprocess import KLINE_COLUMNS
+from data.streaming import RegimeFeatureState
+
+RegimePosterior = namedtuple("RegimePosterior", ["filtered", "smoothed"])
+
+
+class RegimeFilter:
+    """
+    Online regime inference with a trained Gaussian HMM: a forward filter over the features of
+    each new candle, O(n_states^2) per update instead of re-decoding the whole history.
+    The filtered posterior of a candle equals the forward-backward posterior of the history
+    ending at it; with `lag` > 0 the posterior of the candle `lag` updates back is also
+    smoothed over the candles that followed it (fixed-lag smoothing, O(lag * n_states^2)).
+    """
+    def __init__(self, model, window=20, lag=0):
+        """
+        :param model: Fitted hmmlearn GaussianHMM (any covariance type) trained on
+            MarketRegimeAnalyzer.FEATURES.
+        :param window: Rolling window of the features, as in MarketRegimeAnalyzer.
+        :param lag: Number of later candles the smoothed posterior looks at (0: no smoothing).
+        """
+        self.lag = lag
+        self.n_states = model.n_components
+        self._startprob = model.startprob_
+        self._transmat = model.transmat_
+        self._means = model.means_
+        # Emission log-densities from Cholesky factors: log N(x) = norm - |L^-1 (x - mean)|^2 / 2
+        factors = np.array([self._cholesky(covariance, model.min_covar) for covariance in model.covars_])
+        self._inverse_factors = np.linalg.inv(factors)
+        log_det = 2 * np.log(np.diagonal(factors, axis1=1, axis2=2)).sum(axis=1)
+        self._log_norm = -0.5 * (self._means.shape[1] * math.log(2 * math.pi) + log_det)
+        self._features = RegimeFeatureState(window)
+        self._alpha = None
+        self._alphas = deque(maxlen=lag + 1)  # filtered posteriors of the last lag + 1 candles
+        self._emissions = deque(maxlen=lag)  # scaled emission densities of the candles after _alphas[0]
+
+    @staticmethod
+    def _cholesky(covariance, min_covar):
+        # As hmmlearn: a covariance that is not positive definite gets min_covar added to its diagonal.
+        try:
+            return np.linalg.cholesky(covariance)
+        except np.linalg.LinAlgError:
+            return np.linalg.cholesky(covariance + min_covar * np.eye(len(covariance)))
+
+    def _emission(self, x):
+        """Emission densities of x, scaled so the largest is 1 (the scale cancels in the posteriors)."""
+        z = np.einsum("kij,kj->ki", self._inverse_factors, x - self._means)
+        log_density = self._log_norm - 0.5 * np.einsum("ki,ki->k", z, z)
+        return np.exp(log_density - log_density.max())
+
+    def _smoothed(self):
+        # Backward pass over the last `lag` candles, normalized at every step.
+        beta = np.ones(self.n_states)
+        for emission in reversed(self._emissions):
+            beta = self._transmat @ (emission * beta)
+            beta /= beta.sum()
+        posterior = self._alphas[0] * beta
+        return posterior / posterior.sum()
+
+    def update(self, close, volume):
+        """
+        Feed one candle.
+        :param close: Close price of the candle.
+        :param volume: Volume of the candle.
+        :return: RegimePosterior of state probabilities: `filtered` for this candle and `smoothed` for
+            the candle `lag` updates back (None when lag is 0). Both are NaN while the features warm up,
+            and a candle with missing features is skipped, as load_data drops it.
+        """
+        missing = np.full(self.n_states, np.nan)
+        x = self._features.update(close, volume)
+        if not np.isfinite(x).all():
+            return RegimePosterior(missing, missing if self.lag else None)
+        emission = self._emission(x)
+        alpha = (self._startprob if self._alpha is None else self._alpha @ self._transmat) * emission
+        total = alpha.sum()
+        if not total > 0:
+            # The candle is impossible under every state the filter allowed: restart from the prior.
+            alpha = self._startprob * emission
+            total = alpha.sum()
+        self._alpha = alpha / total
+        if not self.lag:
+            return RegimePosterior(self._alpha, None)
+        self._emissions.append(emission)
+        self._alphas.append(self._alpha)
+        smoothed = self._smoothed() if len(self._alphas) == self._alphas.maxlen else missing
+        return RegimePosterior(self._alpha, smoothed)
 
 
 class MarketRegimeAnalyzer:
-    def __init__(self, file_path, columns, n_states=3):
+    FEATURES = ["log_return", "volatility", "normalized_volume"]
+    FEATURE_WINDOW = 20
+
+    def __init__(self, file_path, columns, n_states=3, store=None, symbol=None, interval=None,
+                 dtype=FEATURE_DTYPE):
         """
         Initialize the MarketRegimeAnalyzer.
 
-        :param file_path: Path to the CSV file containing market data.
+        :param file_path: Path to the CSV file containing market data (ignored when `store` is given).
         :param columns: List of columns to analyze (must include 'close' and 'volume').
         :param n_states: Number of hidden states for HMM.
+        :param store: KlineStore to load klines from instead of a CSV file (optional).
+        :param symbol: Trading pair to load from the store (e.g., 'BTCUSDT').
+        :param interval: Candlestick interval to load from the store (e.g., '15m').
+        :param dtype: dtype of the computed features (e.g., 'float32' to halve their memory).
         """
         self.file_path = file_path
         self.columns = columns
         self.n_states = n_states
+        self.store = store
+        self.symbol = symbol
+        self.interval = interval
+        self.dtype = dtype
         self.data = None
         self.features = None
         self.hmm_model = None
+        self.model_metadata = None
 
-    def load_data(self):
-        """Load and preprocess the data."""
-        self.data = pd.read_csv(self.file_path, parse_dates=["timestamp"])
+    def load_data(self, chunksize=None):
+        """
+        Load and preprocess the data.
+        :param chunksize: Rows per chunk to read and compute features in, for histories that do not fit in
+            memory as a full frame (optional). The rolling state is carried between chunks, `features` is
+            built as one contiguous matrix, and `data` keeps only the timestamp and the analyzed columns.
+        """
+        if chunksize is not None:
+            self._load_chunked(chunksize)
+            return
+        if self.store is not None:
+            # Only the needed columns are read from the columnar store.
+            stored = [col for col in KLINE_COLUMNS if col in {"timestamp", "close", "volume", *self.columns}]
+            self.data = self.store.read(self.symbol, self.interval, columns=stored)
+            self.data["timestamp"] = pd.to_datetime(self.data["timestamp"], unit="ms")
+        else:
+            self.data = pd.read_csv(self.file_path, parse_dates=["timestamp"])
 
         # Ensure all required columns are present
         for col in self.columns:
             if col not in self.data.columns:
                 raise ValueError(f"Column {col} is not found in the dataset.")
 
-        # Calculate log returns
-        self.data["log_return"] = np.log(self.data["close"] / self.data["close"].shift(1))
-
-        # Calculate volatility as rolling standard deviation of log returns
-        self.data["volatility"] = self.data["log_return"].rolling(window=20).std()
-
-        # Normalize volume
-        self.data["normalized_volume"] = self.data["volume"] / self.data["volume"].rolling(window=20).mean()
+        # Log returns, volatility (rolling std of log returns) and volume over its rolling mean,
+        # built from shared intermediates
+        features = FeaturePipeline(self.data, window=self.FEATURE_WINDOW, dtype=self.dtype).compute(self.FEATURES)
+        self.data[features.columns] = features
 
         # Drop NaN values introduced by rolling calculations
         self.data = self.data.dropna()
 
         # Prepare features for HMM
-        self.features = self.data[["log_return", "volatility", "normalized_volume"]].values
+        self.features = self.data[self.FEATURES].values
+
+    def _read_chunks(self, chunksize):
+        needed = {"timestamp", "close", "volume", *self.columns}
+        if self.store is not None:
+            # The store table is memory-mapped, so each slice is converted to pandas on its own.
+            stored = [col for col in KLINE_COLUMNS if col in needed]
+            table = self.store.read_table(self.symbol, self.interval, columns=stored)
+            for offset in range(0, table.num_rows, chunksize):
+                chunk = table.slice(offset, chunksize).to_pandas()
+                chunk["timestamp"] = pd.to_datetime(chunk["timestamp"], unit="ms")
+                yield chunk
+        else:
+            yield from pd.read_csv(self.file_path, parse_dates=["timestamp"], usecols=lambda col: col in needed,
+                                   chunksize=chunksize)
 
-    def train_hmm(self):
-        """Train the Gaussian HMM model on the prepared features."""
+    def _load_chunked(self, chunksize):
+        kept, features = [], []
+        for chunk, computed in compute_in_chunks(self._read_chunks(chunksize), self.FEATURES,
+                                                 window=self.FEATURE_WINDOW, dtype=self.dtype):
+            if not kept:
+                for col in self.columns:
+                    if col not in chunk.columns:
+                        raise ValueError(f"Column {col} is not found in the dataset.")
+            chunk = chunk[list(dict.fromkeys(["timestamp", *self.columns]))]
+            valid = (chunk.notna().all(axis=1) & computed.notna().all(axis=1)).to_numpy()
+            kept.append(chunk[valid])
+            features.append(computed.to_numpy(dtype=self.dtype)[valid])
+        # One copy of the kept rows at the end instead of full-frame copies along the way.
+        self.data = pd.concat(kept, ignore_index=True)
+        self.features = np.concatenate(features)
+
+    def model_name(self):
+        """Registry name of the model: '<symbol>_<interval>' for store data, else the CSV file name."""
+        if self.store is not None:
+            return f"{self.symbol}_{self.interval}"
+        return os.path.splitext(os.path.basename(self.file_path))[0]
+
+    def train_hmm(self, registry=None):
+        """
+        Train the Gaussian HMM model on the prepared features.
+        :param registry: ModelRegistry to reuse a stored model from, or warm-start from, when given
+            (the trained model is stored as a new version).
+        """
+        if registry is not None:
+            timestamps = self.data["timestamp"]
+            self.hmm_model, self.model_metadata = registry.fit(
+                self.model_name(), self.features, self.n_states,
+                {"features": self.FEATURES, "window": self.FEATURE_WINDOW},
+                training_range=(str(timestamps.iloc[0]), str(timestamps.iloc[-1])))
+            return
+        from hmmlearn.hmm import GaussianHMM
         self.hmm_model = GaussianHMM(n_components=self.n_states, covariance_type="full", random_state=42)
         self.hmm_model.fit(self.features)
 
+    def select_hmm(self, **search_options):
+        """
+        Train by searching random restarts over state counts and covariance types in a process pool
+        (see data.models.search_models) instead of a single fit; sets n_states to the chosen count.
+        :param search_options: Options of search_models (n_states, covariance_types, restarts, criterion...).
+        :return: DataFrame comparing every fit, best first.
+        """
+        from data.models import search_models
+        self.hmm_model, table = search_models(self.features, **search_options)
+        self.n_states = self.hmm_model.n_components
+        return table
+
     def predict_regimes(self):
         """Predict market regimes using the trained HMM."""
         self.data["regime"] = self.hmm_model.predict(self.features)
@@ -57,8 +229,18 @@ class MarketRegimeAnalyzer:
         regime_map = {i: f"Regime {i}" for i in range(self.n_states)}
         self.data["regime_tag"] = self.data["regime"].map(regime_map)
 
+    def regime_filter(self, lag=0):
+        """
+        Streaming counterpart of predict_regimes for live candles.
+        :param lag: Fixed lag of the smoothed posterior (0: filtered posterior only).
+        :return: RegimeFilter over the trained model; feed it candles (e.g., recent history, then live)
+            with update(close, volume).
+        """
+        return RegimeFilter(self.hmm_model, window=self.FEATURE_WINDOW, lag=lag)
+
     def visualize_regimes(self):
         """Visualize market regimes on a plot."""
+        import matplotlib.pyplot as plt
         plt.figure(figsize=(15, 7))
         for regime, group in self.data.groupby("regime"):
             plt.plot(group["timestamp"], group["close"], label=f"Regime {regime}")
@@ -1,24 +1,9 @@
-from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor, IsolationForest
-from sklearn.datasets import load_breast_cancer, fetch_california_housing
-from statsmodels.stats.multitest import multipletests
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import MinMaxScaler
-from sklearn.cluster import KMeans
-from scipy.sparse import issparse
-from scipy.stats import ks_2samp
-try:
-    from scipy.stats import binom_test
-except:
-    # scipy 1.12 changed this import call
-    from scipy.stats import binomtest as binom_test
-import matplotlib.pyplot as plt
-from tqdm.auto import tqdm
+# Heavy dependencies (sklearn, scipy, shap, seaborn, matplotlib, tqdm) are imported
+# inside the methods that use them so importing this module stays cheap.
 import random
 import pandas as pd
 import numpy as np
 from numpy.random import choice
-import seaborn as sns
-import shap
 import os
 import re
 
@@ -97,6 +82,7 @@ class BorutaShap:
 
 
         if self.model is None:
+            from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
 
             if self.classification:
                 self.model = RandomForestClassifier()
@@ -210,6 +196,7 @@ class BorutaShap:
 
 
         if self.train_or_test.lower() == 'test':
+            from sklearn.model_selection import train_test_split
             # keeping the same naming convenetion as to not add complexit later on
             self.X_boruta_train, self.X_boruta_test, self.y_train, self.y_test = train_test_split(self.X_boruta,
                                                                                             self.y,
@@ -351,6 +338,8 @@ class BorutaShap:
 
         if self.sample: self.preds = self.isolation_forest(self.X)
 
+        from tqdm.auto import tqdm
+
         for trial in tqdm(range(self.n_trials)):
 
             self.remove_features_if_rejected()
@@ -643,6 +632,7 @@ class BorutaShap:
         '''
         fits isloation forest to the dataset and gives an anomally score to every sample
         '''
+        from sklearn.ensemble import IsolationForest
         clf = IsolationForest().fit(X)
         preds = clf.score_samples(X)
         return preds
@@ -667,6 +657,7 @@ class BorutaShap:
         Finds a sample by comparing the distributions of the anomally scores between the sample and the original
         distribution using the KS-test. Starts of a 5% howver will increase to 10% and then 15% etc. if a significant sample can not be found
         '''
+        from scipy.stats import ks_2samp
         loop = True
         iteration = 0
         size = self.get_5_percent_splits(self.X.shape[0])
@@ -703,6 +694,7 @@ class BorutaShap:
         """
 
 
+        import shap
         explainer = shap.TreeExplainer(self.model, feature_perturbation = "tree_path_dependent")
 
 
@@ -765,6 +757,11 @@ class BorutaShap:
         This is an exact, two-sided test of the null hypothesis
         that the probability of success in a Bernoulli experiment is p
         """
+        try:
+            from scipy.stats import binom_test
+        except:
+            # scipy 1.12 changed this import call
+            from scipy.stats import binomtest as binom_test
         return [binom_test(int(x), n=n, p=p, alternative=alternative).pvalue for x in array]
 
 
@@ -954,6 +951,7 @@ class BorutaShap:
         controls if the output is displayed or not, set to false when running test scripts
 
         """
+        import matplotlib.pyplot as plt
         # data from wide to long
         data = self.history_x.iloc[1:]
         data['index'] = data.index
@@ -985,6 +983,8 @@ class BorutaShap:
 
 
     def box_plot(self, data, X_rotation, X_size, y_scale, figsize):
+        import matplotlib.pyplot as plt
+        import seaborn as sns
 
         if y_scale=='log':
             minimum = data['value'].min()
@@ -1036,6 +1036,7 @@ def load_data(data_type='classification'):
     Load Example datasets for the user to try out the package
     """
 
+    from sklearn.datasets import load_breast_cancer, fetch_california_housing
     data_type = data_type.lower()
 
     if data_type == 'classification':
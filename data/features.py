@@ -0,0 +1,207 @@
+import numpy as np
+import pandas as pd
+from collections import namedtuple
+from config.settings import FEATURE_DTYPE
+from data.timeseries import (_cumsum_skipna, _lagged_cumsum_difference, _rolling_sum, _shifted, _tick_signs,
+                             rolling_ols)
+
+FeatureNode = namedtuple("FeatureNode", ["inputs", "func", "windowed"])
+
+# Registry of feature nodes by name. Names that are not registered are read from the frame's columns.
+FEATURES = {}
+
+
+def feature(name, inputs=(), windowed=False):
+    """
+    Register a feature node.
+    :param name: Node name, used by other nodes' `inputs` and in FeaturePipeline.compute.
+    :param inputs: Names of the nodes (or frame columns) passed positionally to the function.
+    :param windowed: The function also takes `window`; windowed inputs are computed with the same window.
+    """
+    def decorator(func):
+        FEATURES[name] = FeatureNode(tuple(inputs), func, windowed)
+        return func
+    return decorator
+
+
+class FeaturePipeline:
+    """
+    Computes features of one kline frame as a DAG of registered nodes.
+    Every node (e.g. log returns, a rolling volume mean) is computed at most once per
+    (node, window) and shared by all the features that depend on it. Nodes work on
+    arrays of one float dtype; only the result of `compute` is wrapped back into a DataFrame.
+    """
+    def __init__(self, frame, window=10, dtype=FEATURE_DTYPE):
+        """
+        :param frame: DataFrame with the raw columns the requested features need (close, high, low, volume).
+        :param window: Default window for windowed nodes.
+        :param dtype: dtype the raw columns are read as, and so of every node (e.g., 'float32' to halve memory).
+        """
+        self.frame = frame
+        self.window = window
+        self.dtype = np.dtype(dtype)
+        self._cache = {}
+
+    def get(self, name, window=None):
+        """
+        Return the values of one node as an array, computing it and its inputs on first use.
+        :param name: Registered node name or frame column.
+        :param window: Window for windowed nodes (default: the pipeline's window).
+        """
+        node = FEATURES.get(name)
+        if node is None:
+            if name not in self.frame.columns:
+                raise KeyError(f"Unknown feature or column: {name}")
+            node = FeatureNode((), lambda: self.frame[name].to_numpy(dtype=self.dtype), False)
+        window = (window or self.window) if node.windowed else None
+        key = (name, window)
+        if key not in self._cache:
+            args = [self.get(input_name, window) for input_name in node.inputs]
+            self._cache[key] = node.func(*args, window) if node.windowed else node.func(*args)
+        return self._cache[key]
+
+    def compute(self, features):
+        """
+        Compute several features in one pass over the shared graph.
+        :param features: Names, or (name, window) tuples to override the window.
+        :return: DataFrame indexed like the frame, one column per feature
+            (named '<name>_<window>' when requested as a tuple).
+        """
+        columns = {}
+        for spec in features:
+            if isinstance(spec, tuple):
+                name, window = spec
+                columns[f"{name}_{window}"] = self.get(name, window)
+            else:
+                columns[spec] = self.get(spec)
+        return pd.DataFrame(columns, index=self.frame.index)
+
+
+def compute_in_chunks(chunks, features, window=10, lookback=None, dtype=FEATURE_DTYPE):
+    """
+    Compute features over consecutive frames (e.g., pd.read_csv(..., chunksize=...)) without holding
+    the whole history. The last `lookback` rows of each chunk are carried into the next one, so the
+    rolling state continues across chunk boundaries and results equal FeaturePipeline on the
+    concatenated frame, for features that look back at most `lookback` rows (rolling windows plus the
+    previous close; not cumulative features such as bekker_parkinson_vol).
+
+    :param chunks: Iterable of DataFrames in time order.
+    :param features: Feature names (or (name, window) tuples), as in FeaturePipeline.compute.
+    :param window: Default window for windowed nodes.
+    :param lookback: Rows carried between chunks (default: `window`, enough for single rolling windows
+        over log returns; use 2 * window for a rolling mean of rolling means such as hasbroucks_lambda).
+    :param dtype: Feature dtype.
+    :return: Generator of (chunk, features) pairs, `features` a DataFrame indexed like the chunk.
+    """
+    lookback = window if lookback is None else lookback
+    carried = None
+    for chunk in chunks:
+        frame = chunk if carried is None else pd.concat([carried, chunk], ignore_index=True)
+        computed = FeaturePipeline(frame, window, dtype).compute(features).iloc[len(frame) - len(chunk):]
+        computed.index = chunk.index
+        carried = frame.iloc[len(frame) - lookback:] if lookback else None
+        yield chunk, computed
+
+
+# Shared intermediates
+
+def _rolling_mean(values, window):
+    return _rolling_sum(values[:, None], window)[:, 0] / window
+
+
+@feature("close_prev", inputs=("close",))
+def close_prev(close):
+    return _shifted(close)
+
+
+@feature("log_return", inputs=("close", "close_prev"))
+def log_return(close, close_prev):
+    return np.log(close / close_prev)
+
+
+@feature("abs_log_return", inputs=("log_return",))
+def abs_log_return(log_return):
+    return np.abs(log_return)
+
+
+@feature("mid_price", inputs=("high", "low"))
+def mid_price(high, low):
+    return (high + low) / 2
+
+
+@feature("close_change", inputs=("close", "close_prev"))
+def close_change(close, close_prev):
+    return close - close_prev
+
+
+@feature("signed_volume", inputs=("close_change", "volume"))
+def signed_volume(close_change, volume):
+    return _tick_signs(close_change) * volume
+
+
+@feature("dollar_volume", inputs=("close", "volume"))
+def dollar_volume(close, volume):
+    return close * volume
+
+
+@feature("abs_volume", inputs=("volume",))
+def abs_volume(volume):
+    return np.abs(volume)
+
+
+@feature("volume_mean", inputs=("volume",), windowed=True)
+def volume_mean(volume, window):
+    return _rolling_mean(volume, window)
+
+
+@feature("abs_volume_mean", inputs=("abs_volume",), windowed=True)
+def abs_volume_mean(abs_volume, window):
+    return _rolling_mean(abs_volume, window)
+
+
+@feature("abs_return_mean", inputs=("abs_log_return",), windowed=True)
+def abs_return_mean(abs_log_return, window):
+    return _rolling_mean(abs_log_return, window)
+
+
+# Indicators (same values as their counterparts in data.timeseries and MarketRegimeAnalyzer)
+
+@feature("roll_measure", inputs=("log_return",), windowed=True)
+def roll_measure(log_return, window):
+    # Windows run over the non-missing returns, as in timeseries.roll_measure.
+    valid = ~np.isnan(log_return)
+    out = np.full(len(log_return), np.nan, dtype=log_return.dtype)
+    out[valid] = _lagged_cumsum_difference(log_return[valid][:, None], window)[:, 0]
+    return out
+
+
+@feature("bekker_parkinson_vol", inputs=("mid_price", "close_prev"), windowed=True)
+def bekker_parkinson_vol(mid_price, close_prev, window):
+    squared = np.log(mid_price / close_prev) ** 2
+    rqv = _cumsum_skipna(squared[:, None], out=squared[:, None])[:, 0]
+    return np.sqrt(rqv / window)
+
+
+@feature("kyles_lambda", inputs=("close_change", "signed_volume"), windowed=True)
+def kyles_lambda(close_change, signed_volume, window):
+    return rolling_ols(close_change, signed_volume, window, dtype=close_change.dtype)
+
+
+@feature("amihuds_lambda", inputs=("abs_log_return", "dollar_volume"), windowed=True)
+def amihuds_lambda(abs_log_return, dollar_volume, window):
+    return rolling_ols(abs_log_return, dollar_volume, window, dtype=abs_log_return.dtype)
+
+
+@feature("hasbroucks_lambda", inputs=("abs_return_mean", "abs_volume_mean"), windowed=True)
+def hasbroucks_lambda(abs_return_mean, abs_volume_mean, window):
+    return _rolling_mean(abs_return_mean / abs_volume_mean, window)
+
+
+@feature("volatility", inputs=("log_return",), windowed=True)
+def volatility(log_return, window):
+    return pd.Series(log_return).rolling(window=window).std().to_numpy(dtype=log_return.dtype)
+
+
+@feature("normalized_volume", inputs=("volume", "volume_mean"), windowed=True)
+def normalized_volume(volume, volume_mean, window):
+    return volume / volume_mean
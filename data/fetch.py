@@ -1,13 +1,15 @@
 import requests
 import logging
 from connections.client import BinanceClient
-from config.settings import TRADING_PAIR, TIMEFRAME, BINANCE_API_KEY, BINANCE_SECRET_KEY
-import time
-import pandas as pd
+from connections.session import get_session
+from connections.rate_limiter import get_rate_limiter, endpoint_weight, retry_after_seconds
+from config.settings import (TRADING_PAIR, TIMEFRAME, BINANCE_API_KEY, BINANCE_SECRET_KEY,
+                             BACKFILL_MAX_WORKERS, BINANCE_RATE_LIMIT_MAX_RETRIES)
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
 from datetime import datetime, timedelta
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Logging is configured by the entry point, not at import time.
 logger = logging.getLogger(__name__)
 
 class BinanceAPIError(Exception):
@@ -16,15 +18,29 @@ class BinanceAPIError(Exception):
 
 class BinanceBaseFetcher:
     @staticmethod
-    def _make_request(method, url, headers=None, params=None):
+    def _make_request(method, url, headers=None, params=None, limiter=None):
+        """
+        Send a REST request over the pooled session, charging its weight against the shared rate limiter.
+        :param limiter: Rate limiter for the endpoint's limit pool (default: the process-wide spot limiter).
+        """
+        limiter = limiter or get_rate_limiter()
+        session = get_session()
+        weight = endpoint_weight(urlparse(url).path, params)
         try:
             logger.info(f"Making {method} request to {url} with params: {params}")
-            if method == "GET":
-                response = requests.get(url, headers=headers, params=params)
-            elif method == "POST":
-                response = requests.post(url, headers=headers, params=params)
-            else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
+            for attempt in range(BINANCE_RATE_LIMIT_MAX_RETRIES + 1):
+                limiter.acquire(weight)
+                if method == "GET":
+                    response = session.get(url, headers=headers, params=params)
+                elif method == "POST":
+                    response = session.post(url, headers=headers, params=params)
+                else:
+                    raise ValueError(f"Unsupported HTTP method: {method}")
+
+                limiter.update_from_headers(response.headers)
+                if response.status_code not in (429, 418) or attempt == BINANCE_RATE_LIMIT_MAX_RETRIES:
+                    break
+                limiter.backoff(retry_after_seconds(response.headers, attempt))
 
             response.raise_for_status()
             logger.info(f"Raw Response: {response.text}")
@@ -37,8 +53,13 @@ class BinanceDataFetcher:
     """
     Fetches spot trading data using BinanceClient.
     """
-    def __init__(self):
-        self.client = BinanceClient()
+    def __init__(self, base_url=None, limiter=None):
+        """
+        :param base_url: Optional REST API root override (e.g., a local stub server).
+        :param limiter: Rate limiter to share with other fetchers (default: the process-wide limiter).
+        """
+        self.limiter = limiter or get_rate_limiter()
+        self.client = BinanceClient(base_url=base_url, limiter=self.limiter)
 
     def fetch_candlestick_data(self, symbol, interval, start_time, end_time, limit=1000):
         """
@@ -52,7 +73,7 @@ class BinanceDataFetcher:
         """
         try:
             logger.info(f"Fetching candlestick data for {symbol} with interval {interval}, startTime {start_time}, endTime {end_time}, limit {limit}.")
-            return self.client.client.get_klines(
+            return self.client.thread_client().get_klines(
                 symbol=symbol,
                 interval=interval,
                 startTime=start_time,
@@ -63,59 +84,239 @@ class BinanceDataFetcher:
             logger.error(f"Error fetching candlestick data: {e}")
             raise BinanceAPIError(f"Error fetching candlestick data: {e}")
 
-    def fetch_and_save_historical_data(self, symbol, interval, start_days_ago, end_days_ago, output_file):
+    @classmethod
+    def split_time_range(cls, start_time, end_time, interval, chunk_size=1000):
+        """
+        Split [start_time, end_time) into independent windows of at most `chunk_size` candles.
+        :param start_time: Start time in milliseconds.
+        :param end_time: End time in milliseconds (exclusive).
+        :param interval: Candlestick interval (e.g., '1m', '15m').
+        :param chunk_size: Candles per window (the API maximum is 1000).
+        :return: List of (window_start, window_end) tuples in milliseconds.
+        """
+        window_ms = chunk_size * cls.interval_to_milliseconds(interval)
+        return [(window_start, min(window_start + window_ms, end_time))
+                for window_start in range(start_time, end_time, window_ms)]
+
+    def _fetch_window(self, symbol, interval, window_start, window_end, chunk_size=1000):
+        """
+        Fetch every candle opening inside [window_start, window_end).
+        A window normally fits in a single request; the loop only continues when a full page
+        stops short of the window's last candle.
+        """
+        interval_ms = self.interval_to_milliseconds(interval)
+        window_data = []
+        current_start_time = window_start
+        while current_start_time < window_end:
+            logger.info(f"Fetching data from {datetime.fromtimestamp(current_start_time / 1000)} to {datetime.fromtimestamp(window_end / 1000)}.")
+            data = self.fetch_candlestick_data(
+                symbol=symbol,
+                interval=interval,
+                start_time=current_start_time,
+                end_time=window_end - 1,
+                limit=chunk_size
+            )
+            if not data:
+                break
+            window_data.extend(data)
+            if len(data) < chunk_size or data[-1][0] + interval_ms >= window_end:
+                break
+            current_start_time = data[-1][0] + 1  # Move to the next interval
+        return window_data
+
+    def fetch_historical_klines(self, symbol, interval, start_time, end_time, max_workers=BACKFILL_MAX_WORKERS):
+        """
+        Backfill raw klines for [start_time, end_time) by fetching independent windows concurrently.
+        Throttling is handled by the client's shared weight limiter, so `max_workers` only bounds the number of requests in flight.
+        :param symbol: Trading pair (e.g., 'BTCUSDT').
+        :param interval: Candlestick interval (e.g., '15m').
+        :param start_time: Start time in milliseconds.
+        :param end_time: End time in milliseconds (exclusive).
+        :param max_workers: Number of windows fetched in parallel (1 fetches serially).
+        :return: List of raw klines ordered by open time.
+        """
+        windows = self.split_time_range(start_time, end_time, interval)
+        logger.info(f"Fetching {len(windows)} windows for {symbol} with {max_workers} workers.")
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(lambda window: self._fetch_window(symbol, interval, *window), windows))
+
+        all_data = []
+        last_open_time = None
+        for window_data in results:
+            for kline in window_data:
+                if last_open_time is None or kline[0] > last_open_time:
+                    all_data.append(kline)
+                    last_open_time = kline[0]
+        return all_data
+
+    def _closed_end_time(self, interval, end_time=None):
+        """Clamp an end time so the still-open candle is excluded."""
+        interval_ms = self.interval_to_milliseconds(interval)
+        now = int(datetime.now().timestamp() * 1000)
+        return min(end_time if end_time is not None else now, now // interval_ms * interval_ms)
+
+    def _plan_sync(self, symbol, interval, start_time, end_time, store):
+        """List the (symbol, window_start, window_end) jobs needed to fill the store's gaps for one symbol."""
+        gaps = store.missing_ranges(symbol, interval, start_time, end_time, self.interval_to_milliseconds(interval))
+        windows = [window for gap in gaps for window in self.split_time_range(*gap, interval)]
+        if windows:
+            logger.info(f"Syncing {symbol} {interval}: {len(gaps)} missing ranges, {len(windows)} windows.")
+        else:
+            logger.info(f"{symbol} {interval} klines are already up to date.")
+        return [(symbol, *window) for window in windows]
+
+    def _run_sync(self, interval, jobs, store, max_workers):
+        """
+        Fetch sync jobs through one worker pool and stream each finished window into the store.
+        Failed windows, and responses with klines outside the requested window, are neither stored
+        nor checkpointed, so the next sync retries them. Missing candles are only checkpointed as
+        empty once they are more than one interval older than the last closed candle, so a late or
+        short response for recent candles never becomes a permanent hole.
+        :return: Dict of symbol to number of klines written.
+        """
+        from data.preprocess import klines_to_frame
+        interval_ms = self.interval_to_milliseconds(interval)
+        settled_end = self._closed_end_time(interval) - interval_ms
+        written = {symbol: 0 for symbol, _, _ in jobs}
+        failed = set()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(self._fetch_window, symbol, interval, window_start, window_end):
+                       (symbol, window_start, window_end) for symbol, window_start, window_end in jobs}
+            for future in as_completed(futures):
+                symbol, window_start, window_end = futures[future]
+                try:
+                    data = future.result()
+                except BinanceAPIError as e:
+                    logger.error(f"Error syncing {symbol} window starting {datetime.fromtimestamp(window_start / 1000)}: {e}")
+                    failed.add(symbol)
+                    continue
+                if any(not window_start <= kline[0] < window_end for kline in data):
+                    logger.error(f"Klines outside the {symbol} window starting {datetime.fromtimestamp(window_start / 1000)} "
+                                 f"were returned; the window is not stored.")
+                    failed.add(symbol)
+                    continue
+                if data:
+                    written[symbol] += store.write(symbol, interval, klines_to_frame(data))
+                # Whatever the exchange did not return for a settled window is a permanent hole.
+                empty = []
+                cursor = window_start
+                for kline in data:
+                    if kline[0] > cursor:
+                        empty.append((cursor, kline[0]))
+                    cursor = max(cursor, kline[0] + interval_ms)
+                if cursor < window_end:
+                    empty.append((cursor, window_end))
+                store.mark_empty(symbol, interval, [(start, min(end, settled_end)) for start, end in empty
+                                                    if start < settled_end])
+        if failed:
+            raise BinanceAPIError(f"Sync incomplete for {sorted(failed)}; rerun to fetch the remaining windows.")
+        return written
+
+    def sync_klines(self, symbol, interval, start_time, store, end_time=None, max_workers=BACKFILL_MAX_WORKERS):
+        """
+        Bring the kline store up to date by fetching only the ranges it does not hold yet.
+        Each window is written to the store as soon as it arrives, and windows the exchange has
+        no data for (outages, before listing) are checkpointed as empty once settled, so an interrupted
+        sync resumes where it stopped and later runs never refetch the same holes.
+        :param symbol: Trading pair (e.g., 'BTCUSDT').
+        :param interval: Candlestick interval (e.g., '1m').
+        :param start_time: Start time in milliseconds.
+        :param store: KlineStore to sync.
+        :param end_time: End time in milliseconds (default: now). The still-open candle is never stored.
+        :param max_workers: Number of windows fetched in parallel.
+        :return: Number of klines written.
+        """
+        end_time = self._closed_end_time(interval, end_time)
+        jobs = self._plan_sync(symbol, interval, start_time, end_time, store)
+        written = self._run_sync(interval, jobs, store, max_workers).get(symbol, 0)
+        logger.info(f"Synced {written} {interval} klines for {symbol}.")
+        return written
+
+    def get_symbols(self, quote_asset):
+        """
+        List the symbols currently trading against a quote asset.
+        :param quote_asset: Quote asset (e.g., 'USDT').
+        :return: Sorted list of symbols (e.g., ['BTCUSDT', 'ETHUSDT', ...]).
+        """
+        try:
+            exchange_info = self.client.client.get_exchange_info()
+        except Exception as e:
+            logger.error(f"Error fetching exchange info: {e}")
+            raise BinanceAPIError(f"Error fetching exchange info: {e}")
+        return sorted(item["symbol"] for item in exchange_info.get("symbols", [])
+                      if item.get("quoteAsset") == quote_asset and item.get("status") == "TRADING")
+
+    def sync_universe(self, interval, start_time, store, symbols=None, quote_asset=None, end_time=None,
+                      max_workers=BACKFILL_MAX_WORKERS):
+        """
+        Sync many symbols at once. All symbol/window fetches share one worker pool and the
+        client's weight limiter, and each window is written to the store as soon as it arrives.
+        :param interval: Candlestick interval (e.g., '1m').
+        :param start_time: Start time in milliseconds.
+        :param store: KlineStore to sync.
+        :param symbols: Symbols to sync (e.g., TRADING_PAIRS).
+        :param quote_asset: Sync every trading symbol quoted in this asset instead (e.g., 'USDT').
+        :param end_time: End time in milliseconds (default: now). The still-open candle is never stored.
+        :param max_workers: Number of windows fetched in parallel across all symbols.
+        :return: Dict of symbol to number of klines written.
         """
-        Fetch historical data and save it to a CSV file.
+        if symbols is None:
+            if quote_asset is None:
+                raise ValueError("Either symbols or quote_asset is required.")
+            symbols = self.get_symbols(quote_asset)
+        end_time = self._closed_end_time(interval, end_time)
+
+        jobs = [job for symbol in symbols for job in self._plan_sync(symbol, interval, start_time, end_time, store)]
+        logger.info(f"Syncing {len(symbols)} symbols with {len(jobs)} windows and {max_workers} workers.")
+        written = self._run_sync(interval, jobs, store, max_workers)
+        logger.info(f"Synced {sum(written.values())} {interval} klines across {len(written)} symbols.")
+        return {symbol: written.get(symbol, 0) for symbol in symbols}
+
+    def fetch_and_save_historical_data(self, symbol, interval, start_days_ago, end_days_ago, output_file=None,
+                                       max_workers=BACKFILL_MAX_WORKERS, store=None):
+        """
+        Fetch historical data and save it to a CSV file and/or a columnar kline store.
         :param symbol: Trading pair (e.g., 'BTCUSDT').
         :param interval: Candlestick interval (e.g., '15m').
         :param start_days_ago: Start time in days ago.
         :param end_days_ago: End time in days ago.
-        :param output_file: Name of the CSV file to save data.
+        :param output_file: Name of the CSV file to save data (optional).
+        :param max_workers: Number of windows fetched in parallel (1 fetches serially).
+        :param store: KlineStore receiving all 12 typed kline fields (optional).
         """
+        if output_file is None and store is None:
+            raise ValueError("Either output_file or store is required.")
+
         start_time = int((datetime.now() - timedelta(days=start_days_ago)).timestamp() * 1000)
         end_time = int((datetime.now() - timedelta(days=end_days_ago)).timestamp() * 1000)
 
         logger.info(f"Fetching historical data for {symbol} from {datetime.fromtimestamp(start_time / 1000)} to {datetime.fromtimestamp(end_time / 1000)} with {interval} interval.")
 
-        all_data = []
-        chunk_size = 1000  # Limit per API call
-        current_start_time = start_time
-
-        while current_start_time < end_time:
-            current_end_time = min(current_start_time + (chunk_size * self.interval_to_milliseconds(interval)), end_time)
-            logger.info(f"Fetching data from {datetime.fromtimestamp(current_start_time / 1000)} to {datetime.fromtimestamp(current_end_time / 1000)}.")
-            try:
-                data = self.fetch_candlestick_data(
-                    symbol=symbol,
-                    interval=interval,
-                    start_time=current_start_time,
-                    end_time=current_end_time,
-                    limit=chunk_size
-                )
-                if not data:
-                    logger.warning(f"No more data returned for time range: {datetime.fromtimestamp(current_start_time / 1000)} to {datetime.fromtimestamp(current_end_time / 1000)}.")
-                    break
-                all_data.extend(data)
-                current_start_time = data[-1][0] + 1  # Move to the next interval
-                time.sleep(0.1)  # Respect API rate limits
-            except Exception as e:
-                logger.error(f"Error fetching data: {e}")
-                raise
+        try:
+            all_data = self.fetch_historical_klines(symbol, interval, start_time, end_time, max_workers=max_workers)
+        except Exception as e:
+            logger.error(f"Error fetching data: {e}")
+            raise
 
         if not all_data:
             logger.warning("No data fetched for the specified time range.")
             return
 
-        logger.info(f"Fetched {len(all_data)} rows. Saving data to {output_file}.")
+        import pandas as pd
+        from data.preprocess import KLINE_COLUMNS, klines_to_frame
+
+        if store is not None:
+            logger.info(f"Fetched {len(all_data)} rows. Saving data to kline store {store.root}.")
+            store.write(symbol, interval, klines_to_frame(all_data))
 
-        columns = ["timestamp", "open", "high", "low", "close", "volume",
-                   "close_time", "quote_asset_volume", "number_of_trades",
-                   "taker_buy_base", "taker_buy_quote", "ignore"]
-        df = pd.DataFrame(all_data, columns=columns)
-        df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms")
-        df = df[["timestamp", "open", "high", "low", "close", "volume"]]
-        df.to_csv(output_file, index=False)
-        logger.info(f"Data saved successfully to {output_file}.")
+        if output_file is not None:
+            logger.info(f"Fetched {len(all_data)} rows. Saving data to {output_file}.")
+            df = pd.DataFrame(all_data, columns=KLINE_COLUMNS)
+            df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms")
+            df = df[["timestamp", "open", "high", "low", "close", "volume"]]
+            df.to_csv(output_file, index=False)
+            logger.info(f"Data saved successfully to {output_file}.")
 
     @staticmethod
     def interval_to_milliseconds(interval):
@@ -156,6 +357,7 @@ class BinanceOptionsFetcher(BinanceBaseFetcher):
         self.api_key = api_key
         self.api_secret = api_secret
         self.headers = {"X-MBX-APIKEY": self.api_key}
+        self.limiter = get_rate_limiter("options")
 
     def get_option_info(self, symbol):
         """
@@ -165,7 +367,7 @@ class BinanceOptionsFetcher(BinanceBaseFetcher):
         """
         endpoint = f"{self.BASE_URL}/eapi/v1/exchangeInfo"
         try:
-            data = self._make_request("GET", endpoint, headers=self.headers)
+            data = self._make_request("GET", endpoint, headers=self.headers, limiter=self.limiter)
             option_info = next((item for item in data.get('optionSymbols', []) if item['symbol'] == symbol), None)
             if option_info is None:
                 raise BinanceAPIError(f"Option symbol {symbol} not found.")
@@ -184,7 +386,7 @@ class BinanceOptionsFetcher(BinanceBaseFetcher):
         try:
             logger.info(f"Fetching current price for option symbol {symbol}")
             params = {"symbol": symbol}
-            data = self._make_request("GET", endpoint, headers=self.headers, params=params)
+            data = self._make_request("GET", endpoint, headers=self.headers, params=params, limiter=self.limiter)
             if not data or not isinstance(data, list):
                 raise BinanceAPIError(f"Unexpected response format: {data}")
             return float(data[0]['markPrice'])
@@ -212,7 +414,7 @@ class BinanceOptionsFetcher(BinanceBaseFetcher):
                 "endTime": endTime,
                 "limit": limit
             }
-            return self._make_request("GET", endpoint, headers=self.headers, params=params)
+            return self._make_request("GET", endpoint, headers=self.headers, params=params, limiter=self.limiter)
         except BinanceAPIError as e:
             logger.error(f"Error fetching historical option klines for {symbol}: {e}")
             raise
@@ -228,7 +430,7 @@ class BinanceOptionsFetcher(BinanceBaseFetcher):
         try:
             logger.info(f"Fetching recent trades for option symbol {symbol} with limit {limit}")
             params = {"symbol": symbol, "limit": limit}
-            return self._make_request("GET", endpoint, headers=self.headers, params=params)
+            return self._make_request("GET", endpoint, headers=self.headers, params=params, limiter=self.limiter)
         except BinanceAPIError as e:
             logger.error(f"Error fetching recent option trades for {symbol}: {e}")
             raise
@@ -0,0 +1,297 @@
+import hashlib
+import json
+import logging
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from importlib.metadata import version as package_version
+import numpy as np
+import pandas as pd
+from config.settings import MODEL_SEARCH_MAX_WORKERS, MODEL_STORE_DIR
+
+logger = logging.getLogger(__name__)
+
+MODEL_SUFFIX = ".pkl"
+METADATA_SUFFIX = ".json"
+# Metadata that defines what a model computes; a stored model is only reused or warm-started when these match.
+DEFINITION_KEYS = ("features", "window", "n_states", "covariance_type", "hmmlearn_version")
+REVIVE_WEIGHT = 1e-3  # start and transition probability given to a re-estimated state before warm EM
+FRESH_FIT_ATTEMPTS = 3  # seeds tried by a fresh fit before a degenerate fit is reported
+CRITERIA = {"bic": "holdout_bic", "aic": "holdout_aic", "log_likelihood": "holdout_log_likelihood"}
+
+# Training and holdout matrices of a search worker, sent once per process by _init_search_worker.
+_search_data = {}
+
+
+def data_hash(features):
+    """SHA-256 of a feature matrix (shape and float64 values), identifying the data a model was trained on."""
+    values = np.ascontiguousarray(features, dtype=np.float64)
+    digest = hashlib.sha256(str(values.shape).encode())
+    digest.update(values.tobytes())
+    return digest.hexdigest()
+
+
+def _set_full_covars(model, covars):
+    """Set (n_states x features x features) covariances in the model's own covariance type."""
+    if model.covariance_type == "full":
+        model.covars_ = covars
+    elif model.covariance_type == "diag":
+        model.covars_ = np.diagonal(covars, axis1=1, axis2=2)
+    elif model.covariance_type == "spherical":
+        model.covars_ = np.diagonal(covars, axis1=1, axis2=2).mean(axis=1)
+    else:
+        model.covars_ = covars.mean(axis=0)
+
+
+def _revive_degenerate_states(model, features):
+    """
+    Prepare a stored model for warm-start EM. A fit can leave a state with next to no occupancy
+    and a meaningless (even indefinite) covariance; EM divides by that occupancy and fails a few
+    iterations later. Such states, and states with fewer samples than a covariance needs, are
+    re-estimated from the mean and covariance of all the features and given REVIVE_WEIGHT of
+    start and transition probability, so EM can move samples back to them.
+    :return: Indices of the re-estimated states.
+    """
+    covars = np.array(model.covars_)
+    indefinite = np.array([np.linalg.eigvalsh(covariance)[0] <= 0 for covariance in covars])
+    _reestimate_states(model, features, covars, indefinite)
+    # With every covariance valid, states that barely explain any sample are found by occupancy.
+    starved = ~indefinite & (model.predict_proba(features).sum(axis=0) < features.shape[1] + 1)
+    _reestimate_states(model, features, covars, starved)
+    return np.flatnonzero(indefinite | starved)
+
+
+def _reestimate_states(model, features, covars, states):
+    """Reset the masked states to the overall mean and covariance and give them REVIVE_WEIGHT of probability."""
+    if not states.any():
+        return
+    covars[states] = np.cov(features, rowvar=False)
+    _set_full_covars(model, covars)
+    means = model.means_.copy()
+    means[states] = features.mean(axis=0)
+    model.means_ = means
+    model.startprob_ = (model.startprob_ + REVIVE_WEIGHT * states) / (1 + REVIVE_WEIGHT * states.sum())
+    transmat = model.transmat_ + REVIVE_WEIGHT * states
+    model.transmat_ = transmat / transmat.sum(axis=1, keepdims=True)
+
+
+class ModelRegistry:
+    """
+    Versioned on-disk store of trained HMMs with their metadata.
+
+    Each model name holds numbered versions, a pickled model next to a JSON metadata file:
+        <root>/<name>/v0001.pkl, <root>/<name>/v0001.json
+    Metadata records the feature definitions, window, training range, data hash and hmmlearn
+    version, so `fit` can reuse a stored model when nothing changed and warm-start EM from the
+    latest one when new data arrives.
+    """
+    def __init__(self, root=MODEL_STORE_DIR):
+        """
+        :param root: Directory holding the registry.
+        """
+        self.root = root
+
+    def _path(self, name, version, suffix):
+        return os.path.join(self.root, name, f"v{version:04d}{suffix}")
+
+    def versions(self, name):
+        """
+        List the stored versions of a model.
+        :return: Sorted list of version numbers.
+        """
+        directory = os.path.join(self.root, name)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(int(entry[1:-len(METADATA_SUFFIX)]) for entry in os.listdir(directory)
+                      if entry.startswith("v") and entry.endswith(METADATA_SUFFIX))
+
+    def metadata(self, name, version=None):
+        """
+        Load the metadata of a stored model.
+        :param version: Version number (default: the latest).
+        :return: Metadata dict, or None when the model has no versions.
+        """
+        versions = self.versions(name)
+        if not versions:
+            return None
+        with open(self._path(name, version or versions[-1], METADATA_SUFFIX)) as f:
+            return json.load(f)
+
+    def load(self, name, version=None):
+        """
+        Load a stored model.
+        :param version: Version number (default: the latest).
+        :return: (model, metadata), or (None, None) when the model has no versions.
+        """
+        metadata = self.metadata(name, version)
+        if metadata is None:
+            return None, None
+        with open(self._path(name, metadata["version"], MODEL_SUFFIX), "rb") as f:
+            return pickle.load(f), metadata
+
+    def save(self, name, model, metadata):
+        """
+        Store a model as the next version of `name`.
+        :param metadata: JSON-serializable dict; 'version' and 'created_at' are added.
+        :return: The stored metadata.
+        """
+        versions = self.versions(name)
+        metadata = {**metadata, "version": versions[-1] + 1 if versions else 1,
+                    "created_at": datetime.now(timezone.utc).isoformat()}
+        os.makedirs(os.path.join(self.root, name), exist_ok=True)
+        # The model is written first and the metadata last, so a listed version is always complete.
+        for suffix, mode, write in ((MODEL_SUFFIX, "wb", lambda f: pickle.dump(model, f)),
+                                    (METADATA_SUFFIX, "w", lambda f: json.dump(metadata, f, indent=2))):
+            path = self._path(name, metadata["version"], suffix)
+            with open(f"{path}.tmp", mode) as f:
+                write(f)
+            os.replace(f"{path}.tmp", path)
+        return metadata
+
+    def fit(self, name, features, n_states, definition, training_range=None, covariance_type="full",
+            n_iter=10, tol=1e-2, random_state=42):
+        """
+        Return a Gaussian HMM for the features, training only what is needed:
+        the latest stored model is reused as is when its definition and data hash match,
+        EM is warm-started from its parameters when only the data changed, and a new model
+        is fitted from scratch otherwise (also when the warm start fails, e.g. on a collapsed
+        state's singular covariance). Degenerate states of the stored model are re-estimated
+        before warm EM (see _revive_degenerate_states). Every trained model is stored as a new version.
+
+        :param name: Model name (e.g., 'BTCUSDT_1m').
+        :param features: (samples x features) training matrix.
+        :param n_states: Number of hidden states.
+        :param definition: Dict describing how the features were computed, with at least
+            'features' (names) and 'window'.
+        :param training_range: (first, last) timestamps of the training data, as strings.
+        :param covariance_type: GaussianHMM covariance type.
+        :param n_iter: Maximum number of EM iterations.
+        :param tol: EM convergence threshold on the log-likelihood gain.
+        :param random_state: Seed of fresh fits; a degenerate fit is retried with the next
+            FRESH_FIT_ATTEMPTS - 1 seeds.
+        :return: (model, metadata). Metadata records the EM iteration cap as 'n_iter' and the
+            iterations actually run as 'em_iterations'.
+        """
+        from hmmlearn.hmm import GaussianHMM
+        metadata = {**definition, "n_states": n_states, "covariance_type": covariance_type,
+                    "hmmlearn_version": package_version("hmmlearn"),
+                    "training_range": list(training_range) if training_range is not None else None,
+                    "n_samples": len(features), "data_hash": data_hash(features), "n_iter": n_iter, "tol": tol}
+        latest_metadata = self.metadata(name)
+        compatible = latest_metadata is not None and all(latest_metadata.get(key) == metadata[key]
+                                                         for key in DEFINITION_KEYS)
+        model = None
+        if compatible:
+            latest, _ = self.load(name, latest_metadata["version"])
+            if latest_metadata["data_hash"] == metadata["data_hash"]:
+                logger.info(f"Reusing {name} v{latest_metadata['version']}: definition and data unchanged.")
+                return latest, latest_metadata
+            logger.info(f"Warm-starting {name} from v{latest_metadata['version']} on {len(features)} samples.")
+            model = latest
+            model.init_params = ""  # keep the previous parameters as the starting point of EM
+            model.n_iter, model.tol = n_iter, tol
+            model.monitor_.n_iter, model.monitor_.tol = n_iter, tol
+            metadata["parent_version"] = latest_metadata["version"]
+            try:
+                revived = _revive_degenerate_states(model, features)
+                if len(revived):
+                    logger.info(f"Re-estimated degenerate states {revived.tolist()} of {name} before warm EM.")
+                metadata["revived_states"] = revived.tolist()
+                model.fit(features)
+            except (ValueError, np.linalg.LinAlgError) as e:
+                # EM can still collapse a state to a singular covariance on the new data.
+                logger.warning(f"Warm start of {name} failed ({e}); fitting from scratch.")
+                metadata.pop("revived_states", None)
+                model = None
+        if model is None:
+            logger.info(f"Fitting {name} from scratch on {len(features)} samples.")
+            metadata["parent_version"] = None
+            # A degenerate fit (a state collapsed onto a singular covariance) is retried with the next seeds.
+            for seed in range(random_state, random_state + FRESH_FIT_ATTEMPTS):
+                model = GaussianHMM(n_components=n_states, covariance_type=covariance_type, n_iter=n_iter, tol=tol,
+                                    random_state=seed)
+                try:
+                    model.fit(features)
+                    break
+                except (ValueError, np.linalg.LinAlgError) as e:
+                    if seed == random_state + FRESH_FIT_ATTEMPTS - 1:
+                        raise
+                    logger.warning(f"Fit of {name} with seed {seed} failed ({e}); retrying with seed {seed + 1}.")
+            metadata["random_state"] = seed
+        metadata.update(em_iterations=model.monitor_.iter, converged=bool(model.monitor_.converged),
+                        log_likelihood=float(model.monitor_.history[-1]))
+        return model, self.save(name, model, metadata)
+
+
+def _init_search_worker(train, holdout):
+    from threadpoolctl import threadpool_limits
+    # One BLAS thread per process: the pool parallelizes across fits, so threads would only contend.
+    threadpool_limits(1)
+    _search_data["train"], _search_data["holdout"] = train, holdout
+
+
+def _fit_candidate(n_states, covariance_type, seed, n_iter, tol):
+    """Fit one restart in a search worker and score it on the holdout."""
+    from hmmlearn.hmm import GaussianHMM
+    train, holdout = _search_data["train"], _search_data["holdout"]
+    row = {"n_states": n_states, "covariance_type": covariance_type, "seed": seed}
+    started = time.perf_counter()
+    model = GaussianHMM(n_components=n_states, covariance_type=covariance_type, n_iter=n_iter, tol=tol,
+                        random_state=seed)
+    try:
+        model.fit(train)
+        row.update(train_log_likelihood=model.score(train), holdout_log_likelihood=model.score(holdout),
+                   holdout_bic=model.bic(holdout), holdout_aic=model.aic(holdout),
+                   em_iterations=model.monitor_.iter, converged=bool(model.monitor_.converged), error=None)
+    except (ValueError, np.linalg.LinAlgError) as e:
+        # Degenerate fits (e.g., a collapsed state with a singular covariance) lose the search.
+        row.update(error=str(e))
+        model = None
+    row["seconds"] = time.perf_counter() - started
+    return row, model
+
+
+def search_models(features, n_states=(2, 3, 4), covariance_types=("full", "diag"), restarts=4,
+                  holdout=0.2, criterion="bic", n_iter=10, tol=1e-2, seed=42, max_workers=MODEL_SEARCH_MAX_WORKERS):
+    """
+    Fit Gaussian HMMs over a grid of state counts, covariance types and random restarts in a
+    process pool and pick the best by a holdout score. Fits are independent, so the search
+    scales with the number of processes as long as there are at least as many fits as cores.
+
+    :param features: (samples x features) matrix, in time order.
+    :param n_states: State counts to try.
+    :param covariance_types: GaussianHMM covariance types to try.
+    :param restarts: Random initializations per (n_states, covariance_type); seeds seed, seed + 1, ...
+    :param holdout: Fraction of the samples, taken from the end, that every fit is scored on.
+    :param criterion: 'bic' or 'aic' (lower is better) or 'log_likelihood' (higher is better), on the holdout.
+    :param n_iter: Maximum number of EM iterations per fit.
+    :param tol: EM convergence threshold.
+    :param seed: Seed of the first restart.
+    :param max_workers: Number of processes (None: all cores).
+    :return: (best model, DataFrame with one row per fit, best first).
+    """
+    if criterion not in CRITERIA:
+        raise ValueError(f"criterion must be one of {sorted(CRITERIA)}.")
+    features = np.ascontiguousarray(features, dtype=np.float64)
+    split = len(features) - int(len(features) * holdout)
+    train, held_out = features[:split], features[split:]
+    # Largest fits first, so the pool does not end waiting on one slow fit.
+    candidates = sorted(((k, covariance_type, seed + restart) for k in n_states
+                         for covariance_type in covariance_types for restart in range(restarts)),
+                        key=lambda candidate: (-candidate[0], candidate[1] != "full"))
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_search_worker,
+                             initargs=(train, held_out)) as executor:
+        futures = [executor.submit(_fit_candidate, *candidate, n_iter, tol) for candidate in candidates]
+        results = [future.result() for future in futures]
+    table = pd.DataFrame([row for row, _ in results])
+    models = [model for _, model in results]
+    column = CRITERIA[criterion]
+    if column not in table or table[column].isna().all():
+        raise ValueError(f"Every fit failed, e.g.: {table['error'].iloc[0]}")
+    order = table[column].sort_values(ascending=criterion != "log_likelihood", na_position="last").index
+    logger.info(f"Searched {len(candidates)} HMM fits; best {table.loc[order[0], 'n_states']} states, "
+                f"{table.loc[order[0], 'covariance_type']} covariance (holdout {criterion} "
+                f"{table.loc[order[0], column]:.1f}).")
+    return models[order[0]], table.loc[order].reset_index(drop=True)
@@ -0,0 +1,285 @@
+import asyncio
+import logging
+from bisect import bisect_left, insort
+from connections.client import BinanceClient
+from connections.websocket import BinanceWebSocketStream
+from config.settings import (BINANCE_WS_STREAM_URL, ORDER_BOOK_SNAPSHOT_LIMIT, ORDER_BOOK_UPDATE_SPEED,
+                             ORDER_BOOK_RESYNC_DELAY, ORDER_BOOK_RESYNC_MAX_DELAY)
+
+logger = logging.getLogger(__name__)
+
+
+class OrderBookOutOfSync(Exception):
+    """Raised when a depth diff does not follow the book's last update ID."""
+    pass
+
+
+class BookSide:
+    """
+    One side of an order book: a sorted array of price keys plus a price -> quantity map.
+    The best level is always at index 0, so top-of-book reads are O(1) and level lookups are O(log n).
+    """
+    def __init__(self, descending):
+        """
+        :param descending: True for bids (best = highest price), False for asks (best = lowest price).
+        """
+        self._sign = -1.0 if descending else 1.0
+        self._keys = []
+        self._quantities = {}
+
+    def __len__(self):
+        return len(self._keys)
+
+    def clear(self):
+        self._keys = []
+        self._quantities = {}
+
+    def update(self, price, quantity):
+        """
+        Set the quantity at a price level; a quantity of 0 removes the level.
+        """
+        if quantity == 0:
+            if self._quantities.pop(price, None) is not None:
+                key = self._sign * price
+                del self._keys[bisect_left(self._keys, key)]
+        else:
+            if price not in self._quantities:
+                insort(self._keys, self._sign * price)
+            self._quantities[price] = quantity
+
+    def best(self):
+        """Return (price, quantity) of the best level, or None if the side is empty."""
+        if not self._keys:
+            return None
+        price = self._sign * self._keys[0]
+        return price, self._quantities[price]
+
+    def top(self, n):
+        """Return the best `n` levels as (price, quantity) tuples."""
+        return [(self._sign * key, self._quantities[self._sign * key]) for key in self._keys[:n]]
+
+    def quantity_at(self, price):
+        """Return the quantity resting at `price` (0 if there is no such level)."""
+        return self._quantities.get(price, 0.0)
+
+    def vwap(self, size):
+        """
+        Volume-weighted average price of filling `size` against this side.
+        :return: Average fill price, or None if the side does not hold enough quantity.
+        """
+        remaining = size
+        notional = 0.0
+        for key in self._keys:
+            price = self._sign * key
+            fill = min(remaining, self._quantities[price])
+            notional += fill * price
+            remaining -= fill
+            if remaining <= 0:
+                return notional / size
+        return None
+
+
+class OrderBook:
+    """
+    Local replica of one symbol's order book, kept current from a REST snapshot and
+    WebSocket depth diffs using Binance's update-ID sequencing.
+    """
+    def __init__(self, symbol):
+        """
+        :param symbol: Trading pair (e.g., 'BTCUSDT').
+        """
+        self.symbol = symbol
+        self.bids = BookSide(descending=True)
+        self.asks = BookSide(descending=False)
+        self.last_update_id = None
+
+    @property
+    def synced(self):
+        return self.last_update_id is not None
+
+    def reset(self):
+        """Drop all levels; the book must be re-seeded from a snapshot."""
+        self.bids.clear()
+        self.asks.clear()
+        self.last_update_id = None
+
+    def apply_snapshot(self, snapshot):
+        """
+        Seed the book from a REST depth snapshot.
+        :param snapshot: Response of GET /api/v3/depth ({'lastUpdateId', 'bids', 'asks'}).
+        """
+        self.reset()
+        for price, quantity in snapshot["bids"]:
+            self.bids.update(float(price), float(quantity))
+        for price, quantity in snapshot["asks"]:
+            self.asks.update(float(price), float(quantity))
+        self.last_update_id = snapshot["lastUpdateId"]
+
+    def apply_depth_update(self, event):
+        """
+        Apply a `depthUpdate` stream event.
+        Events entirely covered by the snapshot are ignored; an event that skips update IDs
+        raises OrderBookOutOfSync and the book must be re-seeded.
+        :param event: Decoded depthUpdate event ({'U', 'u', 'b', 'a', ...}).
+        :return: True if the event was applied, False if it was stale.
+        """
+        if event["u"] <= self.last_update_id:
+            return False
+        if event["U"] > self.last_update_id + 1:
+            raise OrderBookOutOfSync(
+                f"{self.symbol}: expected update {self.last_update_id + 1}, got {event['U']}..{event['u']}.")
+        for price, quantity in event["b"]:
+            self.bids.update(float(price), float(quantity))
+        for price, quantity in event["a"]:
+            self.asks.update(float(price), float(quantity))
+        self.last_update_id = event["u"]
+        return True
+
+    def best_bid(self):
+        """Return (price, quantity) of the best bid, or None."""
+        return self.bids.best()
+
+    def best_ask(self):
+        """Return (price, quantity) of the best ask, or None."""
+        return self.asks.best()
+
+    def mid_price(self):
+        """Return the mid price, or None if either side is empty."""
+        bid, ask = self.bids.best(), self.asks.best()
+        if bid is None or ask is None:
+            return None
+        return (bid[0] + ask[0]) / 2
+
+    def depth(self, n):
+        """
+        Return the top `n` levels of each side.
+        :return: (bids, asks) as lists of (price, quantity), best first.
+        """
+        return self.bids.top(n), self.asks.top(n)
+
+    def vwap(self, side, size):
+        """
+        Average price to fill an order of `size` immediately.
+        :param side: 'BUY' (consumes asks) or 'SELL' (consumes bids).
+        :param size: Quantity in base asset.
+        :return: Average fill price, or None if the book is too thin.
+        """
+        if side == "BUY":
+            return self.asks.vwap(size)
+        if side == "SELL":
+            return self.bids.vwap(size)
+        raise ValueError(f"Unsupported side: {side}")
+
+
+class OrderBookManager:
+    """
+    Maintains local order books for many symbols from one depth stream connection set.
+    Diffs arriving before a symbol's snapshot are buffered, then replayed in sequence;
+    any gap triggers a fresh snapshot for that symbol only.
+    """
+    def __init__(self, symbols, client=None, stream_url=BINANCE_WS_STREAM_URL,
+                 snapshot_limit=ORDER_BOOK_SNAPSHOT_LIMIT, update_speed=ORDER_BOOK_UPDATE_SPEED):
+        """
+        :param symbols: Trading pairs to maintain (e.g., ['BTCUSDT', 'ETHUSDT']).
+        :param client: BinanceClient used for REST snapshots (default: a new client).
+        :param stream_url: Combined stream endpoint.
+        :param snapshot_limit: Depth of the REST snapshot (up to 5000 levels).
+        :param update_speed: Diff stream speed, '100ms' or '1000ms'.
+        """
+        self.client = client or BinanceClient()
+        self.snapshot_limit = snapshot_limit
+        self.books = {symbol: OrderBook(symbol) for symbol in symbols}
+        self._buffers = {symbol: [] for symbol in symbols}
+        self._syncing = set()
+        self._sync_tasks = set()  # strong references, so running sync tasks are not garbage-collected
+        suffix = "" if update_speed == "1000ms" else f"@{update_speed}"
+        self.stream = BinanceWebSocketStream([f"{symbol.lower()}@depth{suffix}" for symbol in symbols],
+                                             base_url=stream_url)
+        self.stream.subscribe("depthUpdate", self._on_depth_update)
+
+    def _fetch_snapshot(self, symbol):
+        # Snapshots of several symbols run on executor threads at once, so each uses its thread's Client.
+        return self.client.thread_client().get_order_book(symbol=symbol, limit=self.snapshot_limit)
+
+    async def _sync(self, symbol):
+        """
+        Seed a book from a snapshot and replay the diffs buffered meanwhile.
+        Failed snapshot requests and snapshots older than the buffered diffs are retried after an
+        exponential backoff, since every deep snapshot costs 250 request weight.
+        """
+        book = self.books[symbol]
+        loop = asyncio.get_running_loop()
+        delay = ORDER_BOOK_RESYNC_DELAY
+        try:
+            while True:
+                # Wait for the first diff so the snapshot can be checked against it.
+                while not self._buffers[symbol]:
+                    await asyncio.sleep(0.05)
+                try:
+                    snapshot = await loop.run_in_executor(None, self._fetch_snapshot, symbol)
+                except Exception as e:
+                    logger.error(f"{symbol} snapshot request failed ({e}); retrying in {delay} seconds.")
+                    # The buffered diffs are dropped rather than piling up while snapshots fail.
+                    self._buffers[symbol] = []
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, ORDER_BOOK_RESYNC_MAX_DELAY)
+                    continue
+                if snapshot["lastUpdateId"] < self._buffers[symbol][0]["U"]:
+                    logger.info(f"{symbol} snapshot is older than the buffered diffs; refetching in {delay} seconds.")
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, ORDER_BOOK_RESYNC_MAX_DELAY)
+                    continue
+                book.apply_snapshot(snapshot)
+                buffered, self._buffers[symbol] = self._buffers[symbol], []
+                try:
+                    for event in buffered:
+                        book.apply_depth_update(event)
+                except OrderBookOutOfSync as e:
+                    logger.warning(f"{e} Resyncing.")
+                    book.reset()
+                    continue
+                logger.info(f"{symbol} order book synced at update {book.last_update_id}.")
+                return
+        finally:
+            # Also on an unexpected error or cancellation, so the next diff starts a fresh sync.
+            self._syncing.discard(symbol)
+
+    def _on_sync_done(self, task):
+        self._sync_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Order book sync failed: {task.exception()!r}")
+
+    def _resync(self, symbol):
+        if symbol not in self._syncing:
+            self._syncing.add(symbol)
+            self.books[symbol].reset()
+            task = asyncio.get_running_loop().create_task(self._sync(symbol))
+            self._sync_tasks.add(task)
+            task.add_done_callback(self._on_sync_done)
+
+    def _on_depth_update(self, event):
+        symbol = event["s"]
+        book = self.books.get(symbol)
+        if book is None:
+            return
+        if not book.synced:
+            self._buffers[symbol].append(event)
+            self._resync(symbol)
+            return
+        try:
+            book.apply_depth_update(event)
+        except OrderBookOutOfSync as e:
+            logger.warning(f"{e} Resyncing.")
+            self._buffers[symbol] = [event]
+            book.reset()
+            self._syncing.discard(symbol)
+            self._resync(symbol)
+
+    async def run(self):
+        """Stream depth diffs and keep every book synced until `stop` is called."""
+        await self.stream.run()
+
+    async def stop(self):
+        await self.stream.stop()
+        for task in list(self._sync_tasks):
+            task.cancel()
@@ -0,0 +1,84 @@
+import io
+from itertools import chain
+import numpy as np
+import pandas as pd
+
+# Field order of a kline row as returned by the Binance REST and WebSocket APIs.
+KLINE_COLUMNS = ["timestamp", "open", "high", "low", "close", "volume",
+                 "close_time", "quote_asset_volume", "number_of_trades",
+                 "taker_buy_base", "taker_buy_quote", "ignore"]
+
+# Storage dtypes: millisecond timestamps stay int64, prices and volumes float64, trade counts int32.
+KLINE_DTYPES = {
+    "timestamp": np.int64,
+    "open": np.float64,
+    "high": np.float64,
+    "low": np.float64,
+    "close": np.float64,
+    "volume": np.float64,
+    "close_time": np.int64,
+    "quote_asset_volume": np.float64,
+    "number_of_trades": np.int32,
+    "taker_buy_base": np.float64,
+    "taker_buy_quote": np.float64,
+    "ignore": np.float64,
+}
+
+
+def _columns_from_matrix(matrix, as_frame):
+    # Every field fits exactly in float64 (ms timestamps are far below 2**53), so integer
+    # columns can be cast back without loss.
+    arrays = {column: matrix[:, position].astype(KLINE_DTYPES[column])
+              for position, column in enumerate(KLINE_COLUMNS)}
+    return pd.DataFrame(arrays, copy=False) if as_frame else arrays
+
+
+def decode_klines(klines, as_frame=True):
+    """
+    Decode raw kline rows (lists of strings and ints) into typed columns in one vectorized pass.
+    All cells are streamed straight into a single float64 buffer, so no intermediate
+    object DataFrame or per-row conversion is built.
+    :param klines: List of kline rows as returned by the API.
+    :param as_frame: Return a DataFrame (True) or a dict of NumPy arrays (False).
+    :return: Columns named KLINE_COLUMNS with KLINE_DTYPES.
+    """
+    n_fields = len(KLINE_COLUMNS)
+    matrix = np.fromiter(chain.from_iterable(klines), dtype=np.float64, count=len(klines) * n_fields)
+    return _columns_from_matrix(matrix.reshape(-1, n_fields), as_frame)
+
+
+def decode_klines_json(raw, as_frame=True):
+    """
+    Decode a raw klines JSON payload (bytes) without building Python objects per cell.
+    The nested array is rewritten into CSV text and parsed by Arrow's multi-threaded typed CSV reader.
+    :param raw: Response body of a klines request, e.g. b'[[1499040000000,"0.0163",...],...]'.
+    :param as_frame: Return a DataFrame (True) or a dict of NumPy arrays (False).
+    :return: Columns named KLINE_COLUMNS with KLINE_DTYPES.
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    body = bytes(raw).translate(None, b'" \t\r\n')
+    if body in (b"", b"[]"):
+        empty = {column: np.empty(0, dtype=dtype) for column, dtype in KLINE_DTYPES.items()}
+        return pd.DataFrame(empty) if as_frame else empty
+
+    body = body[2:-2].replace(b"],[", b"\n")
+    table = pa_csv.read_csv(
+        io.BytesIO(body),
+        read_options=pa_csv.ReadOptions(column_names=KLINE_COLUMNS),
+        convert_options=pa_csv.ConvertOptions(
+            column_types={column: pa.from_numpy_dtype(dtype) for column, dtype in KLINE_DTYPES.items()}),
+    )
+    if as_frame:
+        return table.to_pandas()
+    return {column: table[column].to_numpy() for column in KLINE_COLUMNS}
+
+
+def klines_to_frame(klines):
+    """
+    Convert raw kline rows into a typed DataFrame.
+    :param klines: List of kline rows as returned by the API.
+    :return: DataFrame with KLINE_COLUMNS and KLINE_DTYPES.
+    """
+    return decode_klines(klines)
@@ -0,0 +1,183 @@
+"""
+Walk-forward regime labelling of many symbols from the kline store.
+
+Features of every symbol are computed once and packed into one shared-memory array; worker
+processes attach to it by name, fit a Gaussian HMM on each training window and write the
+labels of the following window straight into a shared label array, so no DataFrame is pickled
+between processes. Labels are stored as Arrow IPC files next to the kline store layout:
+    <root>/symbol=BTCUSDT/interval=1m/regimes.arrow
+"""
+import logging
+import os
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory, util
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+from config.settings import REGIME_LABEL_MAX_WORKERS, REGIME_STORE_DIR
+from data.analysis import MarketRegimeAnalyzer
+from data.features import FeaturePipeline
+
+logger = logging.getLogger(__name__)
+
+REGIME_SCHEMA = pa.schema([("timestamp", pa.int64()), ("regime", pa.int8())])
+REGIME_FILE = "regimes.arrow"
+UNLABELLED = -1  # rows before the first prediction window, or whose fit failed
+
+# Shared arrays of a labelling worker, attached once per process by _init_label_worker.
+_shared = {}
+
+
+def regime_path(root, symbol, interval):
+    return os.path.join(root, f"symbol={symbol}", f"interval={interval}", REGIME_FILE)
+
+
+def write_regime_labels(root, symbol, interval, timestamps, labels):
+    """
+    Store the regime labels of one symbol, replacing earlier labels.
+    :param timestamps: Open times in milliseconds.
+    :param labels: Regime of each row (UNLABELLED where none was predicted).
+    :return: Path of the written file.
+    """
+    path = regime_path(root, symbol, interval)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    table = pa.table({"timestamp": np.asarray(timestamps, dtype=np.int64),
+                      "regime": np.asarray(labels, dtype=np.int8)}, schema=REGIME_SCHEMA)
+    # Write to a temporary file first so readers never see a half-written file.
+    feather.write_feather(table, f"{path}.tmp", compression="uncompressed")
+    os.replace(f"{path}.tmp", path)
+    return path
+
+
+def read_regime_labels(root, symbol, interval):
+    """
+    Read the regime labels of one symbol.
+    :return: DataFrame with 'timestamp' (ms) and 'regime' columns.
+    """
+    return feather.read_table(regime_path(root, symbol, interval)).to_pandas()
+
+
+def _attach(name, shape, dtype):
+    """
+    Map a block created by label_regimes into a worker. The parent owns the block and unlinks it:
+    the worker skips resource tracking where Python allows it (3.13+); before that, its
+    registration goes to the parent's tracker, where the block is already registered.
+    The mapping is closed when the worker exits.
+    """
+    if sys.version_info >= (3, 13):
+        block = shared_memory.SharedMemory(name=name, track=False)
+    else:
+        block = shared_memory.SharedMemory(name=name)
+    util.Finalize(None, _detach, args=(block,), exitpriority=10)
+    return block, np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+
+def _detach(block):
+    _shared.clear()  # the arrays viewing the block must go before it can be closed
+    block.close()
+
+
+def _init_label_worker(features_name, labels_name, n_rows, n_features):
+    from threadpoolctl import threadpool_limits
+    # One BLAS thread per process: the pool parallelizes across windows, so threads would only contend.
+    threadpool_limits(1)
+    _shared["features"] = _attach(features_name, (n_rows, n_features), np.float64)
+    _shared["labels"] = _attach(labels_name, (n_rows,), np.int8)
+
+
+def _label_window(train_start, train_end, predict_end, n_states, volatility_column, n_iter, random_state):
+    """
+    Fit on rows train_start .. train_end - 1 of the shared features and write the regimes of rows
+    train_end .. predict_end - 1, numbered by ascending mean volatility so labels are comparable
+    across windows and symbols.
+    :return: False when the fit failed (the rows keep UNLABELLED).
+    """
+    from hmmlearn.hmm import GaussianHMM
+    features = _shared["features"][1]
+    labels = _shared["labels"][1]
+    model = GaussianHMM(n_components=n_states, covariance_type="full", n_iter=n_iter, random_state=random_state)
+    try:
+        model.fit(features[train_start:train_end])
+        states = model.predict(features[train_end:predict_end])
+    except (ValueError, np.linalg.LinAlgError):
+        return False
+    rank = np.empty(n_states, dtype=np.int8)
+    rank[np.argsort(model.means_[:, volatility_column])] = np.arange(n_states)
+    labels[train_end:predict_end] = rank[states]
+    return True
+
+
+def _symbol_features(store, symbol, interval, start_time, end_time):
+    frame = store.read(symbol, interval, start_time, end_time, columns=["timestamp", "close", "volume"])
+    features = FeaturePipeline(frame, window=MarketRegimeAnalyzer.FEATURE_WINDOW).compute(
+        MarketRegimeAnalyzer.FEATURES)
+    valid = features.notna().all(axis=1).to_numpy()
+    return frame["timestamp"].to_numpy()[valid], features.to_numpy()[valid]
+
+
+def label_regimes(store, symbols, interval, train_window, predict_window, n_states=3, start_time=None,
+                  end_time=None, output_root=REGIME_STORE_DIR, n_iter=10, random_state=42,
+                  max_workers=REGIME_LABEL_MAX_WORKERS):
+    """
+    Walk-forward regime labelling of many symbols across processes: for each symbol, an HMM is
+    fitted on every `train_window` rows of MarketRegimeAnalyzer features and labels the next
+    `predict_window` rows, so no label depends on data after its window.
+    Labels are written per symbol with write_regime_labels.
+
+    :param store: KlineStore to read klines from.
+    :param symbols: Trading pairs to label.
+    :param interval: Candlestick interval (e.g., '1m').
+    :param train_window: Training rows per fit.
+    :param predict_window: Rows labelled by each fit (the step of the walk-forward).
+    :param n_states: Number of hidden states.
+    :param start_time: Inclusive start open time in milliseconds (optional).
+    :param end_time: Exclusive end open time in milliseconds (optional).
+    :param output_root: Root directory of the label files.
+    :param n_iter: Maximum number of EM iterations per fit.
+    :param random_state: Seed of every fit.
+    :param max_workers: Number of processes (None: all cores).
+    :return: DataFrame with one row per symbol: rows, windows, failed fits and the label file path.
+    """
+    timestamps, features = {}, {}
+    for symbol in symbols:
+        timestamps[symbol], features[symbol] = _symbol_features(store, symbol, interval, start_time, end_time)
+    offsets = np.concatenate(([0], np.cumsum([len(features[symbol]) for symbol in symbols])))
+    n_rows, n_features = int(offsets[-1]), len(MarketRegimeAnalyzer.FEATURES)
+    tasks = [(symbol, start + offsets[i], start + offsets[i] + train_window,
+              min(start + train_window + predict_window, len(features[symbol])) + offsets[i])
+             for i, symbol in enumerate(symbols)
+             for start in range(0, len(features[symbol]) - train_window, predict_window)]
+
+    features_block = shared_memory.SharedMemory(create=True, size=max(n_rows * n_features * 8, 1))
+    labels_block = shared_memory.SharedMemory(create=True, size=max(n_rows, 1))
+    try:
+        shared_features = np.ndarray((n_rows, n_features), dtype=np.float64, buffer=features_block.buf)
+        shared_labels = np.ndarray((n_rows,), dtype=np.int8, buffer=labels_block.buf)
+        for i, symbol in enumerate(symbols):
+            shared_features[offsets[i]:offsets[i + 1]] = features[symbol]
+        shared_labels[:] = UNLABELLED
+        logger.info(f"Labelling {len(symbols)} symbols in {len(tasks)} walk-forward windows.")
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_label_worker,
+                                 initargs=(features_block.name, labels_block.name, n_rows, n_features)) as executor:
+            volatility_column = MarketRegimeAnalyzer.FEATURES.index("volatility")
+            futures = [executor.submit(_label_window, *task[1:], n_states, volatility_column, n_iter, random_state)
+                       for task in tasks]
+            succeeded = [future.result() for future in futures]
+
+        windows = Counter(task[0] for task in tasks)
+        failures = Counter(task[0] for task, ok in zip(tasks, succeeded) if not ok)
+        summary = []
+        for i, symbol in enumerate(symbols):
+            path = write_regime_labels(output_root, symbol, interval, timestamps[symbol],
+                                       shared_labels[offsets[i]:offsets[i + 1]])
+            summary.append({"symbol": symbol, "rows": len(features[symbol]), "windows": windows[symbol],
+                            "failed_windows": failures[symbol], "path": path})
+        del shared_features, shared_labels
+    finally:
+        for block in (features_block, labels_block):
+            block.close()
+            block.unlink()
+    return pd.DataFrame(summary)
@@ -2,6 +2,7 @@ import requests
 import json
 from datetime import datetime
 from config.settings import SAMCO_USER_ID, SAMCO_PASSWORD
+from connections.session import get_session
 import os
 
 # Defining the endpoints as variables
@@ -48,7 +49,7 @@ def samco_connect():
 
     try:
         # Make the POST request
-        response = requests.post(
+        response = get_session().post(
             login_link,
             data=json.dumps(request_body),
             headers=headers
@@ -101,7 +102,7 @@ def get_historical_candle_data(session_token, exchange, symbolName, fromDate, to
     
     # API Request
     try:
-        response = requests.get(
+        response = get_session().get(
             historical_candledata_link,
             params={
                 'exchange': exchange,
@@ -151,7 +152,7 @@ def get_intraday_candle_data(session_token, symbolName, fromDate, toDate=None, e
     # print("Params:", params)
 
     try:
-        response = requests.get(historical_candledata_link, params=params, headers=headers)
+        response = get_session().get(historical_candledata_link, params=params, headers=headers)
         # print("Response Status Code:", response.status_code)
         if response.status_code == 500:
             print("Server error occurred. Check server status or parameters.")
@@ -212,7 +213,7 @@ def get_option_chain(session_token, searchSymbolName, exchange=None, expiryDate=
 
     # API Request
     try:
-        response = requests.get(option_chain_link, params=params, headers=headers)
+        response = get_session().get(option_chain_link, params=params, headers=headers)
         # print("Response Status Code:", response.status_code)
         if response.status_code == 500:
             print("Server error occurred. Check server status or parameters.")
@@ -0,0 +1,228 @@
+import json
+import logging
+import os
+from datetime import datetime, timezone
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.feather as feather
+from config.settings import KLINE_STORE_DIR
+from data.preprocess import KLINE_COLUMNS, KLINE_DTYPES
+
+logger = logging.getLogger(__name__)
+
+KLINE_SCHEMA = pa.schema([(column, pa.from_numpy_dtype(dtype)) for column, dtype in KLINE_DTYPES.items()])
+DAY_MS = 24 * 60 * 60 * 1000
+PARTITION_SUFFIX = ".arrow"
+SYNC_STATE_FILE = "_sync_state.json"
+
+
+def _day_of(timestamp_ms):
+    return datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+def subtract_ranges(ranges, removed):
+    """
+    Remove half-open [start, end) ranges from another sorted list of half-open ranges.
+    :param ranges: Sorted, non-overlapping (start, end) tuples.
+    :param removed: (start, end) tuples to cut out.
+    :return: Sorted list of the remaining (start, end) tuples.
+    """
+    remaining = []
+    for start, end in ranges:
+        pieces = [(start, end)]
+        for removed_start, removed_end in removed:
+            next_pieces = []
+            for piece_start, piece_end in pieces:
+                if removed_end <= piece_start or removed_start >= piece_end:
+                    next_pieces.append((piece_start, piece_end))
+                    continue
+                if piece_start < removed_start:
+                    next_pieces.append((piece_start, removed_start))
+                if removed_end < piece_end:
+                    next_pieces.append((removed_end, piece_end))
+            pieces = next_pieces
+        remaining.extend(pieces)
+    return remaining
+
+
+class KlineStore:
+    """
+    Columnar on-disk kline store.
+
+    Klines are kept as typed Arrow IPC (Feather v2) files partitioned by symbol, interval and UTC day:
+        <root>/symbol=BTCUSDT/interval=1m/date=2024-01-01.arrow
+    Uncompressed partitions are memory-mapped, so reads are zero-copy. Readers only open
+    the day files overlapping the requested range, load only the projected columns and
+    apply the exact time predicate to the boundary days.
+    """
+    def __init__(self, root=KLINE_STORE_DIR, compression="uncompressed"):
+        """
+        :param root: Directory holding the partitioned store.
+        :param compression: 'uncompressed' (memory-mapped, fastest reads), 'lz4' or 'zstd' (smaller files).
+        """
+        self.root = root
+        self.compression = compression
+
+    def _partition_dir(self, symbol, interval):
+        return os.path.join(self.root, f"symbol={symbol}", f"interval={interval}")
+
+    def _partition_path(self, symbol, interval, day):
+        return os.path.join(self._partition_dir(symbol, interval), f"date={day}{PARTITION_SUFFIX}")
+
+    def partitions(self, symbol, interval):
+        """
+        List the days stored for a symbol and interval.
+        :return: Sorted list of 'YYYY-MM-DD' strings.
+        """
+        directory = self._partition_dir(symbol, interval)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(name[len("date="):-len(PARTITION_SUFFIX)] for name in os.listdir(directory)
+                      if name.startswith("date=") and name.endswith(PARTITION_SUFFIX))
+
+    def _sync_state_path(self, symbol, interval):
+        return os.path.join(self._partition_dir(symbol, interval), SYNC_STATE_FILE)
+
+    def load_sync_state(self, symbol, interval):
+        """
+        Load the sync checkpoint for a symbol and interval.
+        :return: Dict with 'empty_ranges': ranges the exchange confirmed to have no klines (outages, pre-listing).
+        """
+        path = self._sync_state_path(symbol, interval)
+        if not os.path.exists(path):
+            return {"empty_ranges": []}
+        with open(path) as f:
+            return json.load(f)
+
+    def mark_empty(self, symbol, interval, ranges):
+        """
+        Checkpoint ranges the exchange returned no klines for, so later syncs skip them.
+        :param ranges: (start, end) tuples in milliseconds.
+        """
+        if not ranges:
+            return
+        state = self.load_sync_state(symbol, interval)
+        merged = []
+        for start, end in sorted([tuple(r) for r in state["empty_ranges"]] + [tuple(r) for r in ranges]):
+            if merged and start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            else:
+                merged.append((start, end))
+        state["empty_ranges"] = [list(r) for r in merged]
+
+        os.makedirs(self._partition_dir(symbol, interval), exist_ok=True)
+        path = self._sync_state_path(symbol, interval)
+        with open(f"{path}.tmp", "w") as f:
+            json.dump(state, f)
+        os.replace(f"{path}.tmp", path)
+
+    def missing_ranges(self, symbol, interval, start_time, end_time, interval_ms):
+        """
+        Find the open-time ranges inside [start_time, end_time) that the store does not hold yet.
+        Ranges checkpointed as empty by `mark_empty` are not reported again.
+        :param symbol: Trading pair (e.g., 'BTCUSDT').
+        :param interval: Candlestick interval (e.g., '1m').
+        :param start_time: Inclusive start open time in milliseconds.
+        :param end_time: Exclusive end open time in milliseconds.
+        :param interval_ms: Interval length in milliseconds.
+        :return: Sorted list of (start, end) tuples in milliseconds.
+        """
+        first_open = -(-start_time // interval_ms) * interval_ms
+        if first_open >= end_time:
+            return []
+        stored = self.read_table(symbol, interval, first_open, end_time, columns=["timestamp"])
+        open_times = stored["timestamp"].to_numpy()
+
+        if len(open_times) == 0:
+            gaps = [(first_open, end_time)]
+        else:
+            gaps = []
+            if open_times[0] > first_open:
+                gaps.append((first_open, int(open_times[0])))
+            holes = (open_times[1:] - open_times[:-1]) > interval_ms
+            for before, after in zip(open_times[:-1][holes], open_times[1:][holes]):
+                gaps.append((int(before) + interval_ms, int(after)))
+            if open_times[-1] + interval_ms < end_time:
+                gaps.append((int(open_times[-1]) + interval_ms, end_time))
+
+        empty_ranges = self.load_sync_state(symbol, interval)["empty_ranges"]
+        return subtract_ranges(gaps, empty_ranges)
+
+    def _read_partition(self, symbol, interval, day, columns=None):
+        return feather.read_table(self._partition_path(symbol, interval, day), columns=columns,
+                                  memory_map=self.compression == "uncompressed")
+
+    def write(self, symbol, interval, klines):
+        """
+        Merge klines into the store, replacing rows with the same open time.
+        :param symbol: Trading pair (e.g., 'BTCUSDT').
+        :param interval: Candlestick interval (e.g., '1m').
+        :param klines: Typed kline DataFrame (see data.preprocess.klines_to_frame).
+        :return: Number of rows written.
+        """
+        if klines is None or len(klines) == 0:
+            return 0
+        klines = klines[KLINE_COLUMNS].astype(KLINE_DTYPES)
+        os.makedirs(self._partition_dir(symbol, interval), exist_ok=True)
+
+        days = (klines["timestamp"] // DAY_MS).to_numpy()
+        for day_index, day_klines in klines.groupby(days, sort=True):
+            day = _day_of(int(day_index) * DAY_MS)
+            path = self._partition_path(symbol, interval, day)
+            if os.path.exists(path):
+                existing = self._read_partition(symbol, interval, day).to_pandas()
+                day_klines = pd.concat([existing, day_klines], ignore_index=True)
+            day_klines = (day_klines.drop_duplicates("timestamp", keep="last")
+                          .sort_values("timestamp", ignore_index=True))
+            table = pa.Table.from_pandas(day_klines, schema=KLINE_SCHEMA, preserve_index=False)
+            # Write to a temporary file first so readers never see a half-written partition.
+            tmp_path = f"{path}.tmp"
+            feather.write_feather(table, tmp_path, compression=self.compression)
+            os.replace(tmp_path, path)
+        logger.info(f"Stored {len(klines)} {interval} klines for {symbol} in {self.root}.")
+        return len(klines)
+
+    def read_table(self, symbol, interval, start_time=None, end_time=None, columns=None):
+        """
+        Read klines as an Arrow table.
+        :param symbol: Trading pair (e.g., 'BTCUSDT').
+        :param interval: Candlestick interval (e.g., '1m').
+        :param start_time: Inclusive start open time in milliseconds (optional).
+        :param end_time: Exclusive end open time in milliseconds (optional).
+        :param columns: Columns to load (default: all 12 kline fields).
+        :return: pyarrow.Table ordered by open time.
+        """
+        columns = list(columns or KLINE_COLUMNS)
+        days = self.partitions(symbol, interval)
+        if start_time is not None:
+            days = [day for day in days if day >= _day_of(start_time)]
+        if end_time is not None:
+            days = [day for day in days if day <= _day_of(end_time - 1)]
+        if not days:
+            return KLINE_SCHEMA.empty_table().select(columns)
+
+        # The time predicate needs the timestamp column, even if it is not projected.
+        filtered = start_time is not None or end_time is not None
+        load_columns = columns if not filtered or "timestamp" in columns else ["timestamp"] + columns
+
+        tables = []
+        for position, day in enumerate(days):
+            table = self._read_partition(symbol, interval, day, load_columns)
+            # Interior days lie entirely inside the range; only the first and last need filtering.
+            if filtered and position in (0, len(days) - 1):
+                mask = None
+                if start_time is not None:
+                    mask = pc.greater_equal(table["timestamp"], start_time)
+                if end_time is not None:
+                    upper = pc.less(table["timestamp"], end_time)
+                    mask = upper if mask is None else pc.and_(mask, upper)
+                table = table.filter(mask)
+            tables.append(table)
+        return pa.concat_tables(tables).select(columns)
+
+    def read(self, symbol, interval, start_time=None, end_time=None, columns=None):
+        """
+        Read klines as a DataFrame; see `read_table` for the parameters.
+        """
+        return self.read_table(symbol, interval, start_time, end_time, columns).to_pandas()
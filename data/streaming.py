@@ -0,0 +1,486 @@
+"""
+Incremental counterparts of the features in data.timeseries for live candles.
+
+Each state keeps only the last `window` observations and returns the newest feature value from
+`update`, equal (up to rounding) to the last row of the batch function run on the history so far.
+"""
+import math
+from collections import deque
+import numpy as np
+from data.timeseries import fractal_dimension
+
+
+def _divide(a, b):
+    """a / b with numpy's float semantics (inf or NaN instead of ZeroDivisionError)."""
+    try:
+        return a / b
+    except ZeroDivisionError:
+        if a == 0 or math.isnan(a):
+            return math.nan
+        return math.copysign(math.inf, a) * math.copysign(1.0, b)
+
+
+def _log(x):
+    """np.log semantics for scalars: -inf at 0, NaN below."""
+    if x > 0:
+        return math.log(x)
+    return -math.inf if x == 0 else math.nan
+
+
+class CompensatedSum:
+    """Running sum with Neumaier compensation, so large values leaving a window do not leave rounding residue."""
+    __slots__ = ("_sum", "_compensation")
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._sum = self._compensation = 0.0
+
+    def add(self, x):
+        total = self._sum + x
+        if abs(self._sum) >= abs(x):
+            self._compensation += (self._sum - total) + x
+        else:
+            self._compensation += (x - total) + self._sum
+        self._sum = total
+
+    @property
+    def value(self):
+        return self._sum + self._compensation
+
+
+class RollingSum:
+    """
+    Trailing sum of the last `window` values in O(1) per update, with pandas' rolling(window).sum()
+    semantics: NaN until the window is full and while it holds a NaN or inf.
+    """
+    def __init__(self, window):
+        """
+        :param window: Number of values in the sum.
+        """
+        self.window = window
+        self._values = deque()
+        self._total = CompensatedSum()
+        self._missing = 0
+
+    def update(self, value):
+        """Push a value and return the sum of the window ending at it."""
+        self._values.append(value)
+        if math.isfinite(value):
+            self._total.add(value)
+        else:
+            self._missing += 1
+        if len(self._values) > self.window:
+            old = self._values.popleft()
+            if math.isfinite(old):
+                self._total.add(-old)
+            else:
+                self._missing -= 1
+        if self._missing == len(self._values):
+            self._total.reset()
+        if self._missing or len(self._values) < self.window:
+            return math.nan
+        return self._total.value
+
+
+class RollingMean(RollingSum):
+    """Trailing mean of the last `window` values, as pandas' rolling(window).mean()."""
+    def update(self, value):
+        return super().update(value) / self.window
+
+
+class RollingStd:
+    """Trailing sample standard deviation of the last `window` values, as pandas' rolling(window).std()."""
+    def __init__(self, window):
+        """
+        :param window: Number of values in the window (at least 2).
+        """
+        self.window = window
+        self._sum = RollingSum(window)
+        self._squares = RollingSum(window)
+
+    def update(self, value):
+        """Push a value and return the standard deviation of the window ending at it."""
+        total = self._sum.update(value)
+        squares = self._squares.update(value * value)
+        return math.sqrt(max(squares - total * total / self.window, 0.0) / (self.window - 1))
+
+
+class RegimeFeatureState:
+    """
+    Streaming features of MarketRegimeAnalyzer: log return, volatility (rolling std of log
+    returns) and volume over its rolling mean, as computed by data.features.FeaturePipeline.
+    """
+    def __init__(self, window=20):
+        """
+        :param window: Rolling window of the volatility and the volume mean.
+        """
+        self._volatility = RollingStd(window)
+        self._volume_mean = RollingMean(window)
+        self._prev_close = math.nan
+
+    def update(self, close, volume):
+        """
+        :return: Array of (log_return, volatility, normalized_volume); NaN entries while warming up.
+        """
+        log_return = _log(_divide(close, self._prev_close))
+        self._prev_close = close
+        return np.array([log_return, self._volatility.update(log_return),
+                         _divide(volume, self._volume_mean.update(volume))])
+
+
+class RollMeasureState:
+    """Streaming timeseries.roll_measure: cumulative log return over the last `window` returns."""
+    def __init__(self, window):
+        """
+        :param window: Window length in returns, as in roll_measure.
+        """
+        self._returns = RollingSum(window - 1) if window > 1 else None
+        self._count = 0
+        self._window = window
+        self._prev_close = math.nan
+
+    def update(self, close):
+        """
+        :param close: Newest close price.
+        :return: roll_measure at this candle (NaN while warming up or when the return is missing).
+        """
+        log_return = _log(_divide(close, self._prev_close))
+        self._prev_close = close
+        if math.isnan(log_return):
+            return math.nan  # missing returns are skipped, as the batch function drops them
+        self._count += 1
+        if self._returns is None:
+            return 0.0 if math.isfinite(log_return) else math.nan
+        rolled = self._returns.update(log_return)
+        return rolled if self._count >= self._window else math.nan
+
+
+class RollSpreadState:
+    """Streaming timeseries.roll_spread: Roll (1984) spread over the last `window` price-change pairs."""
+    def __init__(self, window):
+        """
+        :param window: Number of price-change pairs per window.
+        """
+        self.window = window
+        self._sum_x = RollingSum(window)
+        self._sum_y = RollingSum(window)
+        self._sum_xy = RollingSum(window)
+        self._prev_price = math.nan
+        self._prev_change = math.nan
+
+    def update(self, price):
+        """
+        :param price: Newest price (pass log prices for a relative spread).
+        :return: Spread estimate, NaN until a full window of valid pairs is available.
+        """
+        change = price - self._prev_price
+        lagged = self._prev_change
+        self._prev_price, self._prev_change = price, change
+        if math.isnan(change) or math.isnan(lagged):
+            change = lagged = math.nan
+        sum_x = self._sum_x.update(change)
+        sum_y = self._sum_y.update(lagged)
+        sum_xy = self._sum_xy.update(change * lagged)
+        covariance = (sum_xy - sum_x * sum_y / self.window) / (self.window - 1)
+        if math.isnan(covariance):
+            return math.nan
+        return 2.0 * math.sqrt(max(-covariance, 0.0))
+
+
+class CorwinSchultzState:
+    """Streaming timeseries.corwin_schultz_hl."""
+    def __init__(self, window):
+        """
+        :param window: Rolling window in candles.
+        """
+        self._volume = RollingSum(window)
+        self._weighted = RollingMean(window)
+        self._prev_spread = math.nan
+        self._total = 0.0
+
+    def update(self, high, low, volume):
+        """
+        :return: Corwin-Schultz estimate at this candle.
+        """
+        spread = high - low
+        spread_return = _log(_divide(spread, self._prev_spread))
+        self._prev_spread = spread
+        weighted = _divide(spread_return * volume, self._volume.update(volume))
+        average = self._weighted.update(weighted)
+        if math.isnan(average):
+            return math.nan
+        self._total += average
+        return math.exp(self._total) - 1
+
+
+class BekkerParkinsonState:
+    """Streaming timeseries.bekker_parkinson_vol."""
+    def __init__(self, window=10):
+        """
+        :param window: Normalizing window.
+        """
+        self.window = window
+        self._prev_close = math.nan
+        self._rqv = 0.0
+
+    def update(self, high, low, close):
+        """
+        :return: Bekker-Parkinson volatility at this candle.
+        """
+        log_return = _log(_divide((high + low) / 2, self._prev_close))
+        self._prev_close = close
+        if math.isnan(log_return):
+            return math.nan
+        self._rqv += log_return ** 2
+        return math.sqrt(self._rqv / self.window)
+
+
+class RollingOLSState:
+    """
+    Streaming timeseries.rolling_ols: slope of y on x over the last `window` pairs (all pairs so far
+    when window is None) in O(1) per update, from compensated running sums of x, y, x^2 and xy.
+    """
+    def __init__(self, window=None, min_periods=None, intercept=True):
+        """
+        :param window: Number of trailing updates per regression, or None for an expanding regression.
+        :param min_periods: Minimum number of valid pairs (default: window, or 2 when expanding).
+        :param intercept: Fit an intercept (otherwise the line goes through the origin).
+        """
+        if window is not None and window < 2:
+            raise ValueError("window must be at least 2.")
+        self.window = window
+        if min_periods is None:
+            min_periods = 2 if window is None else window
+        self.min_periods = min_periods
+        self.intercept = intercept
+        self._pairs = deque()
+        self._sums = [CompensatedSum() for _ in range(4)]  # x, y, x^2, xy
+        self._count = 0
+
+    def _add(self, y, x, sign):
+        for total, value in zip(self._sums, (x, y, x * x, x * y)):
+            total.add(sign * value)
+
+    def update(self, y, x):
+        """
+        Push a pair (skipped in the sums when x or y is not finite) and return the slope of the
+        window ending at it. Arguments are in timeseries.rolling_ols order: dependent, then regressor.
+        """
+        valid = math.isfinite(x) and math.isfinite(y)
+        if valid:
+            self._add(y, x, 1.0)
+            self._count += 1
+        if self.window is not None:
+            self._pairs.append((y, x, valid))
+            if len(self._pairs) > self.window:
+                old_y, old_x, old_valid = self._pairs.popleft()
+                if old_valid:
+                    self._add(old_y, old_x, -1.0)
+                    self._count -= 1
+        if self._count == 0:
+            for total in self._sums:
+                total.reset()
+        if self._count < self.min_periods:
+            return math.nan
+        sum_x, sum_y, sum_xx, sum_xy = (total.value for total in self._sums)
+        variation = sum_xx
+        if self.intercept:
+            variation -= sum_x * sum_x / self._count
+            sum_xy -= sum_x * sum_y / self._count
+        return sum_xy / variation if variation > 1e-12 * sum_xx else math.nan
+
+
+class KylesLambdaState:
+    """Streaming timeseries.kyles_lambda."""
+    def __init__(self, window):
+        """
+        :param window: Rolling window in candles, or None for an expanding regression.
+        """
+        self._regression = RollingOLSState(window)
+        self._prev_close = math.nan
+        self._sign = math.nan
+
+    def update(self, close, volume, taker_buy_volume=None):
+        """
+        :param taker_buy_volume: Taker buy volume of the candle (optional; the tick rule signs otherwise).
+        :return: Kyle's lambda at this candle.
+        """
+        change = close - self._prev_close
+        self._prev_close = close
+        if taker_buy_volume is None:
+            if change != 0:
+                self._sign = math.copysign(1.0, change) if not math.isnan(change) else math.nan
+            signed_volume = self._sign * volume
+        else:
+            signed_volume = 2 * taker_buy_volume - volume
+        return self._regression.update(change, signed_volume)
+
+
+class AmihudsLambdaState:
+    """Streaming timeseries.amihuds_lambda."""
+    def __init__(self, window=10):
+        """
+        :param window: Rolling window in candles, or None for an expanding regression.
+        """
+        self._regression = RollingOLSState(window)
+        self._prev_close = math.nan
+
+    def update(self, close, volume):
+        """
+        :return: Amihud's lambda at this candle.
+        """
+        abs_return = abs(_log(_divide(close, self._prev_close)))
+        self._prev_close = close
+        return self._regression.update(abs_return, close * volume)
+
+
+class HasbroucksLambdaState:
+    """Streaming timeseries.hasbroucks_lambda."""
+    def __init__(self, window=10):
+        """
+        :param window: Rolling window in candles.
+        """
+        self._abs_return = RollingMean(window)
+        self._abs_volume = RollingMean(window)
+        self._lambda = RollingMean(window)
+        self._prev_close = math.nan
+
+    def update(self, close, volume):
+        """
+        :return: Hasbrouck's lambda at this candle.
+        """
+        log_return = _log(_divide(close, self._prev_close))
+        self._prev_close = close
+        ratio = _divide(self._abs_return.update(abs(log_return)), self._abs_volume.update(abs(volume)))
+        return self._lambda.update(ratio)
+
+
+class PermutationEntropyState:
+    """Streaming timeseries.rolling_permutation_entropy, O(m^2) per update."""
+    def __init__(self, m, window):
+        """
+        :param m: Length of the subsequences.
+        :param window: Window length in samples (at least m).
+        """
+        if window < m:
+            raise ValueError("window must be at least m.")
+        self.m = m
+        self._n_patterns = window - m + 1
+        self._values = deque(maxlen=m)
+        self._cells = deque()
+        self._counts = np.zeros(m * m, dtype=np.int64)
+
+    def _pattern_cells(self):
+        values = list(self._values)
+        ranks = [sum(1 for k in range(self.m) if values[k] < values[j] or (values[k] == values[j] and k < j))
+                 for j in range(self.m)]
+        return [ranks[j] * self.m + ranks[(j + 1) % self.m] for j in range(self.m)]
+
+    def update(self, value):
+        """
+        :param value: Newest sample.
+        :return: Permutation entropy of the window ending at it (NaN while warming up).
+        """
+        self._values.append(value)
+        if len(self._values) < self.m:
+            return math.nan
+        cells = self._pattern_cells()
+        self._cells.append(cells)
+        for cell in cells:
+            self._counts[cell] += 1
+        if len(self._cells) > self._n_patterns:
+            for cell in self._cells.popleft():
+                self._counts[cell] -= 1
+        if len(self._cells) < self._n_patterns:
+            return math.nan
+        p = self._counts[self._counts > 0] / self._n_patterns
+        return float(-np.sum(p * np.log(p)) / np.log(self.m))
+
+
+class RollingHurstState:
+    """
+    Streaming timeseries.rolling_hurst, O(window) per update: the per-lag sums of differences
+    are slid by one sample and recomputed exactly every `window` updates to bound rounding drift.
+    """
+    def __init__(self, window):
+        """
+        :param window: Window length in samples (at least 9).
+        """
+        if window < 9:
+            raise ValueError("window must be at least 9.")
+        self.window = window
+        self._lags = np.arange(2, window // 3)
+        self._log_lags = np.log(self._lags)
+        self._log_lag_norm = np.dot(self._log_lags, self._log_lags)
+        self._count = window - self._lags
+        self._ring = np.empty(window)
+        self._head = 0  # ring position of the oldest sample once the window is full
+        self._seen = 0
+        self._sums = None
+        self._squares = None
+
+    def _ordered(self):
+        return np.concatenate((self._ring[self._head:], self._ring[:self._head]))
+
+    def _recompute(self):
+        values = self._ordered()
+        self._sums = np.empty(len(self._lags))
+        self._squares = np.empty(len(self._lags))
+        for k, lag in enumerate(self._lags):
+            d = values[lag:] - values[:-lag]
+            self._sums[k] = d.sum()
+            self._squares[k] = np.dot(d, d)
+
+    def update(self, value):
+        """
+        :param value: Newest sample.
+        :return: Hurst exponent of the window ending at it (NaN while warming up).
+        """
+        self._seen += 1
+        if self._seen <= self.window:
+            self._ring[self._seen - 1] = value
+            if self._seen < self.window:
+                return math.nan
+            self._recompute()
+        else:
+            oldest = self._head
+            removed = self._ring[(oldest + self._lags) % self.window] - self._ring[oldest]
+            self._ring[oldest] = value
+            self._head = (oldest + 1) % self.window
+            if self._seen % self.window == 0:
+                self._recompute()
+            else:
+                added = value - self._ring[(oldest - self._lags) % self.window]
+                self._sums += added - removed
+                self._squares += added * added - removed * removed
+        mean = self._sums / self._count
+        variance = np.maximum(self._squares / self._count - mean * mean, 0.0)
+        with np.errstate(divide="ignore"):
+            log_tau = 0.25 * np.log(variance)
+        return float(2.0 * np.dot(self._log_lags, log_tau) / self._log_lag_norm)
+
+
+class FractalDimensionState:
+    """Streaming timeseries.rolling_fractal_dimension, O(window) per update."""
+    def __init__(self, window, n_box_sizes=10):
+        """
+        :param window: Window length in samples (at least 4).
+        :param n_box_sizes: Number of log-spaced box sizes in the regression.
+        """
+        self.window = window
+        self.n_box_sizes = n_box_sizes
+        self._values = deque(maxlen=window)
+
+    def update(self, value):
+        """
+        :param value: Newest sample.
+        :return: Fractal dimension of the window ending at it (NaN while warming up).
+        """
+        self._values.append(value)
+        if len(self._values) < self.window:
+            return math.nan
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return fractal_dimension(np.fromiter(self._values, dtype=np.float64, count=self.window),
+                                     self.n_box_sizes)
@@ -1,8 +1,28 @@
 import numpy as np
 import pandas as pd
-from scipy.signal import resample
-from scipy.spatial import Delaunay
-import numba as nb
+from numpy.lib.stride_tricks import sliding_window_view
+from config.settings import FEATURE_DTYPE
+
+
+def _ordinal_cells(timeseries, m):
+    """
+    Rank-transition cells of every length-m window, computed for all windows at once.
+    Window i contributes the m cells rank[j] * m + rank[j + 1] (cyclically, as np.roll does).
+    Ties are ranked by position, like a stable argsort.
+
+    :param timeseries: 1-D array-like of length n.
+    :param m: Length of the subsequences.
+    :return: int32 array of shape (n - m + 1, m).
+    """
+    windows = sliding_window_view(np.asarray(timeseries, dtype=np.float64), m)
+    ranks = np.zeros(windows.shape, dtype=np.int32)
+    for j in range(m):
+        for k in range(m):
+            if k < j:
+                ranks[:, j] += windows[:, k] <= windows[:, j]
+            elif k > j:
+                ranks[:, j] += windows[:, k] < windows[:, j]
+    return ranks * m + np.roll(ranks, -1, axis=1)
 
 
 def permutation_entropy(timeseries, m):
@@ -13,71 +33,400 @@ def permutation_entropy(timeseries, m):
     which stores the count of each unique permutation of the subsequence of length m in the time series.
     The entropy is then computed using the permutations array and returned as the result.
 
-    :param timeseries:
-    :param m:
-    :return:
-    """
-    n = len(timeseries)
-    permutations = np.zeros((m, m))
-    for i in range(n - m + 1):
-        subsequence = np.array(timeseries[i : i + m])
-        rank = np.argsort(subsequence).argsort()
-        permutations[rank, np.roll(rank, -1)] += 1
+    The ordinal patterns of all windows are built in one vectorized pass (see `_ordinal_cells`)
+    and counted with a single bincount.
 
-    permutations = permutations / (n - m + 1)
+    :param timeseries: 1-D array-like.
+    :param m: Length of the subsequences.
+    :return: Entropy as a float.
+    """
+    cells = _ordinal_cells(timeseries, m)
+    permutations = np.bincount(cells.ravel(), minlength=m * m) / len(cells)
     permutations = permutations[np.nonzero(permutations)]
     entropy = -np.sum(permutations * np.log(permutations)) / np.log(m)
 
     return entropy
 
 
-@nb.njit
-def hurst(ts):
-    n = len(ts)
-    R = np.zeros(n)
-    for i in range(n):
-        R[i] = np.max(ts[: i + 1]) - np.min(ts[: i + 1])
-    R = np.mean(R)
+def rolling_permutation_entropy(series, m, window):
+    """
+    Permutation entropy of every trailing window, i.e. permutation_entropy(series[i - window + 1 : i + 1], m)
+    for each i. Pattern counts are updated incrementally as the window slides (numba kernel).
+
+    :param series: 1-D array or pandas Series.
+    :param m: Length of the subsequences.
+    :param window: Window length in samples (at least m).
+    :return: Same type as `series`; the first window - 1 values are NaN.
+    """
+    if window < m:
+        raise ValueError("window must be at least m.")
+    values = np.asarray(series, dtype=np.float64)
+    out = np.full(len(values), np.nan)
+    if len(values) >= window:
+        from data._kernels import rolling_transition_entropy
+        out[window - 1:] = rolling_transition_entropy(_ordinal_cells(values, m), m, window - m + 1)
+    if isinstance(series, pd.Series):
+        return pd.Series(out, index=series.index)
+    return out
+
+
+def _hurst_columns(x):
+    """
+    Hurst exponent of every column of a 2-D array (see `hurst`).
+    The lagged-difference means and variances of all lags are computed together from prefix sums
+    and one FFT autocorrelation per column, so the cost is O(n log n) instead of O(n) per lag.
+    """
+    n = len(x)
     lags = np.arange(2, n // 3)
-    tau = np.asarray(
-        [np.sqrt(np.std(np.subtract(ts[lag:], ts[:-lag]))) for lag in lags]
-    )
-    X = np.log(lags).reshape(-1, 1)
-    Y = np.log(tau).reshape(-1, 1)
-    coefficients, _, _, _ = np.linalg.lstsq(X, Y)
-    return coefficients[0] * 2.0
+    if not len(lags):
+        raise ValueError("hurst needs at least 9 samples.")
+    # One contiguous row per series keeps the FFTs sequential in memory.
+    # Differences are unchanged by an offset; centering keeps the sums below small.
+    rows = x.T - x.mean(axis=0)[:, None]
+    size = 1 << (2 * n - 1).bit_length()
+    spectrum = np.fft.rfft(rows, size)
+    cross = np.fft.irfft(spectrum * np.conj(spectrum), size)[:, :n]  # sum(x[t] * x[t + lag]) per lag
+    zeros = np.zeros((len(rows), 1))
+    sums = np.concatenate((zeros, np.cumsum(rows, axis=1)), axis=1)
+    squares = np.concatenate((zeros, np.cumsum(rows * rows, axis=1)), axis=1)
+    count = n - lags
+    mean = (sums[:, [n]] - sums[:, lags] - sums[:, n - lags]) / count
+    mean_square = (squares[:, [n]] - squares[:, lags] + squares[:, n - lags] - 2.0 * cross[:, lags]) / count
+    variance = np.maximum(mean_square - mean ** 2, 0.0)
+    log_lags = np.log(lags)
+    with np.errstate(divide="ignore"):
+        log_tau = 0.25 * np.log(variance)
+    return 2.0 * (log_tau @ log_lags) / np.dot(log_lags, log_lags)
+
+
+def hurst(ts):
+    """
+    Hurst exponent of a series: twice the slope (through the origin) of log sqrt(std) of the
+    lagged differences against log lag, for lags 2 .. n // 3 - 1, in O(n log n).
+
+    :param ts: 1-D float array (at least 9 samples).
+    :return: Length-1 array holding the exponent.
+    """
+    return _hurst_columns(np.asarray(ts, dtype=np.float64)[:, None])
+
+
+def hurst_panel(panel):
+    """
+    `hurst` of every column of a (time x symbol) array or wide DataFrame, in one vectorized pass.
+    :param panel: 2-D array or DataFrame without NaNs.
+    :return: Array (or Series indexed by the columns) of exponents.
+    """
+    exponents = _hurst_columns(_panel_values(panel))
+    if isinstance(panel, pd.DataFrame):
+        return pd.Series(exponents, index=panel.columns)
+    return exponents
+
+
+def _rolling_hurst_columns(values, window, step):
+    """rolling_hurst of every column of a 2-D array, NaN-padded to its shape."""
+    if window < 9:
+        raise ValueError("window must be at least 9.")
+    if step < 1:
+        raise ValueError("step must be positive.")
+    out = np.full(values.shape, np.nan)
+    if len(values) >= window:
+        from data._kernels import rolling_hurst as _rolling_hurst
+        out[window - 1::step] = _rolling_hurst(np.ascontiguousarray(values.T), window, step).T
+    return out
+
+
+def rolling_hurst(series, window, step=1):
+    """
+    Hurst exponent (as in `hurst`) of trailing windows, evaluated every `step` samples.
+    Per-lag sums are slid between overlapping windows and chunks of windows run in parallel
+    (numba kernel, compiled on first call).
+
+    :param series: 1-D array or pandas Series without NaNs.
+    :param window: Window length in samples (at least 9).
+    :param step: Evaluate every `step`-th window; the first window always ends at sample window - 1.
+    :return: Same type as `series`, NaN where no window was evaluated.
+    """
+    return _panel_result(_rolling_hurst_columns(_panel_values(series), window, step), series)
+
+
+def rolling_hurst_panel(panel, window, step=1):
+    """
+    `rolling_hurst` of every column of a (time x symbol) array or wide DataFrame; all
+    (symbol, chunk of windows) pairs run in parallel in one kernel call.
+    :param panel: 2-D array or DataFrame without NaNs (forward-fill gaps first).
+    :param window: Window length in samples (at least 9).
+    :param step: Evaluate every `step`-th window.
+    :return: Same type and shape as `panel`, NaN where no window was evaluated.
+    """
+    return _panel_result(_rolling_hurst_columns(_panel_values(panel), window, step), panel)
 
 
-@nb.njit
 def box_counting(ts, box_size):
-    N = len(ts)
-    boxes = np.zeros(N // box_size)
-    for i in range(0, N, box_size):
-        boxes[i // box_size] = np.max(ts[i : i + box_size]) - np.min(
-            ts[i : i + box_size]
-        )
-    return np.count_nonzero(boxes > 0)
+    """
+    Number of boxes of `box_size` samples in which the series moves (max > min).
+    A trailing partial box is ignored.
+    :param ts: 1-D float array.
+    :param box_size: Box width in samples.
+    """
+    x = np.asarray(ts, dtype=np.float64)
+    boxes = x[:len(x) // box_size * box_size].reshape(-1, box_size)
+    return int(np.count_nonzero(boxes.max(axis=1) > boxes.min(axis=1)))
+
+
+def _box_levels(n, n_box_sizes):
+    """
+    Dyadic levels (box size 2 ** level) spread log-evenly over 2 .. n, without duplicates.
+    """
+    top = int(np.log2(n))
+    if top < 2 or n_box_sizes < 2:
+        raise ValueError("fractal_dimension needs at least 4 samples and 2 box sizes.")
+    return np.unique(np.round(np.linspace(1, top, n_box_sizes)).astype(np.int64))
+
+
+def _dimension_from_counts(levels, counts):
+    """Negated slope of log box count against log box size (least squares with intercept)."""
+    log_sizes = levels * np.log(2.0)
+    log_sizes = log_sizes - log_sizes.mean()
+    # A flat window has no moving boxes; its dimension comes out NaN.
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_counts = np.log(counts)
+        log_counts = log_counts - log_counts.mean(axis=-1, keepdims=True)
+    return -(log_counts @ log_sizes) / np.dot(log_sizes, log_sizes)
+
+
+def _fractal_dimension_columns(x, n_box_sizes):
+    """
+    Fractal dimension of every column of a 2-D array (see `fractal_dimension`).
+    Max and min are computed once for boxes of 2 samples and merged pairwise up the hierarchy,
+    so every box size together costs O(n).
+    """
+    levels = _box_levels(len(x), n_box_sizes)
+    counts = np.empty((x.shape[1], len(levels)))
+    hi = lo = x
+    level = 0
+    for i, target in enumerate(levels):
+        while level < target:
+            hi = np.maximum(hi[0:len(hi) - 1:2], hi[1::2])
+            lo = np.minimum(lo[0:len(lo) - 1:2], lo[1::2])
+            level += 1
+        counts[:, i] = np.count_nonzero(hi > lo, axis=0)
+    return _dimension_from_counts(levels, counts)
 
 
-@nb.njit
 def fractal_dimension(ts, n_box_sizes=10):
-    N = len(ts)
-    box_sizes = np.logspace(0, np.log10(N), n_box_sizes).astype(np.int32)
-    box_counts = np.array([box_counting(ts, bs) for bs in box_sizes])
-    log_box_sizes = np.log(box_sizes)
-    log_counts = np.log(box_counts)
-    log_box_sizes = log_box_sizes.reshape(-1, 1)
-    log_counts = log_counts.reshape(-1, 1)
-    coef, _, _, _ = np.linalg.lstsq(log_box_sizes, log_counts, rcond=None)
-    return -coef[0][0]
+    """
+    Box-counting fractal dimension of a series, with power-of-two box sizes spread over 2 .. len(ts).
+
+    :param ts: 1-D float array.
+    :param n_box_sizes: Number of log-spaced box sizes in the regression (repeats are dropped).
+    """
+    return float(_fractal_dimension_columns(np.asarray(ts, dtype=np.float64)[:, None], n_box_sizes)[0])
+
+
+def fractal_dimension_panel(panel, n_box_sizes=10):
+    """
+    `fractal_dimension` of every column of a (time x symbol) array or wide DataFrame, in one vectorized pass.
+    :param panel: 2-D array or DataFrame.
+    :param n_box_sizes: Number of log-spaced box sizes in the regression.
+    :return: Array (or Series indexed by the columns) of dimensions.
+    """
+    dimensions = _fractal_dimension_columns(_panel_values(panel), n_box_sizes)
+    if isinstance(panel, pd.DataFrame):
+        return pd.Series(dimensions, index=panel.columns)
+    return dimensions
+
+
+def _rolling_fractal_dimension_columns(values, window, step, n_box_sizes):
+    """rolling_fractal_dimension of every column of a 2-D array, NaN-padded to its shape."""
+    if step < 1:
+        raise ValueError("step must be positive.")
+    levels = _box_levels(window, n_box_sizes)
+    out = np.full(values.shape, np.nan)
+    if len(values) >= window:
+        from data._kernels import rolling_box_counts
+        counts = rolling_box_counts(np.ascontiguousarray(values.T), window, step, levels)
+        out[window - 1::step] = _dimension_from_counts(levels, counts).T
+    return out
+
+
+def rolling_fractal_dimension(series, window, step=1, n_box_sizes=10):
+    """
+    Fractal dimension (as in `fractal_dimension`) of trailing windows, evaluated every `step` samples.
+    Box max/min of every size are shared by overlapping windows, and per-window box counts are read
+    from strided prefix sums in O(1) per box size (numba kernel, compiled on first call).
+
+    :param series: 1-D array or pandas Series.
+    :param window: Window length in samples (at least 4).
+    :param step: Evaluate every `step`-th window; the first window always ends at sample window - 1.
+    :param n_box_sizes: Number of log-spaced box sizes in the regression (repeats are dropped).
+    :return: Same type as `series`, NaN where no window was evaluated.
+    """
+    return _panel_result(_rolling_fractal_dimension_columns(_panel_values(series), window, step, n_box_sizes),
+                         series)
+
+
+def rolling_fractal_dimension_panel(panel, window, step=1, n_box_sizes=10):
+    """
+    `rolling_fractal_dimension` of every column of a (time x symbol) array or wide DataFrame;
+    all (symbol, chunk of windows) pairs run in parallel in one kernel call.
+    :param panel: 2-D array or DataFrame.
+    :param window: Window length in samples (at least 4).
+    :param step: Evaluate every `step`-th window.
+    :param n_box_sizes: Number of log-spaced box sizes in the regression.
+    :return: Same type and shape as `panel`, NaN where no window was evaluated.
+    """
+    return _panel_result(_rolling_fractal_dimension_columns(_panel_values(panel), window, step, n_box_sizes),
+                         panel)
+
+
+def warmup():
+    """
+    Compile every numba kernel behind this module, or load it from numba's on-disk cache, so a
+    service pays the JIT cost at start-up instead of on its first live update.
+    The inputs have the same types as real calls, so no kernel is recompiled later.
+    """
+    series = np.cumsum(np.random.default_rng(0).normal(size=64))
+    rolling_permutation_entropy(series, 3, 16)
+    rolling_hurst(series, 16)
+    rolling_fractal_dimension(series, 16)
+    for dtype in (np.float64, np.float32):
+        _rolling_sum(series[:, None].astype(dtype), 4)
+        _cumsum_skipna(series[:, None].astype(dtype))
+        rolling_ols(series, series, 4, dtype=dtype)
+
+
+def _panel_values(data, dtype=np.float64):
+    """(time x symbol) array of a Series, DataFrame or 1-D/2-D array; 1-D input becomes one column."""
+    values = np.asarray(data, dtype=dtype)
+    return values.reshape(len(values), -1)
+
+
+def _panel_output(values, dtype, out):
+    """
+    Buffer a panel function writes its result into: `out` viewed as (time x symbol), or a new array.
+    :return: (buffer, dtype of the computation).
+    """
+    if out is None:
+        return np.empty(values.shape, dtype=dtype), np.dtype(dtype)
+    if out.size != values.size or len(out) != len(values):
+        raise ValueError(f"out has shape {out.shape}, expected {values.shape}.")
+    return out.reshape(values.shape), out.dtype
+
+
+def _panel_result(values, like):
+    """Wrap a (time x symbol) result like the input it was computed from, without copying it."""
+    if isinstance(like, pd.DataFrame):
+        return pd.DataFrame(values, index=like.index, columns=like.columns, copy=False)
+    if isinstance(like, pd.Series):
+        return pd.Series(values[:, 0], index=like.index, name=like.name, copy=False)
+    return values.reshape(np.shape(like))
+
+
+def _shifted(values, out=None):
+    """Rows moved down by one, NaN in the first row (pandas' shift(1))."""
+    out = np.empty_like(values) if out is None else out
+    out[1:] = values[:-1]
+    out[0] = np.nan
+    return out
+
+
+def _shifted_difference(values, out=None):
+    """values - shift(values), NaN in the first row (pandas' diff())."""
+    out = np.empty_like(values) if out is None else out
+    np.subtract(values[1:], values[:-1], out=out[1:])
+    out[0] = np.nan
+    return out
+
+
+def _cumsum_skipna(values, out=None):
+    """
+    Cumulative sum down each column that skips NaNs and keeps them in place (pandas' cumsum()),
+    accumulated in float64 whatever the dtype (numba kernel, compiled on first call).
+    `out` may be `values` itself.
+    """
+    from data._kernels import cumsum_skipna
+    values = np.ascontiguousarray(values)
+    return cumsum_skipna(values, np.empty_like(values) if out is None else out)
+
+
+def _rolling_sum(values, window, out=None):
+    """
+    Trailing sums over `window` rows of a 2-D array, in one pass (numba kernel, compiled on first call).
+    Rows whose window is incomplete or contains a NaN or inf are NaN, as with pandas' rolling(window).sum().
+    Sums are accumulated in float64 and written in the dtype of `values` (or of `out`, which must not
+    be `values`).
+    """
+    from data._kernels import rolling_sum
+    values = np.ascontiguousarray(values)
+    return rolling_sum(values, window, np.empty_like(values) if out is None else out)
+
+
+def _lagged_cumsum_difference(returns, window):
+    """cumsum(returns)[t] - cumsum(returns)[t - window + 1] down each column; NaN returns count as 0 but stay NaN."""
+    cum_returns = np.nancumsum(returns, axis=0)
+    out = np.full(returns.shape, np.nan)
+    out[window - 1:] = cum_returns[window - 1:] - cum_returns[:len(returns) - window + 1]
+    out[np.isnan(returns)] = np.nan
+    return out
 
 
 def roll_measure(close_prices, window):
-    close_prices = pd.Series(close_prices)
-    log_returns = np.log(close_prices).diff().dropna()
-    cum_returns = log_returns.cumsum()
-    rolled_returns = cum_returns.rolling(window).apply(lambda x: x[-1] - x[0])
-    return rolled_returns
+    """
+    Cumulative log return over the trailing `window` log returns (last minus first cumulative return).
+
+    :param close_prices: 1-D prices (Series or array), or a 2-D (time x symbol) array or wide DataFrame.
+    :param window: Window length in returns.
+    :return: For 1-D input, a Series indexed like the non-missing log returns; for 2-D input, an array or
+        DataFrame with the first row dropped, NaN where a symbol's return is missing.
+    """
+    if np.ndim(close_prices) == 1:
+        close_prices = pd.Series(close_prices)
+        log_returns = np.log(close_prices).diff().dropna()
+        rolled = _lagged_cumsum_difference(log_returns.to_numpy(dtype=np.float64)[:, None], window)
+        return pd.Series(rolled[:, 0], index=log_returns.index)
+    values = np.asarray(close_prices, dtype=np.float64)
+    rolled = _lagged_cumsum_difference(np.diff(np.log(values), axis=0), window)
+    if isinstance(close_prices, pd.DataFrame):
+        return pd.DataFrame(rolled, index=close_prices.index[1:], columns=close_prices.columns)
+    return rolled
+
+
+def roll_spread(prices, window, dtype=FEATURE_DTYPE, out=None):
+    """
+    Roll (1984) effective bid-ask spread: 2 * sqrt(-cov(dp[t], dp[t - 1])) over the trailing `window`
+    pairs of consecutive price changes (sample covariance). Windows with a non-negative
+    autocovariance have no implied spread and give 0. Pass log prices for a relative spread.
+
+    :param prices: 1-D prices (Series or array), or a 2-D (time x symbol) array or wide DataFrame.
+    :param window: Number of price-change pairs per window.
+    :param dtype: Computation and output dtype (e.g., 'float32' to halve memory).
+    :param out: Preallocated array of the shape of `prices` to write the result into (sets the dtype).
+    :return: Same type and shape as `prices`; NaN until a full window of valid pairs is available.
+    """
+    columns = _panel_values(prices, dtype if out is None else out.dtype)
+    result, dtype = _panel_output(columns, dtype, out)
+    changes = _shifted_difference(columns)
+    lagged = _shifted(changes)
+    # Restrict all three sums to rows where both changes exist, so the windows line up.
+    invalid = np.isnan(changes)
+    invalid |= np.isnan(lagged)
+    changes[invalid] = np.nan
+    lagged[invalid] = np.nan
+    del invalid
+    sum_x = _rolling_sum(changes, window)
+    sum_y = _rolling_sum(lagged, window)
+    np.multiply(changes, lagged, out=changes)
+    sum_xy = _rolling_sum(changes, window, out=lagged)
+    del changes
+    # covariance = (sum_xy - sum_x * sum_y / window) / (window - 1), computed in place
+    sum_x *= sum_y
+    sum_x /= window
+    np.subtract(sum_xy, sum_x, out=sum_xy)
+    sum_xy /= -(window - 1)
+    np.maximum(sum_xy, 0.0, out=sum_xy)
+    np.sqrt(sum_xy, out=result)
+    result *= 2.0
+    return _panel_result(result, prices)
 
 
 def corwin_schultz_hl(high, low, volume, window):
@@ -99,21 +448,74 @@ def bekker_parkinson_vol(high_prices, low_prices, close_prices, window=10):
     return bp_vol
 
 
-def kyles_lambda(close, volume, window):
-    mid = (close + close.shift(1)) / 2
-    lambda_ = (
-        np.abs(volume * (close - mid))
-        / (volume * (mid - close.shift(1))).rolling(window=2).sum()
-    )
-    rolling_lambda = lambda_.rolling(window=window).mean()
-    return rolling_lambda
+def _tick_signs(changes):
+    """
+    Trade signs by the tick rule: the sign of each price change, carried forward through unchanged
+    prices (and NaN from a missing change until the next move).
+    """
+    signs = np.sign(changes)
+    rows = np.arange(len(signs), dtype=np.int32).reshape(-1, *([1] * (signs.ndim - 1)))
+    last_move = np.where(signs != 0, rows, 0)
+    np.maximum.accumulate(last_move, axis=0, out=last_move)
+    return np.take_along_axis(signs, last_move, axis=0)
+
+
+def rolling_ols(y, x, window=None, min_periods=None, intercept=True, dtype=FEATURE_DTYPE, out=None):
+    """
+    Slope of the OLS regression of y on x at every row, from running sums in one O(n) pass
+    (numba kernel, compiled on first call). Each slope only uses rows up to its own, so the
+    result is causal, and data.streaming.RollingOLSState gives the same values one row at a time.
+
+    :param y: Dependent variable: 1-D (Series or array), or a 2-D (time x symbol) array or wide DataFrame.
+    :param x: Regressor, same shape.
+    :param window: Number of trailing rows per regression, or None for an expanding regression over
+        all rows so far.
+    :param min_periods: Minimum number of valid (finite x and y) pairs for a slope; defaults to
+        `window` when rolling (so a gap blanks the windows it falls in) and 2 when expanding.
+    :param intercept: Fit an intercept (otherwise the line goes through the origin).
+    :param dtype: Input and output dtype; sums are accumulated in float64 either way.
+    :param out: Preallocated array of the shape of `y` to write the slopes into (sets the dtype).
+    :return: Same type and shape as `y`; NaN with too few pairs or no variation in x.
+    """
+    from data._kernels import rolling_ols as rolling_ols_kernel
+    if window is not None and window < 2:
+        raise ValueError("window must be at least 2.")
+    if min_periods is None:
+        min_periods = 2 if window is None else window
+    dtype = dtype if out is None else out.dtype
+    y_values = _panel_values(y, dtype)
+    x_values = np.ascontiguousarray(_panel_values(x, dtype))
+    if x_values.shape != y_values.shape:
+        raise ValueError(f"x has shape {x_values.shape}, expected {y_values.shape}.")
+    result, _ = _panel_output(y_values, dtype, out)
+    rolling_ols_kernel(x_values, np.ascontiguousarray(y_values), window or 0, min_periods, intercept, result)
+    return _panel_result(result, y)
+
+
+def kyles_lambda(close, volume, window, taker_buy_volume=None):
+    """
+    Kyle's lambda: slope of the price change on the signed volume, dp[t] = lambda * q[t] + c,
+    over the trailing `window` candles (expanding when None). See kyles_lambda_panel.
+    :param close: Close prices (Series or array).
+    :param volume: Traded volume.
+    :param window: Rolling window in candles, or None for an expanding regression.
+    :param taker_buy_volume: Taker buy volume; when given the signed volume is buys minus sells,
+        otherwise the volume signed by the tick rule.
+    :return: Same type as `close`.
+    """
+    return kyles_lambda_panel(close, volume, window, taker_buy_volume, dtype=np.float64)
 
 
 def amihuds_lambda(close_prices, trade_volumes, window=10):
-    log_returns = np.log(close_prices / close_prices.shift(1))
-    daily_illiquidity = np.abs(trade_volumes) / (close_prices * trade_volumes.sum())
-    lambdas = np.abs(log_returns) / daily_illiquidity
-    return pd.Series(lambdas, index=close_prices.index).rolling(window).mean()
+    """
+    Amihud's lambda: slope of the absolute log return on the dollar volume,
+    |r[t]| = lambda * close[t] * volume[t] + c, over the trailing `window` candles (expanding when None).
+    :param close_prices: Close prices (Series or array).
+    :param trade_volumes: Traded volume in base units.
+    :param window: Rolling window in candles, or None for an expanding regression.
+    :return: Same type as `close_prices`.
+    """
+    return amihuds_lambda_panel(close_prices, trade_volumes, window, dtype=np.float64)
 
 
 def hasbroucks_lambda(close_prices, trade_volumes, window=10):
@@ -122,3 +524,133 @@ def hasbroucks_lambda(close_prices, trade_volumes, window=10):
     mean_abs_trade_size = np.abs(trade_volumes).rolling(window).mean()
     lambdas = mean_abs_return / mean_abs_trade_size
     return pd.Series(lambdas, index=close_prices.index).rolling(window).mean()
+
+
+def corwin_schultz_hl_panel(high, low, volume, window, dtype=FEATURE_DTYPE, out=None):
+    """
+    corwin_schultz_hl for many symbols at once.
+    :param high: (time x symbol) highs as a 2-D array or wide DataFrame.
+    :param low: Lows, same shape.
+    :param volume: Volumes, same shape.
+    :param window: Rolling window in rows.
+    :param dtype: Computation and output dtype (e.g., 'float32' to halve memory).
+    :param out: Preallocated array of the panel's shape to write the result into (sets the dtype).
+    :return: Same type and shape as `high`. Each column equals corwin_schultz_hl of that symbol,
+        so a gap only affects the windows of its own symbol.
+    """
+    dtype = dtype if out is None else out.dtype
+    spread = _panel_values(high, dtype) - _panel_values(low, dtype)
+    result, dtype = _panel_output(spread, dtype, out)
+    volume_values = _panel_values(volume, dtype)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        spread_return = _shifted(spread)
+        np.divide(spread, spread_return, out=spread_return)
+        np.log(spread_return, out=spread_return)
+        volume_sum = _rolling_sum(volume_values, window, out=spread)
+        spread_return *= volume_values
+        spread_return /= volume_sum
+    average = _rolling_sum(spread_return, window, out=volume_sum)
+    average /= window
+    _cumsum_skipna(average, out=result)
+    np.exp(result, out=result)
+    result -= 1
+    return _panel_result(result, high)
+
+
+def bekker_parkinson_vol_panel(high_prices, low_prices, close_prices, window=10, dtype=FEATURE_DTYPE, out=None):
+    """
+    bekker_parkinson_vol for many symbols at once.
+    :param high_prices: (time x symbol) highs as a 2-D array or wide DataFrame.
+    :param low_prices: Lows, same shape.
+    :param close_prices: Closes, same shape.
+    :param window: Normalizing window.
+    :param dtype: Computation and output dtype (e.g., 'float32' to halve memory).
+    :param out: Preallocated array of the panel's shape to write the result into (sets the dtype).
+    :return: Same type and shape as `close_prices`, column-wise equal to bekker_parkinson_vol.
+    """
+    dtype = dtype if out is None else out.dtype
+    log_returns = _panel_values(high_prices, dtype) + _panel_values(low_prices, dtype)
+    result, dtype = _panel_output(log_returns, dtype, out)
+    log_returns /= 2
+    log_returns /= _shifted(_panel_values(close_prices, dtype), out=result)
+    np.log(log_returns, out=log_returns)
+    np.square(log_returns, out=log_returns)
+    _cumsum_skipna(log_returns, out=result)
+    result /= window
+    np.sqrt(result, out=result)
+    return _panel_result(result, close_prices)
+
+
+def kyles_lambda_panel(close, volume, window, taker_buy_volume=None, dtype=FEATURE_DTYPE, out=None):
+    """
+    kyles_lambda for many symbols at once, a rolling_ols of the price change on the signed volume.
+    :param close: (time x symbol) closes as a 2-D array or wide DataFrame.
+    :param volume: Volumes, same shape.
+    :param window: Rolling window in rows, or None for an expanding regression.
+    :param taker_buy_volume: Taker buy volumes, same shape (optional; the tick rule signs otherwise).
+    :param dtype: Computation and output dtype (e.g., 'float32' to halve memory).
+    :param out: Preallocated array of the panel's shape to write the result into (sets the dtype).
+    :return: Same type and shape as `close`, column-wise equal to kyles_lambda.
+    """
+    dtype = dtype if out is None else out.dtype
+    changes = _shifted_difference(_panel_values(close, dtype))
+    volume_values = _panel_values(volume, dtype)
+    if taker_buy_volume is None:
+        signed_volume = _tick_signs(changes)
+        signed_volume *= volume_values
+    else:
+        signed_volume = _panel_values(taker_buy_volume, dtype) * 2
+        signed_volume -= volume_values
+    result = rolling_ols(changes, signed_volume, window, dtype=dtype, out=out)
+    return _panel_result(result, close)
+
+
+def amihuds_lambda_panel(close_prices, trade_volumes, window=10, dtype=FEATURE_DTYPE, out=None):
+    """
+    amihuds_lambda for many symbols at once, a rolling_ols of the absolute log return on the dollar volume.
+    :param close_prices: (time x symbol) closes as a 2-D array or wide DataFrame.
+    :param trade_volumes: Volumes, same shape.
+    :param window: Rolling window in rows, or None for an expanding regression.
+    :param dtype: Computation and output dtype (e.g., 'float32' to halve memory).
+    :param out: Preallocated array of the panel's shape to write the result into (sets the dtype).
+    :return: Same type and shape as `close_prices`, column-wise equal to amihuds_lambda.
+    """
+    dtype = dtype if out is None else out.dtype
+    close_values = _panel_values(close_prices, dtype)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        abs_returns = _shifted(close_values)
+        np.divide(close_values, abs_returns, out=abs_returns)
+        np.log(abs_returns, out=abs_returns)
+        np.abs(abs_returns, out=abs_returns)
+    dollar_volume = close_values * _panel_values(trade_volumes, dtype)
+    result = rolling_ols(abs_returns, dollar_volume, window, dtype=dtype, out=out)
+    return _panel_result(result, close_prices)
+
+
+def hasbroucks_lambda_panel(close_prices, trade_volumes, window=10, dtype=FEATURE_DTYPE, out=None):
+    """
+    hasbroucks_lambda for many symbols at once.
+    :param close_prices: (time x symbol) closes as a 2-D array or wide DataFrame.
+    :param trade_volumes: Volumes, same shape.
+    :param window: Rolling window in rows.
+    :param dtype: Computation and output dtype (e.g., 'float32' to halve memory).
+    :param out: Preallocated array of the panel's shape to write the result into (sets the dtype).
+    :return: Same type and shape as `close_prices`, column-wise equal to hasbroucks_lambda.
+    """
+    dtype = dtype if out is None else out.dtype
+    close_values = _panel_values(close_prices, dtype)
+    result, dtype = _panel_output(close_values, dtype, out)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        abs_returns = _shifted(close_values)
+        np.divide(close_values, abs_returns, out=abs_returns)
+        np.log(abs_returns, out=abs_returns)
+        np.abs(abs_returns, out=abs_returns)
+        mean_abs_return = _rolling_sum(abs_returns, window, out=result)
+        mean_abs_return /= window
+        np.abs(_panel_values(trade_volumes, dtype), out=abs_returns)
+        mean_abs_trade_size = _rolling_sum(abs_returns, window)
+        mean_abs_trade_size /= window
+        np.divide(mean_abs_return, mean_abs_trade_size, out=abs_returns)
+    _rolling_sum(abs_returns, window, out=result)
+    result /= window
+    return _panel_result(result, close_prices)
@@ -5,7 +5,9 @@ setup(
     version="0.1",            # Initial version
     packages=find_packages(), # Automatically find all sub-packages
     install_requires=[
-        "python-binance"      # Add any dependencies (e.g., python-binance)
+        "python-binance",     # Add any dependencies (e.g., python-binance)
+        "pyarrow",            # Columnar kline store (data/storage.py)
+        "websockets",         # Live kline/trade streams (connections/websocket.py)
     ],
     description="Experiments in Python algo trading",
     author="Rizwan Moidunni",